@@ -1,25 +1,46 @@
-from flask import Flask, render_template, request, redirect, flash, url_for, session, send_from_directory, send_file
+from flask import Flask, render_template, request, redirect, flash, url_for, session, send_file, Response, stream_with_context, jsonify, make_response
 from flask_wtf.csrf import CSRFProtect
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, time
-from sqlalchemy import desc as sa_desc
+from sqlalchemy import desc as sa_desc, event
+from sqlalchemy.dialects import postgresql, sqlite
 from functools import wraps
 from dotenv import load_dotenv
 from markupsafe import Markup
 import os
+import sys
 import json
 import pytz
 import logging
 import re
+import hashlib
+import threading
+from bisect import bisect_right
 from math import ceil
 from fuzzywuzzy import fuzz
 import mimetypes
-import gc
+import time as time_module
 import pandas as pd
 from io import BytesIO
+import click
+from maintenance import MaintenanceScheduler
+from schedule_index import DAYS, ScheduleIndex, ScheduleIndexCache, minutes_to_time, parse_time_range, resource_key
+from holiday_calendar import HolidayCalendar, HolidayCalendarCache, section_key
+from content_versions import ContentVersions
+from page_cache import PageCache
+from ingestion import JobQueue
+from timetable_parser import diff_schedules, iter_parsed_sheets, load_timetable_workbook, timetable_sheet_names
+from cell_parsing import cell_parser
+from timetable_clashes import find_clashes
+from notice_images import photo_variants, srcset
+from upload_store import UploadStore, file_extension, is_blob_name
+from file_serving import FileServer
+from assets import AssetBundles
+from compression import Compression
+from werkzeug.exceptions import NotFound
 
 # Custom JSON encoder to handle time objects
 class TimeJSONEncoder(json.JSONEncoder):
@@ -35,7 +56,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+# Database, caches and job state live here; INSTANCE_PATH moves them elsewhere, e.g. for tests
+instance_path = os.environ.get('INSTANCE_PATH')
+app = Flask(__name__, instance_path=os.path.abspath(instance_path) if instance_path else None)
 
 # Configure CSRF protection
 app.config['WTF_CSRF_ENABLED'] = True
@@ -74,6 +97,15 @@ def parse_json_filter(value):
         logger.error(f"Error in parse_json filter: {str(e)}")
         return []
 
+@app.template_filter('photo_srcset')
+def photo_srcset_filter(value):
+    """``srcset`` of a notice's resized photos from its ``photo_variants`` JSON"""
+    try:
+        variants = json.loads(value) if value else {}
+    except (json.JSONDecodeError, TypeError):
+        return ''
+    return srcset(variants, lambda name: url_for('static', filename='uploads/notices/' + name))
+
 # Set timezone for India (moved up before usage)
 TIMEZONE = pytz.timezone('Asia/Kolkata')
 
@@ -176,6 +208,14 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 NOTICES_UPLOAD_PATH = os.path.join(app.config['UPLOAD_FOLDER'], 'notices')
 TIMETABLES_UPLOAD_PATH = os.path.join(app.config['UPLOAD_FOLDER'], 'timetables')
 os.makedirs(NOTICES_UPLOAD_PATH, exist_ok=True)
+# Notice attachments and photos are stored by content hash
+upload_store = UploadStore(NOTICES_UPLOAD_PATH)
+UPLOAD_CACHE_MAX_AGE = 365 * 24 * 3600
+UPLOAD_PURGE_DELAY = timedelta(hours=1)  # How long an unused upload is kept before it is deleted
+# Attachments are sent with range/conditional GET support, or offloaded to the proxy (FILE_OFFLOAD)
+file_server = FileServer(app)
+# CSS/JS bundles built by `flask assets build`; templates include them with asset_urls()
+asset_bundles = AssetBundles(app)
 os.makedirs(TIMETABLES_UPLOAD_PATH, exist_ok=True)
 
 ALLOWED_EXTENSIONS = {
@@ -203,7 +243,9 @@ class Notice(db.Model):
     title: str = db.Column(db.String(200), nullable=False)
     description: str | None = db.Column(db.Text)
     filename: str | None = db.Column(db.String(200))
+    original_filename: str | None = db.Column(db.String(200))  # Name the attachment was uploaded under
     photo_filename: str | None = db.Column(db.String(200))  # New field for photos
+    photo_variants: str | None = db.Column(db.Text)  # JSON string of width -> resized copy of the photo
     upload_date: datetime = db.Column(db.DateTime, default=lambda: datetime.now(TIMEZONE))
     expiration_date: datetime | None = db.Column(db.DateTime)
     is_active: bool = db.Column(db.Boolean, default=True)
@@ -211,10 +253,131 @@ class Notice(db.Model):
     author_id: int | None = db.Column(db.Integer, db.ForeignKey('admin.id'))
     author = db.relationship('Admin', backref='notices')
     
+    __table_args__ = (
+        db.Index('ix_notice_active_upload', 'is_active', 'upload_date'),
+        db.Index('ix_notice_category', 'category', 'is_active', 'upload_date'),
+        db.Index('ix_notice_active_expiration', 'is_active', 'expiration_date'),
+        db.Index('ix_notice_filename', 'filename'),
+    )
+    
     def is_expired(self, current_time=None):
         """Check if notice is expired using safe timezone comparison"""
         return is_notice_expired(self, current_time)
 
+class NoticeFacet(db.Model):
+    """Active notice count of one category, kept in step with the notice table by flush events"""
+    category: str = db.Column(db.String(50), primary_key=True)  # '' for notices without a category
+    active_count: int = db.Column(db.Integer, nullable=False, default=0)
+
+class UploadBlob(db.Model):
+    """Number of notices using a stored upload; unused uploads are purged by a maintenance job"""
+    name: str = db.Column(db.String(200), primary_key=True)
+    ref_count: int = db.Column(db.Integer, nullable=False, default=0)
+    released_at: datetime | None = db.Column(db.DateTime, index=True)  # When ref_count last dropped to zero
+
+def _notice_value(notice, name, before=False):
+    """Attribute of a notice as flushed, or as loaded when ``before`` is set"""
+    history = db.inspect(notice).attrs[name].history
+    if before and history.deleted:
+        return history.deleted[0]
+    return getattr(notice, name)
+
+def _notice_facet_state(notice, before=False):
+    """``(category key, is active)`` of a notice"""
+    category = _notice_value(notice, 'category', before)
+    is_active = _notice_value(notice, 'is_active', before)
+    return (category or ''), is_active is not False
+
+def _notice_upload_names(notice, before=False):
+    """Stored files a notice uses: its attachment, its photo and the photo's variants"""
+    names = {_notice_value(notice, 'filename', before), _notice_value(notice, 'photo_filename', before)}
+    variants = _notice_value(notice, 'photo_variants', before)
+    try:
+        names.update(json.loads(variants).values() if variants else ())
+    except (json.JSONDecodeError, AttributeError):
+        pass
+    names.discard(None)
+    names.discard('')
+    return names
+
+def _upsert(connection, table):
+    """INSERT for ``table`` that can take ON CONFLICT DO UPDATE, on SQLite or PostgreSQL"""
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(table)
+
+def _apply_facet_deltas(connection, deltas):
+    """Add ``{category key: delta}`` to the facet rows inside the flushing transaction
+
+    A single upsert per row, so two transactions creating the same facet can't both insert it.
+    """
+    facets = NoticeFacet.__table__
+    for category, delta in deltas.items():
+        if not delta:
+            continue
+        connection.execute(
+            _upsert(connection, facets)
+            .values(category=category, active_count=max(delta, 0))
+            .on_conflict_do_update(index_elements=[facets.c.category],
+                                   set_={'active_count': facets.c.active_count + delta})
+        )
+
+def _apply_upload_ref_deltas(connection, deltas):
+    """Add ``{stored name: delta}`` to the upload reference counts inside the flushing transaction"""
+    blobs = UploadBlob.__table__
+    now = datetime.now(TIMEZONE)
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        ref_count = blobs.c.ref_count + delta
+        connection.execute(
+            _upsert(connection, blobs)
+            .values(name=name, ref_count=max(delta, 0), released_at=None if delta > 0 else now)
+            .on_conflict_do_update(index_elements=[blobs.c.name], set_={
+                'ref_count': ref_count, 'released_at': db.case((ref_count <= 0, now), else_=None)
+            })
+        )
+
+def _load_previous_value(notice, value, previous, initiator):
+    return value
+
+# Load the old values of an expired notice before they change, so after_update can
+# move its counts from the old facet and stored files to the new ones
+for attribute in (Notice.category, Notice.is_active, Notice.filename, Notice.photo_filename, Notice.photo_variants):
+    event.listen(attribute, 'set', _load_previous_value, active_history=True, retval=True)
+
+@event.listens_for(Notice, 'after_insert')
+def _count_inserted_notice(mapper, connection, notice):
+    category, is_active = _notice_facet_state(notice)
+    if is_active:
+        _apply_facet_deltas(connection, {category: 1})
+    _apply_upload_ref_deltas(connection, dict.fromkeys(_notice_upload_names(notice), 1))
+
+@event.listens_for(Notice, 'after_update')
+def _count_updated_notice(mapper, connection, notice):
+    old = _notice_facet_state(notice, before=True)
+    new = _notice_facet_state(notice)
+    if old != new:
+        deltas = {}
+        if old[1]:
+            deltas[old[0]] = deltas.get(old[0], 0) - 1
+        if new[1]:
+            deltas[new[0]] = deltas.get(new[0], 0) + 1
+        _apply_facet_deltas(connection, deltas)
+
+    old_names = _notice_upload_names(notice, before=True)
+    new_names = _notice_upload_names(notice)
+    if old_names != new_names:
+        deltas = dict.fromkeys(old_names - new_names, -1)
+        deltas.update(dict.fromkeys(new_names - old_names, 1))
+        _apply_upload_ref_deltas(connection, deltas)
+
+@event.listens_for(Notice, 'after_delete')
+def _count_deleted_notice(mapper, connection, notice):
+    category, is_active = _notice_facet_state(notice, before=True)
+    if is_active:
+        _apply_facet_deltas(connection, {category: -1})
+    _apply_upload_ref_deltas(connection, dict.fromkeys(_notice_upload_names(notice, before=True), -1))
+
 class Timetable(db.Model):
     id: int = db.Column(db.Integer, primary_key=True)
     name: str = db.Column(db.String(200), nullable=False)
@@ -223,6 +386,50 @@ class Timetable(db.Model):
     is_active: bool = db.Column(db.Boolean, default=True)
     schedule_data: str | None = db.Column(db.Text)  # JSON string of processed schedule with sections
     sections: str | None = db.Column(db.Text)  # JSON string of available sections
+    sheet_fingerprints: str | None = db.Column(db.Text)  # JSON string of section -> hash of its sheet's cells
+    clash_report: str | None = db.Column(db.Text)  # JSON string of room/faculty clashes found at upload
+    
+    __table_args__ = (
+        db.Index('ix_timetable_active_upload', 'is_active', 'upload_date'),
+    )
+
+    @property
+    def clashes(self):
+        """Clash report of the last upload, ``{'total': 0, 'clashes': []}`` when none were found"""
+        try:
+            return json.loads(self.clash_report) if self.clash_report else {'total': 0, 'clashes': []}
+        except (json.JSONDecodeError, TypeError):
+            return {'total': 0, 'clashes': []}
+
+class TimetableEntry(db.Model):
+    """One class of a timetable, normalized so a section's day is an indexed range query"""
+    id: int = db.Column(db.Integer, primary_key=True)
+    timetable_id: int = db.Column(db.Integer, db.ForeignKey('timetable.id', ondelete='CASCADE'), nullable=False)
+    section: str = db.Column(db.String(100), nullable=False)
+    weekday: int = db.Column(db.SmallInteger, nullable=False)  # 0 = Monday
+    start_minute: int = db.Column(db.SmallInteger, nullable=False)  # Minutes since midnight
+    end_minute: int = db.Column(db.SmallInteger, nullable=False)
+    subject: str | None = db.Column(db.String(200))
+    room: str | None = db.Column(db.String(100))
+    faculty: str | None = db.Column(db.String(200))
+
+    __table_args__ = (
+        db.Index('ix_timetable_entry_lookup', 'timetable_id', 'section', 'weekday', 'start_minute'),
+    )
+
+class Section(db.Model):
+    """A class section, registered by the timetables and holidays that name it"""
+    id: int = db.Column(db.Integer, primary_key=True)
+    key: str = db.Column(db.String(100), nullable=False, unique=True)  # Canonical name, see section_key()
+    name: str = db.Column(db.String(100), nullable=False)  # Spelling used by the latest upload
+
+# Sections affected by a holiday; a holiday without rows here affects every section
+holiday_section = db.Table(
+    'holiday_section',
+    db.Column('holiday_id', db.Integer, db.ForeignKey('holiday.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('section_id', db.Integer, db.ForeignKey('section.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_holiday_section_section', 'section_id', 'holiday_id')
+)
 
 class Holiday(db.Model):
     id: int = db.Column(db.Integer, primary_key=True)
@@ -233,80 +440,204 @@ class Holiday(db.Model):
     created_date: datetime = db.Column(db.DateTime, default=lambda: datetime.now(TIMEZONE))
     is_active: bool = db.Column(db.Boolean, default=True)
     affected_sections: str | None = db.Column(db.Text)  # JSON string of affected sections, null means all sections
+    sections = db.relationship('Section', secondary=holiday_section, lazy='selectin')
+    
+    __table_args__ = (
+        db.Index('ix_holiday_active_dates', 'is_active', 'start_date', 'end_date'),
+    )
 
     def is_current_holiday(self):
         """Check if current date falls within this holiday period"""
         today = datetime.now(TIMEZONE).date()
         return self.start_date <= today <= self.end_date
     
+    def set_sections(self, section_names):
+        """Store the affected sections, registering new ones; an empty list means all sections"""
+        sections = register_sections(section_names)
+        self.sections = sections
+        self.affected_sections = json.dumps([section.name for section in sections]) if sections else None
+
     def affects_section(self, section_name):
         """Check if this holiday affects a specific section"""
-        logger.info(f"Checking if holiday '{self.holiday_name}' affects section '{section_name}'")
-        logger.info(f"Holiday affected_sections: '{self.affected_sections}'")
-        
-        if not self.affected_sections:
-            logger.info(f"No specific sections set, affecting all sections")
+        if not db.session.query(holiday_section.c.holiday_id).filter_by(holiday_id=self.id).first():
             return True  # If no sections specified, affects all sections
-        
+        return db.session.query(holiday_section.c.holiday_id)\
+            .join(Section, Section.id == holiday_section.c.section_id)\
+            .filter(holiday_section.c.holiday_id == self.id, Section.key == section_key(section_name))\
+            .first() is not None
+
+def register_sections(section_names, rename=False):
+    """Section rows for ``section_names`` in order, adding the ones not registered yet (caller commits).
+
+    With ``rename`` registered sections take the spelling given here, as timetable uploads do.
+    """
+    names_by_key = {}
+    for name in section_names:
+        key = section_key(name)
+        if key:
+            names_by_key.setdefault(key, name.strip())
+    if not names_by_key:
+        return []
+    
+    sections = {section.key: section for section in Section.query.filter(Section.key.in_(list(names_by_key)))}
+    for key, name in names_by_key.items():
+        section = sections.get(key)
+        if section is None:
+            section = sections[key] = Section(key=key, name=name)
+            db.session.add(section)
+        elif rename and section.name != name:
+            section.name = name
+    return [sections[key] for key in names_by_key]
+
+def resolve_section_names(section_names):
+    """Registered spellings of section names from a URL or form, keeping unknown names as given"""
+    keys = [section_key(name) for name in section_names]
+    registered = dict(db.session.query(Section.key, Section.name).filter(Section.key.in_(set(keys))).all())
+    return [registered.get(key, name) for key, name in zip(keys, section_names)]
+
+def resolve_section_name(section_name):
+    return resolve_section_names([section_name])[0]
+
+# Committed changes to these models are pushed to kiosk displays
+content_versions = ContentVersions(app)
+content_versions.track(Notice, 'notices')
+content_versions.track(Holiday, 'holidays')
+content_versions.track(Timetable, 'timetable')
+content_versions.track(TimetableEntry, 'timetable')
+
+# Class period boundaries of today, cached per timetable version
+_period_boundaries = {}
+
+def current_class_period(now):
+    """Return (period number, period start) of the class period containing ``now``"""
+    key = (content_versions.get('timetable'), now.date())
+    boundaries = _period_boundaries.get(key)
+    if boundaries is None:
         try:
-            sections = json.loads(self.affected_sections)
-            logger.info(f"Parsed sections: {sections}")
-            logger.info(f"Section name to check: '{section_name}'")
-            logger.info(f"Section name type: {type(section_name)}")
+            timetable = get_active_timetable()
+            boundaries = get_schedule_index(timetable).boundaries(now.strftime('%A')) if timetable else []
+        except Exception as e:
+            logger.error(f"Error computing class periods: {str(e)}", exc_info=True)
+            boundaries = []
+        _period_boundaries.clear()
+        _period_boundaries[key] = boundaries
+    
+    period = bisect_right(boundaries, now.hour * 60 + now.minute)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    period_start = day_start + timedelta(minutes=boundaries[period - 1]) if period else day_start
+    return period, period_start
+
+def conditional_page(*topics, periodic=False):
+    """
+    Give a public page a weak ETag and Last-Modified derived from the content
+    versions of ``topics`` (plus the current class period when ``periodic``),
+    and answer matching conditional requests with 304 before the view queries
+    or renders anything.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            now = datetime.now(TIMEZONE)
+            parts = [
+                request.endpoint,
+                request.full_path,
+                'admin' if 'admin_logged_in' in session else 'public',
+                now.date().isoformat()
+            ]
+            parts.extend(content_versions.get(topic) for topic in topics)
+            last_modified = max(content_versions.last_modified(*topics),
+                                now.replace(hour=0, minute=0, second=0, microsecond=0))
+            if periodic:
+                period, period_start = current_class_period(now)
+                parts.append(str(period))
+                last_modified = max(last_modified, period_start)
+            etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
             
-            # Check for exact match first
-            if section_name in sections:
-                logger.info(f"Exact match found for section '{section_name}'")
-                return True
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (request.if_modified_since is not None and
+                                last_modified.replace(microsecond=0) <= request.if_modified_since)
             
-            # Check for case-insensitive match
-            section_name_lower = section_name.lower() if section_name else ""
-            sections_lower = [s.lower() for s in sections if s]
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
             
-            if section_name_lower in sections_lower:
-                logger.info(f"Case-insensitive match found for section '{section_name}'")
-                return True
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+# gzip/brotli for HTML and JSON responses, negotiated from Accept-Encoding
+compression = Compression(app)
+
+# Rendered HTML of the public display pages, shared by every viewer in the same minute
+page_cache = PageCache(app)
+
+def cached_page(*topics):
+    """
+    Serve a public page from the page cache. Keys combine the route, query
+    string, minute and the content versions of ``topics``, so any commit to
+    that content makes older entries unreachable in every worker. Compressed
+    copies are cached next to the page, one per encoding.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not page_cache.enabled or 'admin_logged_in' in session:
+                return f(*args, **kwargs)
             
-            logger.info(f"No match found for section '{section_name}'")
-            return False
+            now = datetime.now(TIMEZONE)
+            key = '|'.join([request.endpoint, request.full_path, now.strftime('%Y-%m-%dT%H:%M')] +
+                           [content_versions.get(topic) for topic in topics])
+            encoding = compression.negotiate()
+            # Peeked, so the stats count each request once: a hit here or the lookup of the page below
+            encoded = page_cache.peek(f"{key}|{encoding}") if encoding else None
+            if encoded is not None:
+                page_cache.count(hit=True)
+                return compression.encoded_response(*encoded, encoding)
+            
+            cached = page_cache.get(key)
+            if cached is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                cached = (response.get_data(), response.content_type)
+                page_cache.set(key, cached)
             
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.error(f"Error parsing affected_sections JSON: {str(e)}")
-            return True  # If JSON parsing fails, assume it affects all sections
+            body, content_type = cached
+            if encoding and compression.should_compress(len(body), content_type.split(';')[0]):
+                encoded = (compression.compress(body, encoding), content_type)
+                page_cache.set(f"{key}|{encoding}", encoded)
+                return compression.encoded_response(*encoded, encoding)
+            return Response(body, content_type=content_type)
+        return decorated_function
+    return decorator
+
+# Active holidays expanded per date, shared by all requests in this worker
+holiday_calendar_cache = HolidayCalendarCache()
+
+def get_holiday_calendar():
+    """Holiday calendar of this worker, rebuilt after any holiday change is committed"""
+    def build_calendar():
+        rows = db.session.query(Holiday.id, Holiday.holiday_name, Holiday.start_date, Holiday.end_date,
+                                Holiday.description, Section.key)\
+            .outerjoin(holiday_section, holiday_section.c.holiday_id == Holiday.id)\
+            .outerjoin(Section, Section.id == holiday_section.c.section_id)\
+            .filter(Holiday.is_active == True)\
+            .order_by(Holiday.id)\
+            .all()
+        return HolidayCalendar.from_rows(rows)
+    return holiday_calendar_cache.get(content_versions.get('holidays'), build_calendar)
 
 def get_current_holiday(section_name=None):
     """Get the current holiday if any, optionally filtered by section"""
-    today = datetime.now(TIMEZONE).date()
-    logger.info(f"Checking for holidays on {today} for section: '{section_name}'")
-    
-    current_holidays = Holiday.query.filter(
-        Holiday.is_active == True,
-        Holiday.start_date <= today,
-        Holiday.end_date >= today
-    ).all()
-    
-    logger.info(f"Found {len(current_holidays)} active holidays for today")
-    
-    if not current_holidays:
-        logger.info("No active holidays found")
-        return None
-    
-    # If no section specified, return the first holiday (affects all sections)
-    if not section_name:
-        logger.info(f"No section specified, returning first holiday: {current_holidays[0].holiday_name}")
-        return current_holidays[0]
-    
-    # Check for holidays that affect the specific section
-    for holiday in current_holidays:
-        logger.info(f"Checking holiday: {holiday.holiday_name}")
-        if holiday.affects_section(section_name):
-            logger.info(f"Holiday '{holiday.holiday_name}' affects section '{section_name}'")
-            return holiday
-        else:
-            logger.info(f"Holiday '{holiday.holiday_name}' does NOT affect section '{section_name}'")
-    
-    logger.info(f"No holidays found that affect section '{section_name}'")
-    return None
+    return get_holiday_calendar().holiday_on(datetime.now(TIMEZONE).date(), section_name)
 
 # Login decorator
 def login_required(f):
@@ -321,6 +652,53 @@ def login_required(f):
 def allowed_file(filename, file_type):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS[file_type]
 
+def store_notice_file(notice, file):
+    """Save an attachment in the upload store, keeping its name for downloads"""
+    original_filename = secure_filename(file.filename)
+    notice.filename = upload_store.save(file.stream, file_extension(original_filename))
+    notice.original_filename = original_filename
+
+def store_notice_photo(notice, photo):
+    """Save an uploaded photo as resized variants, or as uploaded when it can't be decoded"""
+    photo_filename = secure_filename(photo.filename)
+    variants = photo_variants(photo.stream, photo_filename)
+    if variants:
+        names = {width: upload_store.save(data, 'webp') for width, data in variants.items()}
+        # The largest variant stands in for the original, which is not kept
+        notice.photo_filename = names[max(names)]
+        notice.photo_variants = json.dumps(names)
+    else:
+        photo.stream.seek(0)
+        notice.photo_filename = upload_store.save(photo.stream, file_extension(photo_filename))
+        notice.photo_variants = None
+
+def notice_download_name(filename):
+    """Name a stored attachment was uploaded under, or the stored name for older uploads"""
+    original_filename = db.session.query(Notice.original_filename)\
+        .filter(Notice.filename == filename, Notice.original_filename.isnot(None))\
+        .limit(1)\
+        .scalar()
+    return original_filename or filename
+
+def cache_upload_response(response, filename):
+    """Let browsers and proxies keep a content-addressed upload for a year without revalidating"""
+    if is_blob_name(filename):
+        response.cache_control.no_cache = None  # Set by send_file when there is no max age
+        response.cache_control.public = True
+        response.cache_control.max_age = UPLOAD_CACHE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+@app.after_request
+def cache_static_uploads(response):
+    """Photos are served as static files, so they get their cache headers here"""
+    if request.endpoint == 'static' and response.status_code in (200, 304):
+        path = (request.view_args or {}).get('filename', '')
+        directory, _, filename = path.rpartition('/')
+        if directory == 'uploads/notices':
+            cache_upload_response(response, filename)
+    return response
+
 # Enhanced pattern detection
 DAY_PATTERNS = [
     r'(day|week|mon(day)?|tue(sday)?|wed(nesday)?|thu(rsday)?|fri(day)?|sat(urday)?|sun(day)?)',
@@ -373,458 +751,265 @@ def detect_column_type(df, column_index):
     
     return max(pattern_counts.items(), key=lambda x: x[1])[0]
 
-def parse_time(time_str):
-    """Enhanced time parsing with range support"""
-    if not time_str or pd.isna(time_str):
-        return None
-    
-    time_str = str(time_str).strip().upper().replace('  ', ' ')
-    if not time_str or time_str.lower() in ['nan', 'null', 'none', 'n/a']:
-        return None
-    
-    # Try to extract time range
-    time_range_match = re.search(
-        r'(\d{1,2}[:\.]?\d{0,2}(?:\s*[ap]m)?)[\s-]*[-]?\s*(\d{1,2}[:\.]?\d{0,2}(?:\s*[ap]m)?)',
-        time_str,
-        re.IGNORECASE
-    )
-    if time_range_match:
-        start_time_str = time_range_match.group(1)
-        end_time_str = time_range_match.group(2)
-        start_time = _parse_single_time(start_time_str)
-        end_time = _parse_single_time(end_time_str)
-        if start_time and end_time:
-            return (start_time, end_time)
-    
-    return _parse_single_time(time_str)
-
-def _parse_single_time(time_str):
-    """Helper function for parsing individual time values"""
-    # Clean up the time string by removing leading/trailing spaces and dashes
-    time_str = time_str.strip()
-    if time_str.startswith('-'):
-        time_str = time_str[1:].strip()
-    
-    time_patterns = [
-        '%H:%M', '%H.%M', '%H:%M:%S', '%H.%M.%S',
-        '%I:%M %p', '%I:%M%p', '%I.%M %p', '%I %p', '%I:%M:%S %p',
-        '%Hh%M', '%H:%M hrs', '%H hrs', '%H%M', '%I%M%p', '%I:%M', '%I.%M'
-    ]
-    
-    for fmt in time_patterns:
-        try:
-            return datetime.strptime(time_str, fmt).time()
-        except ValueError:
-            continue
-    
-    try:
-        if isinstance(time_str, (int, float)) or time_str.replace('.', '', 1).isdigit():
-            time_value = float(time_str)
-            if 0 <= time_value < 1:
-                hours = int(time_value * 24)
-                minutes = int((time_value * 24 * 60) % 60)
-                return time(hours, minutes)
-            elif 0 <= time_value <= 24:
-                hours = int(time_value)
-                minutes = int((time_value - hours) * 60)
-                return time(hours % 24, minutes)
-    except (ValueError, TypeError):
-        pass
-    
-    return None
+# Worker processes used to parse the sheets of one workbook in parallel, 0 to parse in-process
+app.config['TIMETABLE_PARSE_PROCESSES'] = int(os.environ.get('TIMETABLE_PARSE_PROCESSES', 0))
+# Refuse timetables that double-book a room or a faculty member instead of only reporting them
+app.config['TIMETABLE_REJECT_CLASHES'] = os.environ.get('TIMETABLE_REJECT_CLASHES', 'off').lower() in ('1', 'true', 'on')
 
-def normalize_day(day_str):
-    """Normalize day names with improved logging"""
-    if not day_str or pd.isna(day_str):
-        return None
-        
-    day_str = str(day_str).strip().lower()
-    logger.debug(f"Normalizing day: {day_str}")
-    
-    if not day_str or day_str.lower() in ['nan', 'null', 'none', 'n/a']:
-        return None
-    
-    day_mapping = {
-        'mon': 'Monday', 'm': 'Monday', '1': 'Monday', 'monday': 'Monday',
-        'tue': 'Tuesday', 'tues': 'Tuesday', 't': 'Tuesday', '2': 'Tuesday', 'tuesday': 'Tuesday',
-        'wed': 'Wednesday', 'w': 'Wednesday', '3': 'Wednesday', 'wednesday': 'Wednesday',
-        'thu': 'Thursday', 'thur': 'Thursday', 'thurs': 'Thursday', 'th': 'Thursday', '4': 'Thursday', 'thursday': 'Thursday',
-        'fri': 'Friday', 'f': 'Friday', '5': 'Friday', 'friday': 'Friday',
-        'sat': 'Saturday', 's': 'Saturday', '6': 'Saturday', 'saturday': 'Saturday',
-        'sun': 'Sunday', 'su': 'Sunday', '0': 'Sunday', '7': 'Sunday', 'sunday': 'Sunday'
-    }
-    
-    if day_str in day_mapping:
-        normalized = day_mapping[day_str]
-        logger.debug(f"Normalized {day_str} to {normalized} (direct match)")
-        return normalized
-    
-    for abbr, full_day in day_mapping.items():
-        if day_str.startswith(abbr) or abbr in day_str:
-            logger.debug(f"Normalized {day_str} to {full_day} (partial match)")
-            return full_day
-    
+def previous_sheet_results(timetable):
+    """``{section: (fingerprint, schedule)}`` of a stored timetable, for reuse by a re-upload"""
+    if timetable is None or not timetable.sheet_fingerprints:
+        return {}
     try:
-        day_num = int(float(day_str))
-        if 0 <= day_num <= 7:
-            days_of_week = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            normalized = days_of_week[day_num % 7]
-            logger.debug(f"Normalized {day_str} to {normalized} (numeric)")
-            return normalized
-    except (ValueError, TypeError):
-        pass
-    
-    logger.debug(f"Could not normalize day: {day_str}")
-    return None
+        fingerprints = json.loads(timetable.sheet_fingerprints)
+        schedule = json.loads(timetable.schedule_data) if timetable.schedule_data else {}
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return {
+        section: (fingerprint, schedule.get(section, []))
+        for section, fingerprint in fingerprints.items()
+    }
+
+def process_timetable(file_path, sheets=None, progress=None, previous=None):
+    """Process the timetable file and return the schedule data, sections and sheet fingerprints.
 
-def process_timetable(file_path):
-    """Process the timetable file and return the schedule data."""
+    ``sheets`` is the output of ``load_timetable_workbook`` when the caller has already read the file.
+    ``progress(parsed_sheet)`` is called with each ``ParsedSheet``, in workbook order.
+    ``previous`` is the output of ``previous_sheet_results``; sheets whose fingerprint is unchanged reuse it.
+    """
     try:
         logger.info(f"Starting to process timetable file: {file_path}")
         
-        # Read the file based on its type
-        file_ext = os.path.splitext(file_path)[1].lower()
-        logger.info(f"Processing file with extension: {file_ext}")
-        
-        if file_ext == '.csv':
-            logger.info("Reading CSV file")
-            df = pd.read_csv(file_path)
-            # For CSV, treat as a single sheet with default section
-            schedule = process_single_sheet(df, "Default")
-            return json.dumps({"Default": schedule}), json.dumps(["Default"])
-            
-        elif file_ext in ['.xlsx', '.xls']:
-            logger.info("Reading Excel file")
-            # Read all sheets
-            excel_file = pd.ExcelFile(file_path)
-            sheets = excel_file.sheet_names
-            logger.info(f"Found sheets: {sheets}")
-            
-            if not sheets:
-                logger.error("No sheets found in Excel file")
-                raise ValueError("No sheets found in Excel file")
-            
-            # Process each sheet
-            all_schedules = {}
-            sections = []
-            
-            for sheet in sheets:
-                logger.info(f"Processing sheet: {sheet}")
-                df = pd.read_excel(file_path, sheet_name=sheet)
-                logger.info(f"Sheet shape: {df.shape}")
-                logger.info(f"Sheet columns: {df.columns.tolist()}")
-                
-                # Extract section from sheet name if possible
-                section = sheet.strip()
-                sections.append(section)
-                
-                # Process the schedule for this sheet
-                schedule = process_single_sheet(df, section)
-                if schedule:  # Only add if there's valid data
-                    all_schedules[section] = schedule
+        # Process each sheet
+        all_schedules = {}
+        sections = []
+        fingerprints = {}
+        failed = []
+        reused = 0
+        cell_counts = cell_parser.snapshot()
+        
+        for parsed in iter_parsed_sheets(file_path, sheets, processes=app.config['TIMETABLE_PARSE_PROCESSES'],
+                                         previous=previous):
+            # Extract section from sheet name if possible
+            section = parsed.name.strip()
+            sections.append(section)
             
-            if not all_schedules:
-                logger.error("No valid schedule entries could be created from any sheet")
-                raise ValueError("No valid schedule entries could be created from any sheet")
-            
-            logger.info(f"Successfully processed {len(all_schedules)} sections")
-            return json.dumps(all_schedules), json.dumps(sections)
-            
-        else:
-            logger.error(f"Unsupported file type: {file_ext}")
-            raise ValueError("Unsupported file type")
+            if parsed.error:
+                logger.error(f"Sheet {section} could not be processed: {parsed.error}")
+                failed.append(f"'{section}' ({parsed.error})")
+            if parsed.fingerprint:
+                fingerprints[section] = parsed.fingerprint
+            reused += parsed.reused
+            if progress is not None:
+                progress(parsed)
+            if parsed.schedule:  # Only add if there's valid data
+                all_schedules[section] = parsed.schedule
+        
+        if not sections:
+            logger.error("No sheets found in Excel file")
+            raise ValueError("No sheets found in Excel file")
+        
+        # Storing the rest would silently drop these sections from the displays
+        if failed:
+            raise ValueError(f"Could not process sheet(s) {', '.join(failed)}")
+        
+        if not all_schedules:
+            logger.error("No valid schedule entries could be created from any sheet")
+            raise ValueError("No valid schedule entries could be created from any sheet")
+        
+        logger.info(f"Successfully processed {len(all_schedules)} sections ({reused} unchanged sheets reused)")
+        if not app.config['TIMETABLE_PARSE_PROCESSES']:
+            # Worker processes keep their own counts
+            logger.info(f"Timetable cell formats: {cell_parser.stats(since=cell_counts)}")
+        return json.dumps(all_schedules), json.dumps(sections), json.dumps(fingerprints)
         
     except Exception as e:
         logger.error(f"Error processing timetable: {str(e)}", exc_info=True)
         raise ValueError(f"Error processing timetable: {str(e)}")
 
-def process_single_sheet(df: pd.DataFrame, section_name: str) -> list:
-    """Process a single sheet of the timetable and return the schedule for that section"""
-    schedule = []
-    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    
-    # Standardize column names and log them
-    df.columns = [col.strip().lower() for col in df.columns]
-    logger.info(f"Available columns in sheet for section {section_name}: {df.columns.tolist()}")
-    
-    # Map expected columns with more flexible matching
-    column_mapping = {}
-    # Prioritize exact match for PROFESSOR/FACULTY NAME
-    faculty_patterns = ['PROFESSOR/FACULTY NAME']  # First try exact match
-    faculty_fallback_patterns = ['professor/faculty name', 'professor', 'faculty name', 'faculty', 'teacher', 'instructor', 'professor/faculty']
-    
-    column_patterns = [
-        ('day', ['day', 'weekday', 'day of week']),
-        ('start', ['start', 'begin', 'from', 'start time', 'begin time']),
-        ('end', ['end', 'finish', 'to', 'end time', 'finish time']),
-        ('subject', ['subject', 'course', 'class', 'paper', 'lecture']),
-        ('room', ['room', 'venue', 'location', 'hall', 'classroom']),
-        ('faculty', faculty_patterns)
-    ]
-    
-    # Log all column names for debugging
-    logger.info("Available columns in Excel:")
-    for col in df.columns:
-        logger.info(f"Column found: '{col}'")
-    
-    # First try exact match for faculty column
-    faculty_col = None
-    for col in df.columns:
-        logger.info(f"Checking column: '{col}' for faculty match")
-        if col == 'PROFESSOR/FACULTY NAME':
-            faculty_col = col
-            logger.info(f"Found exact match for PROFESSOR/FACULTY NAME column: '{col}'")
-            break
-    
-    # If no exact match found, try case-insensitive match
-    if not faculty_col:
-        for col in df.columns:
-            if 'professor/faculty name' in col.lower():
-                faculty_col = col
-                logger.info(f"Found case-insensitive match for faculty column: '{col}'")
-                break
-    
-    # If still no match, try other patterns
-    if not faculty_col:
-        faculty_patterns = ['professor', 'faculty', 'teacher', 'instructor']
-        for col in df.columns:
-            if any(pattern in col.lower() for pattern in faculty_patterns):
-                faculty_col = col
-                logger.info(f"Found faculty column using pattern match: '{col}'")
-                break
-    
-    if faculty_col:
-        column_mapping['faculty'] = faculty_col
-        logger.info(f"Set faculty column mapping to: '{faculty_col}'")
-    else:
-        logger.warning("No faculty column found in the Excel file")
-    
-    # Process other columns
-    for col_type, patterns in column_patterns:
-        if col_type != 'faculty':  # Skip faculty as we handled it separately
-            matches = []
-            for col in df.columns:
-                if any(pattern in col.lower() for pattern in patterns):
-                    matches.append(col)
-                    logger.info(f"Matched {col_type} column: '{col}' using patterns: {patterns}")
-            
-            if matches:
-                column_mapping[col_type] = matches[0]
-            else:
-                logger.warning(f"No column found matching {col_type} patterns")
-                if col_type not in ['faculty']:
-                    return []
-    
-    logger.info(f"Final column mapping: {column_mapping}")
-    
-    # Process each row
-    for idx, row in df.iterrows():
-        try:
-            # Get and normalize day
-            day = normalize_day(str(row[column_mapping['day']]))
-            if not day:
+def check_timetable_clashes(schedule_data, job=None):
+    """Clash report of a processed schedule; raises ValueError when clashes are configured to be rejected.
+
+    The report is added to the progress of ``job`` first, so it is visible even for a rejected upload.
+    """
+    clashes = find_clashes(json.loads(schedule_data))
+    if job is not None:
+        job.update(clashes=clashes)
+    if clashes['total'] and app.config['TIMETABLE_REJECT_CLASHES']:
+        raise ValueError(f"Timetable double-books rooms or faculty in {clashes['total']} places")
+    return clashes
+
+def summarize_timetable_diff(old_schedule_data, new_schedule_data):
+    """Per-section added/removed/changed classes between two schedule JSON strings"""
+    try:
+        old = json.loads(old_schedule_data) if old_schedule_data else {}
+    except (json.JSONDecodeError, TypeError):
+        old = {}
+    return diff_schedules(old, json.loads(new_schedule_data))
+
+
+# Compiled now/next indexes of the active timetable, shared by all requests in this worker
+schedule_index_cache = ScheduleIndexCache()
+
+def get_active_timetable():
+    """Latest active timetable with its schedule blob deferred until it is needed"""
+    return Timetable.query.filter_by(is_active=True)\
+        .options(db.defer(Timetable.schedule_data))\
+        .order_by(db.desc(Timetable.upload_date))\
+        .first()
+
+ENTRY_COLUMNS = (TimetableEntry.section, TimetableEntry.weekday, TimetableEntry.start_minute,
+                 TimetableEntry.end_minute, TimetableEntry.subject, TimetableEntry.room, TimetableEntry.faculty)
+
+def build_timetable_entries(timetable_id, schedule_data):
+    """Rows for the timetable_entry table from a processed schedule JSON string"""
+    schedule = json.loads(schedule_data) if schedule_data else {}
+    rows = []
+    for section_name, section_schedule in schedule.items():
+        for cls_data in section_schedule or []:
+            day = cls_data.get('day')
+            if day not in DAYS:
+                logger.warning(f"Skipping class with unknown day '{day}' in section {section_name}")
                 continue
-            
-            # Process start and end times
-            start_time = row[column_mapping['start']]
-            end_time = row[column_mapping['end']]
-            
-            # Handle faculty information with detailed logging
-            faculty = 'Not assigned'
-            if 'faculty' in column_mapping:
-                try:
-                    faculty_col = column_mapping['faculty']
-                    faculty_val = row[faculty_col]
-                    logger.info(f"Row {idx} - Processing faculty value:")
-                    logger.info(f"  Column: '{faculty_col}'")
-                    logger.info(f"  Raw value: '{faculty_val}'")
-                    logger.info(f"  Type: {type(faculty_val)}")
-                    
-                    # Convert to string and clean
-                    if pd.notna(faculty_val):
-                        faculty = str(faculty_val).strip()
-                        logger.info(f"  Cleaned value: '{faculty}'")
-                        
-                        # Check for invalid values
-                        invalid_values = ['nan', 'none', 'null', 'n/a', 'not assigned', '', '-', 'na']
-                        if not faculty or faculty.lower() in invalid_values:
-                            faculty = 'Not assigned'
-                            logger.info(f"  Value considered invalid, set to: '{faculty}'")
-                        else:
-                            logger.info(f"  Valid faculty name found: '{faculty}'")
-                    else:
-                        logger.info("  Value is NaN, set to: 'Not assigned'")
-                        faculty = 'Not assigned'
-                except Exception as e:
-                    logger.error(f"Row {idx} - Error processing faculty: {str(e)}", exc_info=True)
-                    faculty = 'Not assigned'
-            
-            # Convert times to string format
-            try:
-                if hasattr(start_time, 'strftime'):
-                    start_time_str = start_time.strftime('%I:%M %p')
-                else:
-                    start_time_str = pd.to_datetime(start_time).strftime('%I:%M %p')
-            except:
-                start_time_str = str(start_time)
-            
             try:
-                if hasattr(end_time, 'strftime'):
-                    end_time_str = end_time.strftime('%I:%M %p')
-                else:
-                    end_time_str = pd.to_datetime(end_time).strftime('%I:%M %p')
-            except:
-                end_time_str = str(end_time)
-            
-            # Remove leading zeros
-            start_time_str = start_time_str.lstrip('0')
-            end_time_str = end_time_str.lstrip('0')
-            
-            # Format the time range
-            time_str = f"{start_time_str} - {end_time_str}"
-            
-            # Get subject and room
-            subject = str(row[column_mapping['subject']]).strip()
-            room = str(row[column_mapping['room']]).strip()
-            
-            if not subject:  # Skip if no subject
+                start_minute, end_minute = parse_time_range(cls_data['time'])
+            except (KeyError, AttributeError, ValueError) as e:
+                logger.warning(f"Skipping class with invalid time in section {section_name}: {str(e)}")
                 continue
-            
-            entry = {
-                'day': day,
-                'time': time_str,
-                'subject': subject,
-                'room': room,
-                'faculty': faculty,
+            rows.append({
+                'timetable_id': timetable_id,
                 'section': section_name,
-                'start_time': start_time_str,
-                'end_time': end_time_str
-            }
-            logger.info(f"Created entry: {entry}")
-            schedule.append(entry)
-            
-        except Exception as e:
-            logger.error(f"Error processing row {idx} in section {section_name}: {str(e)}", exc_info=True)
-            continue
-    
-    # Sort schedule by day and start time
-    def sort_key(entry):
-        day_idx = days_order.index(entry['day']) if entry['day'] in days_order else 999
-        try:
-            time_obj = datetime.strptime(entry['start_time'], '%I:%M %p').time()
-        except:
-            time_obj = time(0, 0)  # Default to midnight if time parsing fails
-        return (day_idx, time_obj)
-    
-    schedule.sort(key=sort_key)
-    
-    # Remove the extra time fields before returning
-    for entry in schedule:
-        entry.pop('start_time', None)
-        entry.pop('end_time', None)
-    
-    logger.info(f"Final schedule for section {section_name}: {schedule}")
+                'weekday': DAYS.index(day),
+                'start_minute': start_minute,
+                'end_minute': end_minute,
+                'subject': cls_data.get('subject'),
+                'room': cls_data.get('room'),
+                'faculty': cls_data.get('faculty')
+            })
+    return rows
+
+def replace_timetable_entries(timetable, sections=None):
+    """Rewrite the normalized entries of a timetable from its schedule_data (caller commits).
+
+    With ``sections`` only the entries of those sections are rewritten.
+    """
+    db.session.flush()  # Assigns the id of a new timetable
+    stale = db.delete(TimetableEntry).where(TimetableEntry.timetable_id == timetable.id)
+    rows = build_timetable_entries(timetable.id, timetable.schedule_data)
+    if sections is not None:
+        stale = stale.where(TimetableEntry.section.in_(list(sections)))
+        rows = [row for row in rows if row['section'] in sections]
+    db.session.execute(stale)
+    if rows:
+        db.session.execute(db.insert(TimetableEntry), rows)
+    logger.info(f"Stored {len(rows)} entries for timetable {timetable.id}")
+
+def schedule_from_entries(timetable):
+    """``{section: [class, ...]}`` of a timetable as its entry rows hold it, in the schedule_data format"""
+    schedule = {}
+    rows = db.session.query(*ENTRY_COLUMNS)\
+        .filter(TimetableEntry.timetable_id == timetable.id)\
+        .order_by(TimetableEntry.id)
+    for section, weekday, start_minute, end_minute, subject, room, faculty in rows:
+        schedule.setdefault(section, []).append({
+            'day': DAYS[weekday],
+            'time': f"{minutes_to_time(start_minute)} - {minutes_to_time(end_minute)}",
+            'subject': subject,
+            'room': room,
+            'faculty': faculty,
+            'section': section
+        })
     return schedule
 
-def get_section_classes(schedule_data, section=None):
+def get_schedule_index(timetable):
+    """Compiled schedule index for a timetable, built on first use per worker"""
+    def build_index():
+        sections = json.loads(timetable.sections) if timetable.sections else []
+        rows = db.session.query(*ENTRY_COLUMNS)\
+            .filter(TimetableEntry.timetable_id == timetable.id)\
+            .order_by(TimetableEntry.id)\
+            .all()
+        if rows:
+            return ScheduleIndex.from_entries(rows, sections)
+        # Timetables stored before entries were normalized
+        return ScheduleIndex.from_json(timetable.schedule_data)
+
+    return schedule_index_cache.get(timetable.id, timetable.upload_date, build_index,
+                                    version=content_versions.get('timetable'))
+
+def get_section_day_index(timetable, section_name, day):
+    """Index of one section's classes on one day, read with an indexed range query"""
+    rows = db.session.query(*ENTRY_COLUMNS)\
+        .filter(TimetableEntry.timetable_id == timetable.id,
+                TimetableEntry.section == section_name,
+                TimetableEntry.weekday == DAYS.index(day))\
+        .order_by(TimetableEntry.start_minute)\
+        .all()
+    if not rows:
+        # No classes today, or a timetable without entries: the compiled index knows which
+        return get_schedule_index(timetable)
+    return ScheduleIndex.from_entries(rows, [section_name])
+
+def get_section_classes(schedule_data, section=None, schedule_index=None):
     """Get classes for a specific section or all sections if none specified"""
-    if not schedule_data:
-        logger.error("No schedule data provided")
-        return [], []
+    if schedule_index is None:
+        if not schedule_data:
+            logger.error("No schedule data provided")
+            return [], []
+        try:
+            schedule_index = ScheduleIndex.from_json(schedule_data)
+        except Exception as e:
+            logger.error(f"Error in get_section_classes: {str(e)}", exc_info=True)
+            return [], []
     
     try:
-        # Parse the schedule data
-        schedule = json.loads(schedule_data)
-        logger.info(f"Processing schedule data for sections: {list(schedule.keys())}")
-        
         now = datetime.now(TIMEZONE)
         current_day = now.strftime('%A')
-        current_time = now.time()
-        
-        logger.info(f"Current day: {current_day}, Current time: {current_time.strftime('%I:%M %p')}")
+        now_minutes = now.hour * 60 + now.minute
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         
         # Initialize lists for all sections
         current_classes = []
         upcoming_classes = []
         
-        # Process each section's schedule
-        for section_name, section_schedule in schedule.items():
-            if section and section_name != section:
+        sections = [section] if section else schedule_index.sections
+        for section_name in sections:
+            if not schedule_index.has_section(section_name):
                 continue
-                
-            logger.info(f"Processing section: {section_name}")
+            
+            running, later = schedule_index.lookup(section_name, current_day, now_minutes)
             section_current = []
             section_upcoming = []
             
-            # Process each class in the section
-            for cls in section_schedule:
-                try:
-                    if cls['day'] != current_day:
-                        continue
-                        
-                    time_range = cls['time'].split(' - ')
-                    if len(time_range) != 2:
-                        logger.error(f"Invalid time range format for class: {cls}")
-                        continue
-                        
-                    start_time_str = time_range[0].strip()
-                    end_time_str = time_range[1].strip()
-                    
-                    # Parse times
-                    try:
-                        start_time = datetime.strptime(start_time_str, '%I:%M %p').time()
-                        end_time = datetime.strptime(end_time_str, '%I:%M %p').time()
-                    except ValueError as e:
-                        logger.error(f"Error parsing time for class in section {section_name}: {str(e)}")
-                        continue
-                    
-                    # Calculate minutes for current time and class times
-                    now_minutes = current_time.hour * 60 + current_time.minute
-                    start_minutes = start_time.hour * 60 + start_time.minute
-                    end_minutes = end_time.hour * 60 + end_time.minute
-                    
-                    # Create base class info
-                    class_info = {
-                        'subject': cls['subject'],
-                        'day': current_day,
-                        'time': cls['time'],
-                        'room': cls['room'],
-                        'section': section_name,
-                        'faculty': cls.get('faculty', 'Not assigned')
-                    }
-                    
-                    # Class is current if it's ongoing
-                    if start_minutes <= now_minutes < end_minutes:
-                        time_remaining = end_minutes - now_minutes
-                        total_duration = end_minutes - start_minutes
-                        
-                        section_current.append({
-                            **class_info,
-                            'status': 'ongoing',
-                            'time_remaining': time_remaining * 60,
-                            'total_duration': total_duration * 60,
-                            'time_remaining_str': (
-                                f"{time_remaining} minutes" if time_remaining < 60
-                                else f"{time_remaining / 60:.1f} hours"
-                            )
-                        })
-                        
-                    # Class is upcoming if it's later today
-                    elif start_minutes > now_minutes:
-                        time_until = start_minutes - now_minutes
-                        section_upcoming.append({
-                            **class_info,
-                            'status': 'upcoming',
-                            'time_until': time_until * 60,
-                            'time_until_str': (
-                                f"{time_until} minutes" if time_until < 60
-                                else f"{time_until / 60:.1f} hours"
-                            )
-                        })
-                    
-                except Exception as e:
-                    logger.error(f"Error processing class in section {section_name}: {str(e)}", exc_info=True)
-                    continue
+            # Class is current if it's ongoing
+            for start_minutes, end_minutes, class_info in running:
+                time_remaining = end_minutes - now_minutes
+                total_duration = end_minutes - start_minutes
+                section_current.append({
+                    **class_info,
+                    'status': 'ongoing',
+                    'time_remaining': time_remaining * 60,
+                    'total_duration': total_duration * 60,
+                    'ends_at': int((day_start + timedelta(minutes=end_minutes)).timestamp()),
+                    'time_remaining_str': (
+                        f"{time_remaining} minutes" if time_remaining < 60
+                        else f"{time_remaining / 60:.1f} hours"
+                    )
+                })
+            
+            # Class is upcoming if it's later today
+            for start_minutes, end_minutes, class_info in later:
+                time_until = start_minutes - now_minutes
+                section_upcoming.append({
+                    **class_info,
+                    'status': 'upcoming',
+                    'time_until': time_until * 60,
+                    'starts_at': int((day_start + timedelta(minutes=start_minutes)).timestamp()),
+                    'time_until_str': (
+                        f"{time_until} minutes" if time_until < 60
+                        else f"{time_until / 60:.1f} hours"
+                    )
+                })
             
             # Add no-classes placeholder if needed
             if not section_current:
@@ -864,8 +1049,11 @@ def get_section_classes(schedule_data, section=None):
         return [], []
 
 @app.route('/section/<section_name>')
+@conditional_page('holidays', 'timetable', periodic=True)
+@cached_page('holidays', 'timetable')
 def section_view(section_name):
-    latest_timetable = Timetable.query.filter_by(is_active=True).order_by(db.desc(Timetable.upload_date)).first()
+    section_name = resolve_section_name(section_name)
+    latest_timetable = get_active_timetable()
     
     # Check for current holiday
     current_holiday = get_current_holiday(section_name)
@@ -876,7 +1064,8 @@ def section_view(section_name):
     
     if latest_timetable and not current_holiday:
         try:
-            current_classes, upcoming_classes = get_section_classes(latest_timetable.schedule_data, section_name)
+            schedule_index = get_section_day_index(latest_timetable, section_name, datetime.now(TIMEZONE).strftime('%A'))
+            current_classes, upcoming_classes = get_section_classes(None, section_name, schedule_index=schedule_index)
             sections = json.loads(latest_timetable.sections) if latest_timetable.sections else []
         except Exception as e:
             logger.error(f"Error processing classes: {str(e)}", exc_info=True)
@@ -890,10 +1079,345 @@ def section_view(section_name):
                          current_section=section_name,
                          current_holiday=current_holiday)
 
+# Kiosk display stream settings (seconds)
+app.config['DISPLAY_STREAM_POLL_INTERVAL'] = float(os.environ.get('DISPLAY_STREAM_POLL_INTERVAL', 2))
+app.config['DISPLAY_STREAM_HEARTBEAT'] = 15
+app.config['DISPLAY_STREAM_MAX_DURATION'] = 30 * 60
+# Streams one worker may hold open, 0 for no limit. gunicorn.conf.py sets it for gthread
+# workers so kiosks can't take the threads that page and API requests need.
+app.config['DISPLAY_STREAM_LIMIT'] = int(os.environ.get('DISPLAY_STREAM_LIMIT', 0))
+
+open_display_streams = 0
+open_display_streams_lock = threading.Lock()
+
+def acquire_display_stream():
+    """Count a new display stream in this worker; False when DISPLAY_STREAM_LIMIT is reached"""
+    global open_display_streams
+    limit = app.config['DISPLAY_STREAM_LIMIT']
+    with open_display_streams_lock:
+        if limit and open_display_streams >= limit:
+            return False
+        open_display_streams += 1
+        return True
+
+def release_display_stream():
+    global open_display_streams
+    with open_display_streams_lock:
+        open_display_streams -= 1
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a compact JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def next_period_boundary(now):
+    """Minute of today at which the next class starts or ends in any section, or None"""
+    timetable = get_active_timetable()
+    if not timetable:
+        return None
+    try:
+        boundaries = get_schedule_index(timetable).boundaries(now.strftime('%A'))
+    except Exception as e:
+        logger.error(f"Error computing class period boundaries: {str(e)}", exc_info=True)
+        return None
+    now_minutes = now.hour * 60 + now.minute
+    return next((minute for minute in boundaries if minute > now_minutes), None)
+
+@app.route('/stream/display')
+@compression.exempt
+def display_stream():
+    """
+    Push display changes to kiosks instead of having them poll.
+    Sends a 'change' event when notices, holidays or the active timetable are
+    committed and a 'period' event whenever a class starts or ends.
+    Needs gunicorn's gthread or gevent workers (see gunicorn.conf.py). Once
+    the worker holds DISPLAY_STREAM_LIMIT streams, kiosks get a 503 and poll.
+    """
+    if not acquire_display_stream():
+        logger.warning(f"Display stream limit ({app.config['DISPLAY_STREAM_LIMIT']}) reached - kiosk falls back to polling")
+        response = Response('Too many display streams\n', status=503, mimetype='text/plain')
+        response.headers['Retry-After'] = '60'
+        return response
+    
+    poll_interval = app.config['DISPLAY_STREAM_POLL_INTERVAL']
+    heartbeat = app.config['DISPLAY_STREAM_HEARTBEAT']
+    max_duration = app.config['DISPLAY_STREAM_MAX_DURATION']
+    
+    def generate():
+        versions = content_versions.snapshot()
+        now = datetime.now(TIMEZONE)
+        current_date = now.date()
+        next_boundary = next_period_boundary(now)
+        db.session.close()
+        
+        yield 'retry: 5000\n\n'
+        yield sse_event('hello', {'versions': versions})
+        
+        started = last_sent = time_module.monotonic()
+        while time_module.monotonic() - started < max_duration:
+            time_module.sleep(poll_interval)
+            now = datetime.now(TIMEZONE)
+            sent = False
+            
+            latest = content_versions.snapshot()
+            changed = [topic for topic, version in latest.items() if versions.get(topic) != version]
+            if changed:
+                versions = latest
+                yield sse_event('change', {'topics': changed, 'versions': versions})
+                sent = True
+                if 'timetable' in changed:
+                    next_boundary = next_period_boundary(now)
+                    db.session.close()
+            
+            now_minutes = now.hour * 60 + now.minute
+            if now.date() != current_date:
+                current_date = now.date()
+                yield sse_event('period', {'day': now.strftime('%A'), 'minute': now_minutes})
+                sent = True
+                next_boundary = next_period_boundary(now)
+                db.session.close()
+            elif next_boundary is not None and now_minutes >= next_boundary:
+                yield sse_event('period', {'day': now.strftime('%A'), 'minute': next_boundary})
+                sent = True
+                next_boundary = next_period_boundary(now)
+                db.session.close()
+            
+            if sent:
+                last_sent = time_module.monotonic()
+            elif time_module.monotonic() - last_sent >= heartbeat:
+                yield ': keepalive\n\n'
+                last_sent = time_module.monotonic()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    response.call_on_close(release_display_stream)
+    return response
+
+MAX_API_SECTIONS = 100  # Cap on names accepted by the batched section endpoint
+
+def serialize_holiday(holiday):
+    """Compact JSON form of a holiday for the display API"""
+    if not holiday:
+        return None
+    return {
+        'id': holiday.id,
+        'name': holiday.holiday_name,
+        'description': holiday.description,
+        'start_date': holiday.start_date.isoformat(),
+        'end_date': holiday.end_date.isoformat()
+    }
+
+def section_classes_payload(section_name, schedule_index):
+    """Current/upcoming classes and holiday status of one section"""
+    calendar = get_holiday_calendar()
+    today = datetime.now(TIMEZONE).date()
+    current_holiday = calendar.holiday_on(today, section_name)
+    current_classes = []
+    upcoming_classes = []
+    if schedule_index is not None and not current_holiday:
+        current_classes, upcoming_classes = get_section_classes(None, section_name, schedule_index=schedule_index)
+    return {
+        'section': section_name,
+        'holiday': serialize_holiday(current_holiday),
+        'next_holiday': serialize_holiday(calendar.next_holiday(today + timedelta(days=1), section_name)),
+        'current': current_classes,
+        'upcoming': upcoming_classes
+    }
+
+def conditional_json(payload):
+    """JSON response with a content ETag, answering If-None-Match with 304"""
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def get_active_schedule_index():
+    latest_timetable = get_active_timetable()
+    if not latest_timetable:
+        return None, []
+    sections = json.loads(latest_timetable.sections) if latest_timetable.sections else []
+    return get_schedule_index(latest_timetable), sections
+
+@app.route('/api/v1/sections/<section_name>/classes')
+def api_section_classes(section_name):
+    """Classes and holiday status of one section as JSON"""
+    try:
+        section_name = resolve_section_name(section_name)
+        latest_timetable = get_active_timetable()
+        schedule_index = None
+        if latest_timetable:
+            schedule_index = get_section_day_index(latest_timetable, section_name, datetime.now(TIMEZONE).strftime('%A'))
+        return conditional_json(section_classes_payload(section_name, schedule_index))
+    except Exception as e:
+        logger.error(f"Error building classes for section {section_name}: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error loading section data'}), 500
+
+@app.route('/api/v1/sections/classes')
+def api_sections_classes():
+    """Classes of several sections in one request (?names=A,B,C, all sections by default)"""
+    try:
+        schedule_index, sections = get_active_schedule_index()
+        names = request.args.get('names')
+        if names:
+            requested = [name.strip() for name in names.split(',') if name.strip()]
+            sections = list(dict.fromkeys(resolve_section_names(requested)))
+        if len(sections) > MAX_API_SECTIONS:
+            return jsonify({'error': f'At most {MAX_API_SECTIONS} sections per request'}), 400
+        return conditional_json({
+            'sections': [section_classes_payload(name, schedule_index) for name in sections]
+        })
+    except Exception as e:
+        logger.error(f"Error building classes for sections: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error loading section data'}), 500
+
+def parse_at_param(value):
+    """Day name and minute of an ``at`` query value ('2026-10-19T10:30' or '10:30' today), now when empty"""
+    now = datetime.now(TIMEZONE)
+    if not value:
+        at = now
+    elif 'T' in value:
+        at = datetime.fromisoformat(value)
+    else:
+        clock = datetime.strptime(value, '%H:%M')
+        at = now.replace(hour=clock.hour, minute=clock.minute)
+    return at.strftime('%A'), at.hour * 60 + at.minute
+
+def get_active_resource_index():
+    """Room and faculty index of the active timetable, or None"""
+    latest_timetable = get_active_timetable()
+    return get_schedule_index(latest_timetable).resources if latest_timetable else None
+
+@app.route('/api/v1/rooms/free')
+def api_free_rooms():
+    """Rooms without a class at ?at= (ISO date-time or HH:MM today, default now)"""
+    try:
+        day, minute = parse_at_param(request.args.get('at'))
+    except ValueError:
+        return jsonify({'error': 'at must be an ISO date-time or HH:MM'}), 400
+    try:
+        resources = get_active_resource_index()
+        return conditional_json({
+            'day': day,
+            'time': minutes_to_time(minute),
+            'free': resources.free_rooms(day, minute) if resources else []
+        })
+    except Exception as e:
+        logger.error(f"Error finding free rooms: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error loading room data'}), 500
+
+@app.route('/api/v1/rooms/<room>/day')
+def api_room_day(room):
+    """Classes held in a room on ?day= (weekday name, default today)"""
+    day = request.args.get('day', datetime.now(TIMEZONE).strftime('%A')).capitalize()
+    if day not in DAYS:
+        return jsonify({'error': f'day must be one of {", ".join(DAYS)}'}), 400
+    try:
+        resources = get_active_resource_index()
+        classes = resources.room_day(room, day) if resources else []
+        return conditional_json({
+            'room': resources.room_names.get(resource_key(room), room) if resources else room,
+            'day': day,
+            'classes': [info for _, _, info in classes]
+        })
+    except Exception as e:
+        logger.error(f"Error building day of room {room}: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error loading room data'}), 500
+
+@app.route('/api/v1/faculty/<name>/now')
+def api_faculty_now(name):
+    """Class a faculty member is teaching at ?at= (default now) and their next one that day"""
+    try:
+        day, minute = parse_at_param(request.args.get('at'))
+    except ValueError:
+        return jsonify({'error': 'at must be an ISO date-time or HH:MM'}), 400
+    try:
+        resources = get_active_resource_index()
+        running, upcoming = resources.faculty_at(name, day, minute) if resources else ([], [])
+        return conditional_json({
+            'faculty': resources.faculty_names.get(resource_key(name), name) if resources else name,
+            'day': day,
+            'time': minutes_to_time(minute),
+            'current': [info for _, _, info in running],
+            'next': upcoming[0][2] if upcoming else None
+        })
+    except Exception as e:
+        logger.error(f"Error finding classes of faculty {name}: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Error loading faculty data'}), 500
+
+# Newest notices rendered on the home page; older ones are fetched with "Load More"
+app.config['HOME_NOTICES_WINDOW'] = int(os.environ.get('HOME_NOTICES_WINDOW', 12))
+NOTICE_SUMMARY_LENGTH = 100  # Characters of the description shown on a notice card
+MAX_NOTICES_WINDOW = 50
+
+def summarize_description(text, length=NOTICE_SUMMARY_LENGTH, leeway=5):
+    """Shorten a description on a word boundary the way Jinja's truncate filter does"""
+    if not text or len(text) <= length + leeway:
+        return text
+    return text[:length - 3].rsplit(' ', 1)[0] + '...'
+
+def encode_notice_cursor(notice):
+    return f"{notice['upload_date'].isoformat()}_{notice['id']}"
+
+def decode_notice_cursor(cursor):
+    """``(upload_date, id)`` of a cursor; raises ValueError"""
+    upload_date, notice_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(upload_date), int(notice_id)
+
+def get_notice_window(before=None, limit=None):
+    """Newest active notices as card dicts, older than the ``before`` cursor, and the cursor after them.
+
+    Only the columns a notice card shows are selected, and at most enough of the
+    description to summarize it.
+    """
+    limit = limit or app.config['HOME_NOTICES_WINDOW']
+    query = db.session.query(
+        Notice.id, Notice.title, Notice.category, Notice.filename, Notice.photo_filename, Notice.photo_variants,
+        Notice.upload_date, Notice.expiration_date,
+        db.func.substr(Notice.description, 1, NOTICE_SUMMARY_LENGTH + 6).label('description_head')
+    ).filter(Notice.is_active == True)
+    if before:
+        upload_date, notice_id = decode_notice_cursor(before)
+        # Keyset condition on (upload_date, id), the order notices are listed in
+        query = query.filter(db.or_(
+            Notice.upload_date < upload_date,
+            db.and_(Notice.upload_date == upload_date, Notice.id < notice_id)
+        ))
+    rows = query.order_by(db.desc(Notice.upload_date), db.desc(Notice.id)).limit(limit + 1).all()
+    
+    notices = []
+    for row in rows[:limit]:
+        notice = row._asdict()
+        notice['summary'] = summarize_description(notice.pop('description_head'))
+        notices.append(notice)
+    next_cursor = encode_notice_cursor(notices[-1]) if len(rows) > limit else None
+    return notices, next_cursor
+
+@app.route('/api/v1/notices')
+def api_notices():
+    """Window of active notices older than ?before=<cursor>, with their rendered cards"""
+    limit = min(request.args.get('limit', app.config['HOME_NOTICES_WINDOW'], type=int), MAX_NOTICES_WINDOW)
+    try:
+        notices, next_cursor = get_notice_window(request.args.get('before'), max(limit, 1))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    html = ''.join(render_template('notice_card.html', notice=notice) for notice in notices)
+    return conditional_json({
+        'notices': [
+            {**notice,
+             'upload_date': notice['upload_date'].isoformat(),
+             'expiration_date': notice['expiration_date'].isoformat() if notice['expiration_date'] else None}
+            for notice in notices
+        ],
+        'html': html,
+        'next': next_cursor
+    })
+
 @app.route('/')
+@conditional_page('notices', 'holidays', 'timetable', periodic=True)
+@cached_page('notices', 'holidays', 'timetable')
 def index():
-    notices = Notice.query.filter_by(is_active=True).order_by(db.desc(Notice.upload_date)).all()
-    latest_timetable = Timetable.query.filter_by(is_active=True).order_by(db.desc(Timetable.upload_date)).first()
+    notices, next_notices_cursor = get_notice_window()
+    latest_timetable = get_active_timetable()
     
     current_classes = []
     upcoming_classes = []
@@ -910,14 +1434,14 @@ def index():
     
     if latest_timetable and not current_holiday:
         logger.info(f"Found active timetable: {latest_timetable.name}")
-        logger.info(f"Raw schedule data: {latest_timetable.schedule_data}")
         
         try:
+            schedule_index = get_schedule_index(latest_timetable)
             # If there are sections, show the first one by default
             if sections:
-                current_classes, upcoming_classes = get_section_classes(latest_timetable.schedule_data, sections[0])
+                current_classes, upcoming_classes = get_section_classes(None, sections[0], schedule_index=schedule_index)
             else:
-                current_classes, upcoming_classes = get_section_classes(latest_timetable.schedule_data)
+                current_classes, upcoming_classes = get_section_classes(None, schedule_index=schedule_index)
                 
             # Use the custom encoder for logging
             logger.info(f"Current classes: {json.dumps(current_classes, indent=2, cls=TimeJSONEncoder)}")
@@ -932,6 +1456,7 @@ def index():
 
     return render_template('index.html', 
                          notices=notices, 
+                         next_notices_cursor=next_notices_cursor,
                          current_classes=current_classes, 
                          upcoming_classes=upcoming_classes,
                          sections=sections,
@@ -1012,14 +1537,10 @@ def upload_notice():
         return redirect(url_for('admin'))
     
     if file.filename and allowed_file(file.filename, 'notice'):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(NOTICES_UPLOAD_PATH, filename)
-        file.save(file_path)
-        
         notice = Notice()
+        store_notice_file(notice, file)
         notice.title = str(request.form['title'])
         notice.description = str(request.form['description']) if request.form['description'] else None
-        notice.filename = str(filename)
         notice.author_id = session.get('admin_id')
         notice.is_active = True
         db.session.add(notice)
@@ -1053,19 +1574,13 @@ def add_notice():
     if 'file' in request.files and request.files['file'].filename:
         file = request.files['file']
         if file.filename and allowed_file(file.filename, 'notice'):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(NOTICES_UPLOAD_PATH, filename)
-            file.save(file_path)
-            notice.filename = filename
+            store_notice_file(notice, file)
     
     # Handle photo upload
     if 'photo' in request.files and request.files['photo'].filename:
         photo = request.files['photo']
         if photo.filename and allowed_file(photo.filename, 'notice'):
-            photo_filename = secure_filename(photo.filename)
-            photo_path = os.path.join(NOTICES_UPLOAD_PATH, photo_filename)
-            photo.save(photo_path)
-            notice.photo_filename = photo_filename
+            store_notice_photo(notice, photo)
     
     if expiration_date:
         try:
@@ -1091,19 +1606,34 @@ def add_class():
     
     try:
         time_obj = datetime.strptime(time_str, '%Y-%m-%dT%H:%M')
-        class_time = time_obj.strftime('%I:%M %p')
+        start_minute = time_obj.hour * 60 + time_obj.minute
+        end_minute = min(start_minute + int(request.form.get('duration', 60)), 24 * 60 - 1)
         
-        # Add to timetable
+        # Add to the schedule blob and rewrite that section's entries from it, in one commit
         timetable = Timetable.query.order_by(db.desc(Timetable.upload_date)).first()
         if timetable:
-            schedule = json.loads(timetable.schedule_data)
-            schedule.append({
+            schedule = json.loads(timetable.schedule_data) if timetable.schedule_data else {}
+            if not isinstance(schedule, dict):
+                raise ValueError("Timetable schedule is not stored per section; re-upload it first")
+            sections = json.loads(timetable.sections) if timetable.sections else []
+            section = resolve_section_name(request.form.get('section') or (sections[0] if sections else 'Default'))
+            schedule.setdefault(section, []).append({
                 'day': time_obj.strftime('%A'),
-                'time': class_time,
+                'time': f"{minutes_to_time(start_minute)} - {minutes_to_time(end_minute)}",
                 'subject': subject,
-                'room': room
+                'room': room,
+                'faculty': 'Not assigned',
+                'section': section
             })
             timetable.schedule_data = json.dumps(schedule)
+            if section not in sections:
+                timetable.sections = json.dumps(sections + [section])
+                register_sections([section])
+            
+            has_entries = db.session.query(TimetableEntry.id)\
+                .filter(TimetableEntry.timetable_id == timetable.id).first() is not None
+            # A timetable stored before entries existed gets all of them, or its index would only show this class
+            replace_timetable_entries(timetable, sections={section} if has_entries else None)
             db.session.commit()
         
         flash('Class added successfully!', 'success')
@@ -1123,8 +1653,8 @@ def admin():
     current_holiday = get_current_holiday()
     current_holiday_count = 1 if current_holiday else 0
     
-    # Get available sections dynamically from the latest Excel file
-    available_sections = get_dynamic_sections_from_excel()
+    # Sections of the active timetable, saved at upload time
+    available_sections = get_timetable_sections()
 
     return render_template('admin.html', 
                          notices=notices, 
@@ -1133,6 +1663,12 @@ def admin():
                          current_holiday_count=current_holiday_count,
                          available_sections=available_sections)
 
+@app.route('/admin/page_cache')
+@login_required
+def page_cache_stats():
+    """Hit/miss counters of this worker's rendered-page cache"""
+    return jsonify(page_cache.stats())
+
 @app.route('/delete_notice/<int:id>', methods=['POST'])
 @login_required
 def delete_notice(id):
@@ -1146,6 +1682,7 @@ def delete_notice(id):
 @login_required
 def delete_timetable(id):
     timetable = Timetable.query.get_or_404(id)
+    db.session.execute(db.delete(TimetableEntry).where(TimetableEntry.timetable_id == id))
     db.session.delete(timetable)
     db.session.commit()
     flash('Timetable deleted successfully', 'success')
@@ -1153,7 +1690,8 @@ def delete_timetable(id):
 
 @app.route('/download_notice/<filename>')
 def download_notice(filename):
-    return send_from_directory(NOTICES_UPLOAD_PATH, filename)
+    response = file_server.send(NOTICES_UPLOAD_PATH, filename, download_name=notice_download_name(filename))
+    return cache_upload_response(response, filename)
 
 @app.route('/preview_pdf/<filename>')
 def preview_pdf(filename):
@@ -1174,54 +1712,45 @@ def preview_pdf(filename):
         
         file_path = os.path.join(NOTICES_UPLOAD_PATH, filename)
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            logger.warning(f"PDF file not found: {file_path}")
-            return "File not found", 404
-        
         # Security: Ensure file is actually in the notices directory
         if not os.path.abspath(file_path).startswith(os.path.abspath(NOTICES_UPLOAD_PATH)):
             logger.warning(f"Attempted to access file outside notices directory: {file_path}")
             return "Access denied", 403
         
-        # Serve PDF with proper headers for browser viewing
-        response = send_from_directory(NOTICES_UPLOAD_PATH, filename)
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = 'inline; filename="' + filename + '"'
+        # Serve PDF with proper headers for browser viewing; ranges let the viewer load pages on demand
+        response = file_server.send(NOTICES_UPLOAD_PATH, filename, mimetype='application/pdf',
+                                    download_name=notice_download_name(filename))
         response.headers['X-Content-Type-Options'] = 'nosniff'
-        return response
+        return cache_upload_response(response, filename)
         
+    except NotFound:
+        logger.warning(f"PDF file not found: {filename}")
+        return "File not found", 404
     except Exception as e:
         logger.error(f"Error previewing PDF {filename}: {str(e)}")
         return "Error loading PDF", 500
 
-def validate_timetable_file(file_path):
-    """Validate the format and content of the timetable file."""
+def validate_timetable_file(file_path, sheets=None):
+    """Validate the format and content of the timetable file.
+
+    The first sheet is checked; pass ``sheets`` from ``load_timetable_workbook`` to avoid re-reading the file.
+    """
     try:
         logger.info(f"Starting validation of timetable file: {file_path}")
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            logger.error(f"File not found: {file_path}")
-            raise ValueError("File not found")
-        
-        # Check file extension
-        file_ext = os.path.splitext(file_path)[1].lower()
-        logger.info(f"File extension: {file_ext}")
-        
-        # Read the file based on its type
-        if file_ext == '.csv':
-            logger.info("Reading CSV file")
-            df = pd.read_csv(file_path)
-        elif file_ext in ['.xlsx', '.xls']:
-            logger.info("Reading Excel file")
-            df = pd.read_excel(file_path)
-        else:
-            logger.error(f"Unsupported file type: {file_ext}")
-            raise ValueError("Unsupported file type")
+        if sheets is None:
+            # Check if file exists
+            if not os.path.exists(file_path):
+                logger.error(f"File not found: {file_path}")
+                raise ValueError("File not found")
+            sheets = load_timetable_workbook(file_path)
+        
+        if not sheets:
+            logger.error("No sheets found in file")
+            raise ValueError("The file is empty")
+        df = next(iter(sheets.values()))
         
         logger.info(f"File read successfully. Shape: {df.shape}")
-        logger.info(f"Columns: {df.columns.tolist()}")
         
         # Check if DataFrame is empty
         if df.empty:
@@ -1239,8 +1768,8 @@ def validate_timetable_file(file_path):
         missing_columns = []
         found_columns = {}
         
-        # First, normalize all column names to lowercase
-        df.columns = [col.strip().lower() for col in df.columns]
+        # First, normalize all column names to lowercase (on a copy, the sheet is parsed again later)
+        df = df.rename(columns=lambda col: col.strip().lower())
         
         # Check each required column type
         for col_type, patterns in column_patterns.items():
@@ -1293,146 +1822,190 @@ def validate_schedule_data(schedule_data):
     except (json.JSONDecodeError, TypeError):
         return "[]"
 
+# Timetable uploads are parsed by background jobs so big workbooks don't block a worker
+ingestion_queue = JobQueue(app)
+
+def ingest_timetable(job, file_path, name, filename):
+    """Background job: validate and parse an uploaded timetable, then make it the active one"""
+    try:
+        if app.config['TIMETABLE_PARSE_PROCESSES'] > 1:
+            # Sheets are read by the worker processes; only the first one is needed here
+            sheets = None
+            validate_timetable_file(file_path, load_timetable_workbook(file_path, first_sheet_only=True))
+            sheets_total = len(timetable_sheet_names(file_path))
+        else:
+            sheets = load_timetable_workbook(file_path)
+            validate_timetable_file(file_path, sheets)
+            sheets_total = len(sheets)
+        job.update(sheets_total=sheets_total, sheets_parsed=0, sheets_reused=0, rows_accepted=0, rows_rejected=0)
+        
+        def sheet_parsed(parsed):
+            section = parsed.name.strip()
+            job.progress['rows_rejected'] += parsed.row_count - len(parsed.schedule)
+            job.progress['sheets_reused'] += parsed.reused
+            if parsed.error:
+                job.warn(f"Sheet '{section}' could not be processed: {parsed.error}")
+            elif not parsed.schedule:
+                job.warn(f"Sheet '{section}' has no usable classes")
+            job.update(sheets_parsed=job.progress['sheets_parsed'] + 1,
+                       rows_accepted=job.progress['rows_accepted'] + len(parsed.schedule))
+        
+        # Sheets that didn't change since the active timetable reuse its parsed classes
+        previous = Timetable.query.filter_by(is_active=True).order_by(db.desc(Timetable.upload_date)).first()
+        schedule_data, sections, fingerprints = process_timetable(
+            file_path, sheets, progress=sheet_parsed, previous=previous_sheet_results(previous))
+        diff = summarize_timetable_diff(previous.schedule_data if previous else None, schedule_data)
+        clashes = check_timetable_clashes(schedule_data, job)
+        
+        # Swap the new timetable in with a single commit
+        timetable = Timetable()
+        timetable.name = name
+        timetable.filename = filename
+        timetable.schedule_data = validate_schedule_data(schedule_data)
+        timetable.sections = validate_schedule_data(sections)
+        timetable.sheet_fingerprints = fingerprints
+        timetable.clash_report = json.dumps(clashes)
+        timetable.is_active = True
+        
+        # Deactivate other timetables
+        Timetable.query.update({'is_active': False})
+        
+        db.session.add(timetable)
+        register_sections(json.loads(sections), rename=True)
+        replace_timetable_entries(timetable)
+        db.session.commit()
+        logger.info(f"Timetable {timetable.id} saved to database successfully")
+        
+        # Compile the now/next index up front so the first kiosk poll doesn't pay for it
+        get_schedule_index(timetable)
+        return {'timetable_id': timetable.id, 'sections': json.loads(sections), 'diff': diff, 'clashes': clashes}
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logger.error(f"Error removing file {file_path}: {str(e)}")
+
 @app.route('/upload_timetable', methods=['POST'])
 @login_required
 def upload_timetable():
-    file_path = None
-    try:
-        logger.info("Starting timetable upload process")
-        
-        if 'file' not in request.files:
-            logger.error("No file part in the request")
-            flash('No file selected', 'error')
-            return redirect(url_for('admin'))
-        
-        file = request.files['file']
-        logger.info(f"File received: {file.filename}")
-        
-        if file.filename == '':
-            logger.error("Empty filename")
-            flash('No file selected', 'error')
-            return redirect(url_for('admin'))
-        
-        if not validate_file_size(file):
-            logger.error(f"File size exceeds limit: {file.filename}")
-            flash('File size exceeds maximum limit (16MB)', 'error')
-            return redirect(url_for('admin'))
-        
-        if file.filename and allowed_file(file.filename, 'timetable'):
-            logger.info(f"File type allowed: {file.filename}")
-            # Create a secure filename
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(TIMETABLES_UPLOAD_PATH, filename)
-            logger.info(f"File will be saved to: {file_path}")
-            
-            # Save the file
-            file.save(file_path)
-            logger.info(f"File saved to {file_path}")
-            
-            # Verify the file exists after saving
-            if not os.path.exists(file_path):
-                logger.error(f"File not found after saving: {file_path}")
-                flash('Error saving file. Please try again.', 'error')
-                return redirect(url_for('admin'))
-            
-            # Validate timetable format before processing
-            try:
-                logger.info("Starting timetable validation")
-                if not validate_timetable_file(file_path):
-                    logger.error("Timetable validation failed")
-                    flash('Invalid timetable format', 'error')
-                    return redirect(url_for('admin'))
-                logger.info("Timetable format validated successfully")
-            except Exception as e:
-                logger.error(f"Error validating timetable: {str(e)}", exc_info=True)
-                flash(f'Error validating timetable: {str(e)}', 'error')
-                return redirect(url_for('admin'))
-            
-            # Process the timetable
-            try:
-                logger.info("Starting timetable processing")
-                schedule_data, sections = process_timetable(file_path)
-                logger.info(f"Processed schedule data: {schedule_data}")
-                
-                # Validate that the schedule data is valid JSON
-                try:
-                    json.loads(schedule_data)
-                    logger.info("Schedule data is valid JSON")
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON in schedule data: {str(e)}")
-                    flash(f'Error processing timetable: Invalid JSON data', 'error')
-                    return redirect(url_for('admin'))
-                
-            except Exception as e:
-                logger.error(f"Error processing timetable: {str(e)}", exc_info=True)
-                flash(f'Error processing timetable: {str(e)}', 'error')
-                return redirect(url_for('admin'))
-            
-            # Create and save the timetable record
-            timetable = Timetable()
-            timetable.name = str(request.form.get('name', 'Timetable'))
-            timetable.filename = str(filename)
-            timetable.schedule_data = validate_schedule_data(schedule_data)
-            timetable.sections = validate_schedule_data(sections)
-            timetable.is_active = True
-            
-            # Deactivate other timetables
-            Timetable.query.update({'is_active': False})
-            
-            db.session.add(timetable)
-            db.session.commit()
-            logger.info("Timetable saved to database successfully")
-            
-            flash('Timetable uploaded successfully!', 'success')
-            
-        else:
-            logger.error(f"File type not allowed: {file.filename}")
-            flash('File type not allowed. Please upload an Excel or CSV file.', 'error')
-        
+    logger.info("Starting timetable upload process")
+    
+    if 'file' not in request.files:
+        logger.error("No file part in the request")
+        flash('No file selected', 'error')
+        return redirect(url_for('admin'))
+    
+    file = request.files['file']
+    logger.info(f"File received: {file.filename}")
+    
+    if file.filename == '':
+        logger.error("Empty filename")
+        flash('No file selected', 'error')
         return redirect(url_for('admin'))
+    
+    if not validate_file_size(file):
+        logger.error(f"File size exceeds limit: {file.filename}")
+        flash('File size exceeds maximum limit (16MB)', 'error')
+        return redirect(url_for('admin'))
+    
+    if not allowed_file(file.filename, 'timetable'):
+        logger.error(f"File type not allowed: {file.filename}")
+        flash('File type not allowed. Please upload an Excel or CSV file.', 'error')
+        return redirect(url_for('admin'))
+    
+    try:
+        # Stage the upload under a unique name so concurrent jobs can't overwrite each other
+        filename = secure_filename(file.filename)
+        file_path = os.path.join(TIMETABLES_UPLOAD_PATH, f"{os.urandom(8).hex()}_{filename}")
+        file.save(file_path)
+        logger.info(f"File saved to {file_path}")
         
+        job_id = ingestion_queue.submit('timetable', ingest_timetable, file_path,
+                                        str(request.form.get('name', 'Timetable')), filename)
     except Exception as e:
         logger.error(f"Error uploading timetable: {str(e)}", exc_info=True)
         flash(f'Error uploading timetable: {str(e)}', 'error')
         return redirect(url_for('admin'))
-        
-    finally:
-        # Clean up the file if it exists and there was an error
-        if file_path and os.path.exists(file_path):
-            try:
-                # Make sure no pandas resources are holding the file
-                gc.collect()
-                # Add a small delay to ensure file handles are released
-                import time
-                time.sleep(0.1)
-                os.remove(file_path)
-                logger.info(f"Cleaned up file: {file_path}")
-            except Exception as e:
-                logger.error(f"Error removing file {file_path}: {str(e)}")
-                # Try again after a longer delay
-                try:
-                    time.sleep(1)
-                    os.remove(file_path)
-                    logger.info(f"Successfully cleaned up file on second attempt: {file_path}")
-                except Exception as e2:
-                    logger.error(f"Failed to clean up file after retry {file_path}: {str(e2)}")
+    
+    status_url = url_for('ingestion_job_status', job_id=job_id)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'job_id': job_id, 'status_url': status_url}), 202
+    flash(f'Timetable upload queued as job {job_id}. Progress: {status_url}', 'success')
+    return redirect(url_for('admin'))
+
+@app.route('/admin/jobs/<int:job_id>')
+@login_required
+def ingestion_job_status(job_id):
+    """Status and progress of a background ingestion job"""
+    job = ingestion_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
 
 NOTICES_PER_PAGE = 9  # Show 9 notices per page in grid layout
 
+def get_notice_facets():
+    """Active notice counts: ``{'total': n, 'categories': {category: n}}``, read from the facet table"""
+    rows = db.session.query(NoticeFacet.category, NoticeFacet.active_count)\
+        .filter(NoticeFacet.active_count > 0)\
+        .all()
+    categories = {category: count for category, count in rows if category}
+    return {
+        'total': sum(count for _, count in rows),
+        'categories': dict(sorted(categories.items()))
+    }
+
+def rebuild_notice_facets():
+    """Recount the facet table from the notices, repairing any drift"""
+    counts = dict(
+        db.session.query(db.func.coalesce(Notice.category, ''), db.func.count(Notice.id))
+        # Counted as active when unset, like _notice_facet_state does
+        .filter(db.or_(Notice.is_active == True, Notice.is_active.is_(None)))
+        .group_by(db.func.coalesce(Notice.category, ''))
+        .all()
+    )
+    facets = {facet.category: facet for facet in NoticeFacet.query.all()}
+    changed = 0
+    for category in set(counts) | set(facets):
+        count = counts.get(category, 0)
+        facet = facets.get(category)
+        if facet is None:
+            db.session.add(NoticeFacet(category=category, active_count=count))
+        elif facet.active_count != count:
+            facet.active_count = count
+        else:
+            continue
+        changed += 1
+    if changed:
+        db.session.commit()
+        logger.warning(f"Repaired {changed} notice facet counts")
+    return changed
+
+@app.route('/api/v1/notices/facets')
+def api_notice_facets():
+    """Active notice count per category, for filters on the kiosk UI"""
+    return conditional_json(get_notice_facets())
+
 @app.route('/notices')
+@conditional_page('notices')
 def notices():
     page = request.args.get('page', 1, type=int)
     category = request.args.get('category', None)
+    facets = get_notice_facets()
     
     # Base query
     query = Notice.query.filter_by(is_active=True)
+    total_notices = facets['total']
     
     # Apply category filter if specified
     if category and category != 'all':
         query = query.filter_by(category=category)
+        total_notices = facets['categories'].get(category, 0)
     
-    # Get total count for pagination
-    total_notices = query.count()
+    # Pagination comes from the maintained facet counts instead of a COUNT(*)
     total_pages = ceil(total_notices / NOTICES_PER_PAGE)
     
     # Get notices for current page
@@ -1441,12 +2014,8 @@ def notices():
         .limit(NOTICES_PER_PAGE)\
         .all()
     
-    # Get all unique categories for the filter dropdown
-    categories = db.session.query(Notice.category)\
-        .filter(Notice.category.isnot(None))\
-        .distinct()\
-        .all()
-    categories = [cat[0] for cat in categories]
+    # Categories with active notices for the filter dropdown
+    categories = list(facets['categories'])
     
     # Get current time for expiration comparison
     now = datetime.now(TIMEZONE)
@@ -1460,6 +2029,7 @@ def notices():
                          now=now)
 
 @app.route('/timetables')
+@conditional_page('timetable')
 def timetables():
     try:
         all_timetables = Timetable.query.filter_by(is_active=True).order_by(db.desc(Timetable.upload_date)).all()
@@ -1516,18 +2086,37 @@ def cleanup_expired_notices():
     
     for notice in expired_notices:
         notice.is_active = False
-        if notice.filename:
-            try:
-                file_path = os.path.join(NOTICES_UPLOAD_PATH, notice.filename)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                logger.error(f"Error deleting file for notice {notice.id}: {str(e)}")
+        # Other notices may share the stored file; purge_unused_uploads deletes it once none do
+        notice.filename = None
+        notice.original_filename = None
     
     if expired_notices:
         db.session.commit()
         logger.info(f"Cleaned up {len(expired_notices)} expired notices")
 
+def purge_unused_uploads():
+    """Delete stored uploads that no notice has used for UPLOAD_PURGE_DELAY"""
+    cutoff = datetime.now(TIMEZONE) - UPLOAD_PURGE_DELAY
+    names = [name for (name,) in db.session.query(UploadBlob.name)
+             .filter(UploadBlob.released_at < cutoff, UploadBlob.ref_count <= 0)]
+    removed = 0
+    for name in names:
+        # Saving the same bytes again touches the file before the new notice claims its name.
+        # The row is kept, so the file is purged later if that notice is never committed.
+        modified_at = upload_store.modified_at(name)
+        if modified_at and modified_at > cutoff.timestamp():
+            continue
+        # Re-checked in the delete, in case a new upload of the same file claimed it meanwhile
+        result = db.session.execute(
+            db.delete(UploadBlob).where(UploadBlob.name == name, UploadBlob.ref_count <= 0)
+        )
+        db.session.commit()
+        if result.rowcount and upload_store.remove(name):
+            removed += 1
+    if removed:
+        logger.info(f"Purged {removed} unused uploads")
+    return removed
+
 def fix_timetable_data():
     """Check and fix any timetables with invalid JSON data"""
     try:
@@ -1551,11 +2140,97 @@ def fix_timetable_data():
         logger.error(f"Error fixing timetable data: {str(e)}", exc_info=True)
         return False
 
+# Housekeeping runs on an interval in the background instead of on every request
+maintenance_scheduler = MaintenanceScheduler(app)
+maintenance_scheduler.job('cleanup_expired_notices')(cleanup_expired_notices)
+# Check for and fix any timetables with invalid JSON data
+maintenance_scheduler.job('fix_timetable_data')(fix_timetable_data)
+maintenance_scheduler.job('purge_unused_uploads')(purge_unused_uploads)
+# Recount the notice facets in case a write bypassed the ORM
+maintenance_scheduler.job('rebuild_notice_facets')(rebuild_notice_facets)
+
 @app.before_request
 def before_request():
-    cleanup_expired_notices()
-    # Check for and fix any timetables with invalid JSON data
-    fix_timetable_data()
+    maintenance_scheduler.ensure_started()
+
+@app.cli.group('maintenance')
+def maintenance_commands():
+    """Run or inspect the background maintenance jobs."""
+
+@maintenance_commands.command('run')
+@click.option('--job', 'jobs', multiple=True, help='Only run the named job (repeatable).')
+def maintenance_run(jobs):
+    """Run maintenance jobs now, e.g. from cron with MAINTENANCE_MODE=cron."""
+    unknown = [name for name in jobs if name not in maintenance_scheduler.jobs]
+    if unknown:
+        raise click.BadParameter(f"Unknown job(s): {', '.join(unknown)}", param_hint='--job')
+    results = maintenance_scheduler.run(names=jobs or None, force=True)
+    if results is None:
+        click.echo('Maintenance is already running in another process.')
+        sys.exit(1)
+    for name, result in results.items():
+        state = 'ok' if result['ok'] else f"failed: {result['error']}"
+        click.echo(f"{name}: {state} ({result['duration_ms']} ms)")
+
+@maintenance_commands.command('status')
+def maintenance_status():
+    """Show when each maintenance job last ran and how long it took."""
+    status = maintenance_scheduler.status()
+    click.echo(f"Last run: {status.get('last_run') or 'never'}")
+    for name, result in status.get('jobs', {}).items():
+        state = 'ok' if result.get('ok') else f"failed: {result.get('error')}"
+        click.echo(f"{name}: {result.get('last_run')} - {state} ({result.get('duration_ms')} ms)")
+
+def backfill_photo_variants():
+    """Resize photos stored before variants existed; returns ``(converted, skipped)``
+
+    Each notice is committed on its own, so an interrupted run can simply be repeated.
+    The full-size originals lose their reference and are purged like any unused upload.
+    """
+    converted = skipped = 0
+    notice_ids = [notice_id for notice_id, in db.session.query(Notice.id)
+                  .filter(Notice.photo_filename.isnot(None), Notice.photo_filename != '',
+                          Notice.photo_variants.is_(None))]
+    for notice_id in notice_ids:
+        notice = db.session.get(Notice, notice_id)
+        path = upload_store.path(notice.photo_filename)
+        variants = photo_variants(path, notice.photo_filename) if os.path.isfile(path) else None
+        if not variants:
+            skipped += 1
+            continue
+        names = {width: upload_store.save(data, 'webp') for width, data in variants.items()}
+        notice.photo_filename = names[max(names)]
+        notice.photo_variants = json.dumps(names)
+        db.session.commit()
+        converted += 1
+    logger.info(f"Backfilled photo variants of {converted} notices, skipped {skipped}")
+    return converted, skipped
+
+@app.cli.group('photos')
+def photo_commands():
+    """Manage the stored notice photos."""
+
+@photo_commands.command('backfill')
+def photos_backfill():
+    """Store photos uploaded before resizing existed as resized variants."""
+    converted, skipped = backfill_photo_variants()
+    click.echo(f"Converted {converted} photo(s), skipped {skipped} missing or undecodable.")
+
+@app.route('/assets/<filename>')
+def asset(filename):
+    """Built CSS/JS bundle, cached for a year since its name changes with its content"""
+    return asset_bundles.send(filename)
+
+@app.cli.group('assets')
+def asset_commands():
+    """Build the fingerprinted CSS/JS bundles."""
+
+@asset_commands.command('build')
+def assets_build():
+    """Minify and fingerprint the bundles, with gzip/brotli copies, e.g. as a deploy step."""
+    manifest = asset_bundles.build()
+    for name, filename in sorted(manifest.items()):
+        click.echo(f"{name}: {filename}")
 
 # Error handlers
 @app.errorhandler(404)
@@ -1643,39 +2318,17 @@ def edit_notice(id):
         if 'file' in request.files and request.files['file'].filename:
             file = request.files['file']
             if file.filename and allowed_file(file.filename, 'notice'):
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(NOTICES_UPLOAD_PATH, filename)
-                file.save(file_path)
-                notice.filename = filename
+                store_notice_file(notice, file)
         
         # Handle photo upload/removal
+        # Photo files no notice uses any more are purged by the purge_unused_uploads job
         if 'remove_photo' in request.form and request.form['remove_photo'] == 'true':
-            # Remove the existing photo file if it exists
-            if notice.photo_filename:
-                try:
-                    photo_path = os.path.join(NOTICES_UPLOAD_PATH, notice.photo_filename)
-                    if os.path.exists(photo_path):
-                        os.remove(photo_path)
-                except Exception as e:
-                    logger.error(f"Error removing photo file: {str(e)}")
             notice.photo_filename = None
+            notice.photo_variants = None
         elif 'photo' in request.files and request.files['photo'].filename:
             photo = request.files['photo']
             if photo.filename and allowed_file(photo.filename, 'notice'):
-                # Remove the existing photo file if it exists
-                if notice.photo_filename:
-                    try:
-                        old_photo_path = os.path.join(NOTICES_UPLOAD_PATH, notice.photo_filename)
-                        if os.path.exists(old_photo_path):
-                            os.remove(old_photo_path)
-                    except Exception as e:
-                        logger.error(f"Error removing old photo file: {str(e)}")
-                
-                # Save the new photo
-                photo_filename = secure_filename(photo.filename)
-                photo_path = os.path.join(NOTICES_UPLOAD_PATH, photo_filename)
-                photo.save(photo_path)
-                notice.photo_filename = photo_filename
+                store_notice_photo(notice, photo)
         
         # Handle expiration date
         expiration_date = request.form.get('expiration_date')
@@ -1722,11 +2375,28 @@ def edit_timetable(id):
                     file_path = os.path.join(TIMETABLES_UPLOAD_PATH, filename)
                     file.save(file_path)
                     
-                    # Process the new timetable
-                    schedule_data, sections = process_timetable(file_path)
+                    # Process the new timetable, reusing the sheets that didn't change
+                    schedule_data, sections, fingerprints = process_timetable(
+                        file_path, previous=previous_sheet_results(timetable))
+                    # Diffed against the entry rows, since those are what the displays read
+                    diff = diff_schedules(schedule_from_entries(timetable), json.loads(schedule_data))
+                    clashes = check_timetable_clashes(schedule_data)
                     timetable.filename = filename
                     timetable.schedule_data = validate_schedule_data(schedule_data)
                     timetable.sections = validate_schedule_data(sections)
+                    timetable.sheet_fingerprints = fingerprints
+                    timetable.clash_report = json.dumps(clashes)
+                    register_sections(json.loads(sections), rename=True)
+                    if diff:
+                        # New content gets a new upload date so every worker recompiles its schedule index
+                        timetable.upload_date = datetime.now(TIMEZONE)
+                        replace_timetable_entries(timetable, sections=set(diff))
+                    for section, changes in diff.items():
+                        logger.info(f"Timetable {timetable.id} section {section}: {len(changes['added'])} added, "
+                                    f"{len(changes['removed'])} removed, {len(changes['changed'])} changed")
+                    flash(f"{len(diff)} section(s) changed", 'info')
+                    if clashes['total']:
+                        flash(f"{clashes['total']} room/faculty clash(es) found in the new timetable", 'error')
             
             db.session.commit()
             flash('Timetable updated successfully!', 'success')
@@ -1769,15 +2439,8 @@ def add_holiday():
         holiday.description = description if description else None
         holiday.is_active = True
         
-        # Handle affected sections
-        if affected_sections:
-            # Check if "ALL_CLASSES" is selected
-            if "ALL_CLASSES" in affected_sections:
-                holiday.affected_sections = None  # Affects all sections
-            else:
-                holiday.affected_sections = json.dumps(affected_sections)
-        else:
-            holiday.affected_sections = None  # Affects all sections
+        # Handle affected sections; none or "ALL_CLASSES" affects all sections
+        holiday.set_sections([] if "ALL_CLASSES" in affected_sections else affected_sections)
         
         db.session.add(holiday)
         db.session.commit()
@@ -1794,8 +2457,8 @@ def add_holiday():
 def edit_holiday(id):
     holiday = Holiday.query.get_or_404(id)
     
-    # Get available sections dynamically from the latest Excel file
-    available_sections = get_dynamic_sections_from_excel()
+    # Sections of the active timetable, saved at upload time
+    available_sections = get_timetable_sections()
     
     if request.method == 'POST':
         try:
@@ -1809,15 +2472,8 @@ def edit_holiday(id):
                 flash('Start date cannot be after end date', 'error')
                 return redirect(url_for('edit_holiday', id=id))
             
-            # Handle affected sections
-            if affected_sections:
-                # Check if "ALL_CLASSES" is selected
-                if "ALL_CLASSES" in affected_sections:
-                    holiday.affected_sections = None  # Affects all sections
-                else:
-                    holiday.affected_sections = json.dumps(affected_sections)
-            else:
-                holiday.affected_sections = None  # Affects all sections
+            # Handle affected sections; none or "ALL_CLASSES" affects all sections
+            holiday.set_sections([] if "ALL_CLASSES" in affected_sections else affected_sections)
             
             db.session.commit()
             flash('Holiday updated successfully!', 'success')
@@ -1848,48 +2504,23 @@ def toggle_holiday(id):
     flash(f'Holiday {status} successfully', 'success')
     return redirect(url_for('admin'))
 
-def get_dynamic_sections_from_excel():
-    """Dynamically read sections from the latest Excel timetable file"""
+def get_timetable_sections():
+    """Sections of the latest active timetable, as stored when it was uploaded"""
     try:
-        # Get the latest active timetable
-        latest_timetable = Timetable.query.filter_by(is_active=True).order_by(db.desc(Timetable.upload_date)).first()
+        latest_timetable = Timetable.query.filter_by(is_active=True)\
+            .options(db.load_only(Timetable.sections))\
+            .order_by(db.desc(Timetable.upload_date))\
+            .first()
         
-        if not latest_timetable or not latest_timetable.filename:
-            logger.warning("No active timetable found for dynamic section reading")
+        if not latest_timetable or not latest_timetable.sections:
+            logger.warning("No active timetable found for section listing")
             return []
         
-        # Construct the file path
-        file_path = os.path.join(TIMETABLES_UPLOAD_PATH, latest_timetable.filename)
-        
-        if not os.path.exists(file_path):
-            logger.error(f"Timetable file not found: {file_path}")
-            return []
-        
-        # Read sections from the Excel file
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
-        if file_ext == '.csv':
-            # For CSV, return a default section
-            return ["Default"]
-        elif file_ext in ['.xlsx', '.xls']:
-            # Read all sheets from Excel file
-            excel_file = pd.ExcelFile(file_path)
-            sheets = excel_file.sheet_names
-            
-            if not sheets:
-                logger.error("No sheets found in Excel file")
-                return []
-            
-            # Return sheet names as sections
-            sections = [sheet.strip() for sheet in sheets if sheet.strip()]
-            logger.info(f"Dynamic sections found: {sections}")
-            return sections
-        else:
-            logger.error(f"Unsupported file type for dynamic section reading: {file_ext}")
-            return []
+        sections = json.loads(latest_timetable.sections)
+        return [section.strip() for section in sections if section and section.strip()]
             
     except Exception as e:
-        logger.error(f"Error reading dynamic sections from Excel: {str(e)}", exc_info=True)
+        logger.error(f"Error reading timetable sections: {str(e)}", exc_info=True)
         return []
 
 if __name__ == '__main__':
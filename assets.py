@@ -0,0 +1,312 @@
+"""
+Fingerprinted static asset bundles.
+
+Pages used to link each stylesheet and script separately and unversioned, so
+every kiosk reload revalidated all of them. ``flask assets build`` concatenates
+the files of each bundle, strips comments and whitespace, and writes the result
+as ``<bundle>.<hash>.<ext>`` with precompressed ``.gz`` (and ``.br`` when the
+brotli package is installed) siblings, listed in a manifest.
+
+Templates ask ``asset_urls(bundle)`` for the URLs to include. It returns the
+bundle once it is built, and the source files otherwise, so development needs
+no build step. Bundles are served with a year of immutable caching, since any
+change produces a new name.
+
+The minifiers are deliberately conservative: strings, template literals and
+regular expressions are copied as they are, and whitespace is only removed
+where it can't change the meaning of the code.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+from werkzeug.exceptions import NotFound
+
+try:
+    import brotli
+except ImportError:  # Only gzip siblings are written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bundle name -> static files, in the order pages included them
+BUNDLES = {
+    'base.css': ['css/styles.css', 'css/pdf-viewer.css', 'css/chatbot.css'],
+    'base.js': ['js/scripts.js', 'js/pdf-viewer.js', 'js/chatbot.js'],
+    'styles.css': ['css/styles.css'],
+    'notices.css': ['css/styles.css', 'css/pdf-viewer.css'],
+    'notices.js': ['js/pdf-viewer.js'],
+    'index.js': ['js/display-stream.js', 'js/section-switcher.js', 'js/notice-window.js'],
+    'display.js': ['js/display-stream.js'],
+}
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MANIFEST = 'manifest.json'
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Whitespace next to these characters can go; see _minify
+CSS_PUNCTUATION = frozenset('{};,>')
+JS_PUNCTUATION = frozenset('{}()[];,:=?!&|*%')
+# Newlines after these never end a statement, so dropping them can't change automatic semicolons
+JS_NEWLINE_SAFE_BEFORE = frozenset('{([,;')
+JS_NEWLINE_SAFE_AFTER = frozenset('})]')
+# A "/" after these characters or keywords starts a regular expression, not a division
+JS_REGEX_AFTER = frozenset('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = frozenset(('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                               'throw', 'case', 'do', 'else', 'yield', 'await'))
+
+
+def _skip_quoted(text, i):
+    """Index after the string starting at ``text[i]``"""
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        if text[i] == '\\':
+            i += 1
+        elif text[i] == '\n':
+            break  # Unterminated; leave the rest to the parser
+        i += 1
+    return i + 1
+
+
+def _skip_template(text, i):
+    """Index after the template literal starting at ``text[i]``, including nested ``${...}``"""
+    i += 1
+    while i < len(text) and text[i] != '`':
+        if text[i] == '\\':
+            i += 2
+        elif text.startswith('${', i):
+            i = _skip_expression(text, i + 2)
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_expression(text, i):
+    """Index after the ``}`` closing a template substitution that starts at ``text[i]``"""
+    depth = 0
+    while i < len(text):
+        char = text[i]
+        if char in '\'"':
+            i = _skip_quoted(text, i)
+            continue
+        if char == '`':
+            i = _skip_template(text, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return i
+
+
+def _skip_regex(text, i):
+    """Index after the regular expression literal (and flags) starting at ``text[i]``"""
+    i += 1
+    in_class = False
+    while i < len(text):
+        char = text[i]
+        if char == '\\':
+            i += 1
+        elif char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+        elif char == '\n':
+            break
+        i += 1
+    i += 1
+    while i < len(text) and (text[i].isalnum() or text[i] == '_'):
+        i += 1
+    return i
+
+
+def _starts_regex(out):
+    """Whether a ``/`` following the minified output so far starts a regular expression"""
+    tail = ''.join(out[-16:]).rstrip()
+    if tail.endswith(('++', '--')):
+        return False  # Postfix increment or decrement, so the "/" divides; "a + +b" keeps its space
+    if not tail or tail[-1] in JS_REGEX_AFTER:
+        return True
+    start = len(tail)
+    while start and (tail[start - 1].isalnum() or tail[start - 1] in '_$'):
+        start -= 1
+    return tail[start:] in JS_REGEX_KEYWORDS
+
+
+def _minify(text, javascript):
+    out = []
+    pending = None  # Whitespace seen since the last token: ' ' or '\n'
+    punctuation = JS_PUNCTUATION if javascript else CSS_PUNCTUATION
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char.isspace():
+            pending = '\n' if (char == '\n' or pending == '\n') and javascript else (pending or ' ')
+            i += 1
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = len(text) if end == -1 else end + 2
+            if javascript and '\n' in text[i:end]:
+                pending = '\n'
+            else:
+                pending = pending or ' '
+            i = end
+            continue
+        if javascript and text.startswith('//', i):
+            end = text.find('\n', i)
+            i = len(text) if end == -1 else end
+            continue
+
+        if pending and out:
+            previous = out[-1][-1]
+            if pending == '\n':
+                keep = previous not in JS_NEWLINE_SAFE_BEFORE and char not in JS_NEWLINE_SAFE_AFTER
+            else:
+                # "a - -b" and "a + +b" need their space
+                keep = (previous not in punctuation and char not in punctuation) or \
+                    (previous in '+-' and char in '+-')
+            if keep:
+                out.append(pending)
+        pending = None
+
+        if char in '\'"':
+            end = _skip_quoted(text, i)
+        elif javascript and char == '`':
+            end = _skip_template(text, i)
+        elif javascript and char == '/' and _starts_regex(out):
+            end = _skip_regex(text, i)
+        else:
+            end = i + 1
+            if not javascript and char == '}' and out and out[-1] == ';':
+                out.pop()  # Last declaration of a block needs no semicolon
+        out.append(text[i:end])
+        i = end
+    return ''.join(out)
+
+
+def minify_css(text):
+    return _minify(text, javascript=False)
+
+
+def minify_js(text):
+    return _minify(text, javascript=True)
+
+
+def build_bundles(static_folder, output_dir, bundles=None):
+    """Write every bundle and its compressed siblings to ``output_dir`` and return the manifest.
+
+    Files of the previous build are kept, so pages cached before a deploy still
+    find their bundles; anything older is removed.
+    """
+    bundles = bundles or BUNDLES
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)
+
+    manifest = {}
+    for name, sources in bundles.items():
+        stem, extension = os.path.splitext(name)
+        minify = minify_js if extension == '.js' else minify_css
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                parts.append(minify(f.read()))
+        # Scripts are joined with a semicolon in case one ends without it
+        content = (';\n' if extension == '.js' else '\n').join(parts).encode('utf-8')
+
+        filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+        path = os.path.join(output_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(content)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(content, 9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(content, quality=11))
+        manifest[name] = filename
+        logger.info(f"Built {filename} from {len(sources)} files "
+                    f"({sum(os.path.getsize(os.path.join(static_folder, s)) for s in sources)} -> {len(content)} bytes)")
+
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    keep = set(manifest.values()) | set(previous.values())
+    for filename in os.listdir(output_dir):
+        base = filename[:-3] if filename.endswith(('.gz', '.br')) else filename
+        if filename != MANIFEST and base not in keep:
+            os.remove(os.path.join(output_dir, filename))
+    return manifest
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class AssetBundles:
+    """Resolve bundle names to URLs and serve built bundles, precompressed when the client accepts it."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.output_dir = None
+        self._manifest = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('ASSETS_OUTPUT', os.environ.get('ASSETS_OUTPUT', os.path.join(app.static_folder, 'dist')))
+        self.output_dir = app.config['ASSETS_OUTPUT']
+        app.add_template_global(self.urls, 'asset_urls')
+        app.extensions['assets'] = self
+
+    @property
+    def manifest(self):
+        # Read once per process; `flask assets build` runs before the workers start
+        if self._manifest is None:
+            self._manifest = load_manifest(self.output_dir)
+        return self._manifest
+
+    def build(self):
+        self._manifest = build_bundles(self.app.static_folder, self.output_dir)
+        return self._manifest
+
+    def urls(self, name):
+        """URLs to include for bundle ``name``: the built bundle, or its source files before a build"""
+        filename = self.manifest.get(name)
+        if filename:
+            return [url_for('asset', filename=filename)]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    def send(self, filename):
+        """Response for a built bundle file, using a precompressed sibling the client accepts"""
+        if filename not in self.manifest.values():
+            raise NotFound()
+        mimetype = mimetypes.guess_type(filename)[0]
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.exists(os.path.join(self.output_dir, filename + suffix)):
+                response = send_from_directory(self.output_dir, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(self.output_dir, filename, mimetype=mimetype)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,193 @@
+"""
+Recognizers for the time and day cells of uploaded timetables.
+
+Workbooks repeat the same few dozen raw values ("9:00 AM", "10.30", "Mon")
+thousands of times, so each distinct value is parsed once and remembered in a
+bounded LRU memo. Times are recognized with precompiled regular expressions
+that mirror the ``strptime`` formats the parser used to try one after another,
+and result in minutes since midnight. The parser counts which format each
+value matched, which shows what the registrar's workbooks actually contain.
+"""
+import re
+import threading
+from collections import Counter, OrderedDict
+
+# Field patterns as used by time.strptime, so matching stays the same
+_H = r'(?P<H>2[0-3]|[0-1]\d|\d)'
+_I = r'(?P<I>1[0-2]|0[1-9]|[1-9])'
+_M = r'(?P<M>[0-5]\d|\d)'
+_S = r'(?P<S>[0-5]\d|\d)'  # strptime accepts leap seconds, but datetime() then rejects them
+_P = r'(?P<p>am|pm)'
+
+# (format name, pattern), tried in this order
+TIME_FORMATS = [
+    ('%H:%M', rf'{_H}:{_M}'),
+    ('%H.%M', rf'{_H}\.{_M}'),
+    ('%H:%M:%S', rf'{_H}:{_M}:{_S}'),
+    ('%H.%M.%S', rf'{_H}\.{_M}\.{_S}'),
+    ('%I:%M %p', rf'{_I}:{_M}\s+{_P}'),
+    ('%I:%M%p', rf'{_I}:{_M}{_P}'),
+    ('%I.%M %p', rf'{_I}\.{_M}\s+{_P}'),
+    ('%I %p', rf'{_I}\s+{_P}'),
+    ('%I:%M:%S %p', rf'{_I}:{_M}:{_S}\s+{_P}'),
+    ('%Hh%M', rf'{_H}h{_M}'),
+    ('%H:%M hrs', rf'{_H}:{_M}\s+hrs'),
+    ('%H hrs', rf'{_H}\s+hrs'),
+    ('%H%M', rf'{_H}{_M}'),
+    ('%I%M%p', rf'{_I}{_M}{_P}'),
+    ('%I:%M', rf'{_I}:{_M}'),
+    ('%I.%M', rf'{_I}\.{_M}'),
+]
+_TIME_RECOGNIZERS = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in TIME_FORMATS]
+_NUMBER = re.compile(r'(?=\.?\d)\d*\.?\d*')
+_RANGE = re.compile(r'(.+?)\s*(?:-|–|\bto\b)\s*(.+)', re.IGNORECASE)
+
+_MISSING = {'', 'nan', 'null', 'none', 'n/a'}
+
+DAY_ALIASES = {
+    'mon': 'Monday', 'm': 'Monday', '1': 'Monday', 'monday': 'Monday',
+    'tue': 'Tuesday', 'tues': 'Tuesday', 't': 'Tuesday', '2': 'Tuesday', 'tuesday': 'Tuesday',
+    'wed': 'Wednesday', 'w': 'Wednesday', '3': 'Wednesday', 'wednesday': 'Wednesday',
+    'thu': 'Thursday', 'thur': 'Thursday', 'thurs': 'Thursday', 'th': 'Thursday', '4': 'Thursday', 'thursday': 'Thursday',
+    'fri': 'Friday', 'f': 'Friday', '5': 'Friday', 'friday': 'Friday',
+    'sat': 'Saturday', 's': 'Saturday', '6': 'Saturday', 'saturday': 'Saturday',
+    'sun': 'Sunday', 'su': 'Sunday', '0': 'Sunday', '7': 'Sunday', 'sunday': 'Sunday'
+}
+_NUMBERED_DAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _match_minutes(match):
+    fields = match.groupdict()
+    minute = int(fields.get('M') or 0)
+    if fields.get('I') is not None:
+        hour = int(fields['I']) % 12
+        if (fields.get('p') or '').lower() == 'pm':
+            hour += 12
+    else:
+        hour = int(fields['H'])
+    return hour * 60 + minute
+
+
+def recognize_time(text):
+    """Return ``(minutes since midnight, format name)`` for one time string, or ``(None, None)``."""
+    text = text.strip()
+    if text.startswith('-'):
+        text = text[1:].strip()
+
+    for name, recognizer in _TIME_RECOGNIZERS:
+        match = recognizer.fullmatch(text)
+        if match:
+            return _match_minutes(match), name
+
+    # Bare numbers: a fraction of a day (Excel time serials) or hours
+    if _NUMBER.fullmatch(text):
+        value = float(text)
+        if 0 <= value < 1:
+            return int(value * 24) * 60 + int((value * 24 * 60) % 60), 'day fraction'
+        if value <= 24:
+            hours = int(value)
+            return (hours % 24) * 60 + int((value - hours) * 60), 'hours'
+    return None, None
+
+
+def recognize_day(text):
+    """Return ``(weekday name, how it matched)`` for one day string, or ``(None, None)``."""
+    text = text.strip().lower()
+    if text in _MISSING:
+        return None, None
+    if text in DAY_ALIASES:
+        return DAY_ALIASES[text], 'name'
+    for alias, day in DAY_ALIASES.items():
+        if alias in text:
+            return day, 'partial'
+    try:
+        number = int(float(text))
+    except (ValueError, OverflowError):
+        return None, None
+    if 0 <= number <= 7:
+        return _NUMBERED_DAYS[number], 'number'
+    return None, None
+
+
+class CellParser:
+    """Memoizing front for the recognizers, with counts of the formats seen."""
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.format_counts = Counter()
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, kind, text, recognize):
+        key = (kind, text)
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            entry = recognize(text)
+            with self._lock:
+                self.misses += 1
+                self._memo[key] = entry
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+        result, matched = entry
+        with self._lock:
+            self.format_counts[f"{kind}:{matched or 'unrecognized'}"] += 1
+        return result
+
+    def time_minutes(self, value):
+        """Minutes since midnight of a single time cell, or None."""
+        text = str(value).strip()
+        if text.lower() in _MISSING:
+            return None
+        return self._lookup('time', text, recognize_time)
+
+    def time_range(self, value):
+        """``(start, end)`` minutes of a '9:00 AM - 10:00 AM' style cell, or None."""
+        text = str(value).strip()
+        match = _RANGE.fullmatch(text)
+        if not match:
+            return None
+        start, end = self.time_minutes(match.group(1)), self.time_minutes(match.group(2))
+        if start is None or end is None:
+            return None
+        return start, end
+
+    def day(self, value):
+        """Full weekday name of a day cell, or None."""
+        return self._lookup('day', str(value), recognize_day)
+
+    def snapshot(self):
+        """The counters as they are now, for ``stats(since=...)``"""
+        with self._lock:
+            return Counter(self.format_counts), self.hits, self.misses
+
+    def stats(self, since=None):
+        """Formats seen and memo hits over the parser's life, or since a ``snapshot()``"""
+        with self._lock:
+            formats, hits, misses = Counter(self.format_counts), self.hits, self.misses
+            distinct_values = len(self._memo)
+        if since is not None:
+            formats -= since[0]  # Also drops counts a clear() in between made negative
+            hits = max(hits - since[1], 0)
+            misses = max(misses - since[2], 0)
+        total = hits + misses
+        return {
+            'formats': dict(formats.most_common()),
+            'distinct_values': distinct_values,
+            'memo_hit_ratio': round(hits / total, 3) if total else None
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self.format_counts.clear()
+            self.hits = self.misses = 0
+
+
+# Shared by every parse in this process
+cell_parser = CellParser()
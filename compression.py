@@ -0,0 +1,115 @@
+"""
+gzip/brotli compression of rendered pages and JSON.
+
+Responses of a compressible type are encoded with the best encoding the
+client accepts (brotli when the package is installed, otherwise gzip) once
+they are larger than ``COMPRESS_MIN_SIZE``. Streams, file downloads and
+responses that are already encoded are passed through, and a view can opt
+out with ``@compression.exempt``.
+
+Every compressible response varies on ``Accept-Encoding``. Strong ETags of
+encoded bodies are made weak, because the bytes differ from the identity
+representation they were computed on. Conditional requests still match them,
+since ``If-None-Match`` uses weak comparison.
+
+``compress`` and ``encoded_response`` let the page cache store each encoded
+page next to the plain one, so a cached page is compressed once per encoding
+instead of on every hit.
+"""
+import gzip
+import os
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'text/html', 'text/plain', 'text/css', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml',
+))
+
+
+class Compression:
+    """Compress responses in ``after_request`` according to ``Accept-Encoding``."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.min_size = 500
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self.encodings = ['gzip']
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESSION', os.environ.get('COMPRESSION', 'on').lower() in ('1', 'true', 'on'))
+        app.config.setdefault('COMPRESS_MIN_SIZE', int(os.environ.get('COMPRESS_MIN_SIZE', 500)))
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 5)
+
+        self.enabled = app.config['COMPRESSION']
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.gzip_level = app.config['COMPRESS_GZIP_LEVEL']
+        self.brotli_quality = app.config['COMPRESS_BROTLI_QUALITY']
+        # Server preference, used when the client accepts several equally
+        self.encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+        self.app = app
+        app.after_request(self.after_request)
+        app.extensions['compression'] = self
+
+    @staticmethod
+    def exempt(view):
+        """Decorator keeping a view's responses uncompressed, e.g. event streams"""
+        view.compression_exempt = True
+        return view
+
+    def negotiate(self):
+        """Encoding to use for the current request, or None for identity"""
+        if not self.enabled:
+            return None
+        return request.accept_encodings.best_match(self.encodings)
+
+    def should_compress(self, body_size, mimetype):
+        return self.enabled and mimetype in COMPRESSIBLE_MIMETYPES and body_size >= self.min_size
+
+    def compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, self.gzip_level, mtime=0)
+
+    def encoded_response(self, body, content_type, encoding):
+        """Response for a body that is already compressed with ``encoding``"""
+        response = Response(body, content_type=content_type)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def after_request(self, response):
+        if not self.enabled or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+
+        view = self.app.view_functions.get(request.endpoint)
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')
+                or getattr(view, 'compression_exempt', False)):
+            return response
+
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        response.set_data(self.compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
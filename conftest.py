@@ -0,0 +1,57 @@
+"""
+Shared test setup: the app runs against a throwaway instance folder.
+
+``app`` reads these settings when it is imported, so they are set here, before
+any test module is collected. Test scripts that use the database import this
+module first as well, so running them directly is just as safe.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Always a fresh folder, even when INSTANCE_PATH points at a real one
+os.environ['INSTANCE_PATH'] = tempfile.mkdtemp(prefix='noticeboard-tests-')
+atexit.register(shutil.rmtree, os.environ['INSTANCE_PATH'], ignore_errors=True)
+# No background jobs touching the database while tests run
+os.environ['MAINTENANCE_MODE'] = 'off'
+
+
+def reset_database():
+    """Empty every table of the throwaway database and invalidate what was cached from it"""
+    from app import app, db, content_versions
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    content_versions.bump(*content_versions.topics)
+
+
+def add_notice(title, **fields):
+    """Commit an active 'General' notice"""
+    from app import app, db, Notice
+
+    fields.setdefault('description', 'Test notice')
+    fields.setdefault('category', 'General')
+    with app.app_context():
+        db.session.add(Notice(title=title, **fields))
+        db.session.commit()
+
+
+@contextmanager
+def rendered_templates():
+    """Names of the templates the app renders inside the block"""
+    from flask import template_rendered
+    from app import app
+
+    templates = []
+
+    def record(sender, template, context, **extra):
+        templates.append(template.name)
+
+    template_rendered.connect(record, app)
+    try:
+        yield templates
+    finally:
+        template_rendered.disconnect(record, app)
@@ -0,0 +1,113 @@
+"""
+Change tracking for the content shown on kiosk displays.
+
+Every committed change to a tracked model (notices, holidays, timetables) bumps
+a per-topic version. Versions live as tiny files in the instance folder and are
+replaced atomically, so a bump in one gunicorn worker is visible to all others
+with a single ``os.stat`` per topic and no locking. The display stream uses them
+to push change events to kiosks.
+"""
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class ContentVersions:
+    """Per-topic version tokens shared across workers through the filesystem."""
+
+    def __init__(self, app=None):
+        self.directory = None
+        self._topics_by_model = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CONTENT_VERSION_DIR', os.path.join(app.instance_path, 'versions'))
+        self.directory = app.config['CONTENT_VERSION_DIR']
+        os.makedirs(self.directory, exist_ok=True)
+        app.extensions['content_versions'] = self
+
+        event.listen(Session, 'after_flush', self._collect_flushed)
+        event.listen(Session, 'do_orm_execute', self._collect_bulk)
+        event.listen(Session, 'after_commit', self._publish)
+        event.listen(Session, 'after_rollback', self._discard)
+
+    @property
+    def topics(self):
+        return sorted(set(self._topics_by_model.values()))
+
+    def track(self, model, topic):
+        """Bump ``topic`` whenever rows of ``model`` are committed."""
+        self._topics_by_model[model] = topic
+        path = self._path(topic)
+        if not os.path.exists(path):
+            self.bump(topic)
+
+    def _path(self, topic):
+        return os.path.join(self.directory, topic)
+
+    def bump(self, *topics):
+        for topic in topics:
+            path = self._path(topic)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(uuid.uuid4().hex)
+                # A new inode on every replace makes the change visible through stat alone
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Could not bump content version for {topic}: {str(e)}")
+
+    def get(self, topic):
+        try:
+            st = os.stat(self._path(topic))
+        except OSError:
+            return '0'
+        return f"{st.st_ino:x}-{st.st_mtime_ns:x}"
+
+    def last_modified(self, *topics):
+        """UTC time of the most recent change to any of ``topics``."""
+        latest = 0
+        for topic in topics:
+            try:
+                latest = max(latest, os.stat(self._path(topic)).st_mtime)
+            except OSError:
+                continue
+        return datetime.fromtimestamp(int(latest), timezone.utc)
+
+    def snapshot(self):
+        """Current version token of every tracked topic."""
+        return {topic: self.get(topic) for topic in self.topics}
+
+    def _pending(self, session):
+        return session.info.setdefault('changed_content_topics', set())
+
+    def _collect_flushed(self, session, flush_context):
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            topic = self._topics_by_model.get(type(obj))
+            if topic:
+                self._pending(session).add(topic)
+
+    def _collect_bulk(self, orm_execute_state):
+        # Query.update()/delete() bypass the flush, so catch them here
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        topic = self._topics_by_model.get(mapper.class_) if mapper is not None else None
+        if topic:
+            self._pending(orm_execute_state.session).add(topic)
+
+    def _publish(self, session):
+        topics = session.info.pop('changed_content_topics', None)
+        if topics:
+            self.bump(*topics)
+
+    def _discard(self, session):
+        session.info.pop('changed_content_topics', None)
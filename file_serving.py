@@ -0,0 +1,90 @@
+"""
+Serving stored notice attachments.
+
+Responses support byte ranges (206) and conditional GETs, and advertise
+``Accept-Ranges`` so the browser PDF viewer can fetch only the pages it shows.
+Content-addressed files get their hash as a strong ETag, which stays the same
+across workers and restores, unlike one derived from the file's mtime.
+
+A front proxy can send the bytes instead of a Python worker:
+
+- ``FILE_OFFLOAD=x-accel-redirect`` (nginx) answers with an ``X-Accel-Redirect``
+  to ``FILE_OFFLOAD_PREFIX`` + file name. Map that prefix to the upload
+  directory in an ``internal`` location.
+- ``FILE_OFFLOAD=x-sendfile`` (Apache, lighttpd) answers with the file's path
+  in ``X-Sendfile``.
+
+The view still runs first in every mode, so its path and type checks apply.
+"""
+import logging
+import mimetypes
+import os
+import stat
+from urllib.parse import quote
+
+from flask import request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+from upload_store import is_blob_name
+
+logger = logging.getLogger(__name__)
+
+OFFLOAD_MODES = ('', 'x-accel-redirect', 'x-sendfile')
+
+
+class FileServer:
+    """Send files from a directory with range and conditional GET support, or hand them to the proxy."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.offload = ''
+        self.accel_prefix = '/internal/uploads/'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('FILE_OFFLOAD', os.environ.get('FILE_OFFLOAD', ''))
+        app.config.setdefault('FILE_OFFLOAD_PREFIX', os.environ.get('FILE_OFFLOAD_PREFIX', '/internal/uploads/'))
+
+        self.offload = app.config['FILE_OFFLOAD'].lower()
+        if self.offload not in OFFLOAD_MODES:
+            raise ValueError(f"FILE_OFFLOAD must be one of {', '.join(repr(mode) for mode in OFFLOAD_MODES)}")
+        self.accel_prefix = app.config['FILE_OFFLOAD_PREFIX'].rstrip('/') + '/'
+        app.extensions['file_server'] = self
+
+    def send(self, directory, filename, mimetype=None, as_attachment=False, download_name=None):
+        """Response sending ``filename`` from ``directory``; raises NotFound when it isn't a stored file."""
+        path = safe_join(os.path.abspath(directory), filename)
+        if path is None:
+            raise NotFound()
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            raise NotFound()
+        if not stat.S_ISREG(file_stat.st_mode):
+            raise NotFound()
+
+        mimetype = mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        if self.offload == 'x-accel-redirect':
+            response = self.app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = self.accel_prefix + quote(filename)
+            disposition = 'attachment' if as_attachment else 'inline'
+            response.headers.set('Content-Disposition', disposition, filename=download_name or filename)
+            return response
+
+        # The content hash is a stable strong validator; other files get werkzeug's mtime-based one
+        etag = os.path.splitext(filename)[0] if is_blob_name(filename) else True
+        sendfile = self.offload == 'x-sendfile'
+        response = send_file(
+            path, request.environ, mimetype=mimetype, as_attachment=as_attachment,
+            download_name=download_name or filename, etag=etag, last_modified=file_stat.st_mtime,
+            conditional=not sendfile, use_x_sendfile=sendfile, response_class=self.app.response_class
+        )
+        if sendfile:
+            # Answer 304 here, but leave ranges to the server that sends the bytes
+            return response.make_conditional(request.environ)
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
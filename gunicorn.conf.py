@@ -0,0 +1,24 @@
+# Gunicorn settings, picked up automatically by `gunicorn app:app`.
+# Kiosks hold a long-lived /stream/display connection each, so sync workers
+# (one request at a time) are not an option.
+#
+# gthread (built in) spends one thread per open stream. The pool is sized from
+# DISPLAY_SCREENS, the number of kiosks in the fleet, plus GUNICORN_REQUEST_THREADS
+# kept free for pages and API calls; DISPLAY_STREAM_LIMIT makes the app turn
+# further streams away (the kiosks poll instead) so those threads stay free.
+# Set GUNICORN_WORKER_CLASS=gevent after `pip install gevent` to hold streams
+# without threads; the limit is then off.
+import os
+from math import ceil
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+display_screens = int(os.environ.get('DISPLAY_SCREENS', 300))
+request_threads = int(os.environ.get('GUNICORN_REQUEST_THREADS', 16))
+threads = int(os.environ.get('GUNICORN_THREADS', ceil(display_screens / workers) + request_threads))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+keepalive = 75
+
+if worker_class == 'gthread':
+    # Read by the app in each worker
+    os.environ.setdefault('DISPLAY_STREAM_LIMIT', str(max(1, threads - request_threads)))
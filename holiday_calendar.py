@@ -0,0 +1,146 @@
+"""
+Precomputed holiday calendar for "is this section on holiday today" checks.
+
+Every display page asks whether a section is on holiday. Instead of a date
+range query plus JSON parsing of each holiday's ``affected_sections``, active
+holidays are expanded once into a mapping of date -> affected section keys, so
+a (date, section) check is a dictionary lookup. Dates are kept sorted as well,
+which answers "next holiday for this section" with a bisect.
+
+Calendars are cached per process keyed by the ``holidays`` content version, so
+a commit from any holiday route gets a fresh key and every worker rebuilds
+lazily.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+# Marker for holidays that apply to every section
+ALL_SECTIONS = 'ALL_SECTIONS'
+
+# What the calendar keeps of a holiday; templates use the same attribute names as the model
+CalendarHoliday = namedtuple('CalendarHoliday', 'id holiday_name start_date end_date description')
+
+
+def section_key(name):
+    """Canonical form of a section name: case-folded with single spaces."""
+    return ' '.join(str(name).split()).casefold() if name else ''
+
+
+class _CalendarDay:
+    __slots__ = ('first', 'all_sections', 'by_section')
+
+    def __init__(self, holiday):
+        self.first = holiday  # Returned when no section is asked for
+        self.all_sections = None
+        self.by_section = {}
+
+    @property
+    def sections(self):
+        if self.all_sections is not None:
+            return ALL_SECTIONS
+        return frozenset(self.by_section)
+
+    def holiday_for(self, key):
+        if key is None:
+            return self.first
+        # A section's own holiday is only recorded when it comes before any all-sections one
+        return self.by_section.get(key) or self.all_sections
+
+
+class HolidayCalendar:
+    """Active holidays expanded to one entry per date."""
+
+    def __init__(self, holidays=()):
+        """``holidays`` are ``(CalendarHoliday, section keys or ALL_SECTIONS)`` pairs, in priority order."""
+        self._days = {}
+        self.holiday_count = 0
+        for holiday, keys in holidays:
+            self.holiday_count += 1
+            day = holiday.start_date
+            while day <= holiday.end_date:
+                entry = self._days.get(day)
+                if entry is None:
+                    entry = self._days[day] = _CalendarDay(holiday)
+                if keys is ALL_SECTIONS:
+                    if entry.all_sections is None:
+                        entry.all_sections = holiday
+                elif entry.all_sections is None:
+                    for key in keys:
+                        entry.by_section.setdefault(key, holiday)
+                day += timedelta(days=1)
+        self._dates = sorted(self._days)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from ``(id, name, start, end, description, section key)`` rows ordered by holiday id.
+
+        A holiday has one row per affected section, or a single row with a null key
+        when it affects all sections.
+        """
+        holidays = {}
+        for holiday_id, name, start_date, end_date, description, key in rows:
+            if holiday_id not in holidays:
+                holiday = CalendarHoliday(holiday_id, name, start_date, end_date, description)
+                holidays[holiday_id] = (holiday, set() if key else ALL_SECTIONS)
+            if key:
+                holidays[holiday_id][1].add(key)
+        return cls(
+            (holiday, keys if keys is ALL_SECTIONS else frozenset(keys))
+            for holiday, keys in holidays.values()
+        )
+
+    def __len__(self):
+        return len(self._dates)
+
+    def sections_on(self, day):
+        """Section keys on holiday on ``day``: a frozenset, ``ALL_SECTIONS`` or None."""
+        entry = self._days.get(day)
+        return entry.sections if entry is not None else None
+
+    def holiday_on(self, day, section_name=None):
+        """The holiday affecting ``section_name`` on ``day`` (any holiday without a section), or None."""
+        entry = self._days.get(day)
+        if entry is None:
+            return None
+        return entry.holiday_for(section_key(section_name) if section_name else None)
+
+    def next_holiday(self, day, section_name=None):
+        """First holiday on or after ``day`` that affects ``section_name``, or None."""
+        key = section_key(section_name) if section_name else None
+        for position in range(bisect_left(self._dates, day), len(self._dates)):
+            holiday = self._days[self._dates[position]].holiday_for(key)
+            if holiday is not None:
+                return holiday
+        return None
+
+
+class HolidayCalendarCache:
+    """Per-process calendar, rebuilt when the holidays version changes."""
+
+    def __init__(self):
+        self._version = None
+        self._calendar = None
+        self._lock = threading.Lock()
+
+    def get(self, version, build_calendar):
+        """Return the calendar for ``version``, calling ``build_calendar()`` on a miss."""
+        with self._lock:
+            if self._calendar is not None and self._version == version:
+                return self._calendar
+
+        calendar = build_calendar()
+        logger.info(f"Built holiday calendar ({calendar.holiday_count} holidays over {len(calendar)} days)")
+        with self._lock:
+            self._version = version
+            self._calendar = calendar
+        return calendar
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._calendar = None
@@ -0,0 +1,172 @@
+"""
+Background ingestion jobs for timetable uploads.
+
+Parsing a large workbook used to happen inside the upload request and could
+outlast gunicorn's worker timeout. Uploads now save the file, enqueue a job on
+a small thread pool in the worker that received it and return the job id
+straight away. Job state lives in a SQLite file in the instance folder, so any
+worker can answer ``/admin/jobs/<id>`` while another one does the parsing.
+
+With ``INGESTION_WORKERS = 0`` jobs run inline in the submitting request, which
+is what the tests and single-process development servers use.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = ('succeeded', 'failed')
+
+
+class JobStore:
+    """Job rows in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path, retention_days=7):
+        self.path = path
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, status TEXT NOT NULL, pid INTEGER, '
+            'created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT, '
+            'progress TEXT, result TEXT, error TEXT)'
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create(self, kind, progress=None):
+        now = datetime.now()
+        conn = self._connect()
+        cutoff = datetime.fromtimestamp(now.timestamp() - self.retention_days * 86400).isoformat(timespec='seconds')
+        conn.execute("DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,))
+        cursor = conn.execute(
+            'INSERT INTO jobs (kind, status, pid, created_at, progress) VALUES (?, ?, ?, ?, ?)',
+            (kind, 'queued', os.getpid(), now.isoformat(timespec='seconds'), json.dumps(progress or {}))
+        )
+        return cursor.lastrowid
+
+    def update(self, job_id, **fields):
+        for key in ('progress', 'result'):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        self._connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['progress'] = json.loads(job['progress']) if job['progress'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        pid = job.pop('pid')
+        if job['status'] not in FINISHED_STATES and not _process_alive(pid):
+            # The worker that owned the job exited before finishing it
+            job['status'] = 'failed'
+            job['error'] = job['error'] or 'Worker process exited before the job finished'
+        return job
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists but belongs to another user
+    return True
+
+
+class Job:
+    """Handle passed to a running job for reporting progress."""
+
+    def __init__(self, store, job_id, progress):
+        self.store = store
+        self.id = job_id
+        self.progress = dict(progress)
+        self.progress.setdefault('warnings', [])
+
+    def update(self, **fields):
+        self.progress.update(fields)
+        self.store.update(self.id, progress=self.progress)
+
+    def warn(self, message):
+        logger.warning(f"Job {self.id}: {message}")
+        self.progress['warnings'].append(message)
+        self.store.update(self.id, progress=self.progress)
+
+
+class JobQueue:
+    """Run submitted functions on a per-worker thread pool and record their state."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = None
+        self.workers = 2
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('INGESTION_WORKERS', int(os.environ.get('INGESTION_WORKERS', 2)))
+        os.makedirs(app.instance_path, exist_ok=True)
+        app.config.setdefault('INGESTION_JOBS_PATH', os.path.join(app.instance_path, 'jobs.sqlite'))
+
+        self.workers = app.config['INGESTION_WORKERS']
+        self.store = JobStore(app.config['INGESTION_JOBS_PATH'])
+        app.extensions['ingestion'] = self
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ingestion')
+            return self._executor
+
+    def submit(self, kind, func, *args, progress=None):
+        """Queue ``func(job, *args)`` and return the job id.
+
+        The return value of ``func`` becomes the job result; an exception marks
+        the job failed with its message.
+        """
+        job_id = self.store.create(kind, progress)
+        job = Job(self.store, job_id, progress or {})
+        if self.workers > 0:
+            self._get_executor().submit(self._run, job, func, args)
+        else:
+            self._run(job, func, args)
+        return job_id
+
+    def _run(self, job, func, args):
+        started = time_module.perf_counter()
+        self.store.update(job.id, status='running', started_at=datetime.now().isoformat(timespec='seconds'))
+        try:
+            with self.app.app_context():
+                result = func(job, *args)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            self.store.update(job.id, status='failed', error=str(e),
+                              finished_at=datetime.now().isoformat(timespec='seconds'))
+            return
+        self.store.update(job.id, status='succeeded', result=result,
+                          finished_at=datetime.now().isoformat(timespec='seconds'))
+        logger.info(f"Job {job.id} finished in {time_module.perf_counter() - started:.2f}s")
+
+    def get(self, job_id):
+        return self.store.get(job_id)
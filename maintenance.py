@@ -0,0 +1,187 @@
+"""
+Background maintenance scheduler for the notice board.
+
+Housekeeping jobs (expiring notices, repairing timetable JSON) used to run in a
+``before_request`` hook on every hit. They now run here on a fixed interval,
+either from a daemon thread inside each worker or from ``flask maintenance run``
+invoked by cron. A file lock makes sure only one gunicorn worker runs the jobs
+at a time, and the outcome of every run is written to a small JSON status file
+so all workers (and the CLI) see the same last-run times and durations.
+
+``MAINTENANCE_MODE`` is ``thread`` (the default), ``cron`` or ``off``; the last
+two never start the thread, which is what tests and one-off scripts want.
+"""
+import json
+import logging
+import os
+import threading
+import time as time_module
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows development servers run a single process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MODES = ('thread', 'cron', 'off')
+
+
+class MaintenanceScheduler:
+    """Run registered maintenance jobs on an interval, once across all workers."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.jobs = {}
+        self.interval = 300
+        self.mode = 'thread'
+        self.lock_path = None
+        self.status_path = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._local_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('MAINTENANCE_INTERVAL', int(os.environ.get('MAINTENANCE_INTERVAL', 300)))
+        app.config.setdefault('MAINTENANCE_MODE', os.environ.get('MAINTENANCE_MODE', 'thread'))
+        os.makedirs(app.instance_path, exist_ok=True)
+        app.config.setdefault('MAINTENANCE_LOCK_FILE', os.path.join(app.instance_path, 'maintenance.lock'))
+        app.config.setdefault('MAINTENANCE_STATUS_FILE', os.path.join(app.instance_path, 'maintenance.json'))
+
+        self.interval = app.config['MAINTENANCE_INTERVAL']
+        self.mode = app.config['MAINTENANCE_MODE'].lower()
+        if self.mode not in MODES:
+            raise ValueError(f"MAINTENANCE_MODE must be one of {', '.join(MODES)}")
+        self.lock_path = app.config['MAINTENANCE_LOCK_FILE']
+        self.status_path = app.config['MAINTENANCE_STATUS_FILE']
+        app.extensions['maintenance'] = self
+
+    def job(self, name):
+        """Decorator registering a function as a named maintenance job."""
+        def decorator(func):
+            self.jobs[name] = func
+            return func
+        return decorator
+
+    @contextmanager
+    def _exclusive(self):
+        """Yield True if this process won the cross-worker lock, False otherwise."""
+        if not self._local_lock.acquire(blocking=False):
+            yield False
+            return
+        lock_file = None
+        try:
+            if fcntl is not None:
+                lock_file = open(self.lock_path, 'a')
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    yield False
+                    return
+            yield True
+        finally:
+            if lock_file is not None:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                finally:
+                    lock_file.close()
+            self._local_lock.release()
+
+    def status(self):
+        """Return the last recorded run, or an empty status if none exists."""
+        try:
+            with open(self.status_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'last_run': None, 'jobs': {}}
+
+    def _write_status(self, status):
+        tmp_path = f"{self.status_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(status, f, indent=2)
+        os.replace(tmp_path, self.status_path)
+
+    def is_due(self, status=None):
+        status = status or self.status()
+        if not status.get('last_run'):
+            return True
+        try:
+            last_run = datetime.fromisoformat(status['last_run'])
+        except (TypeError, ValueError):
+            return True
+        return (datetime.now() - last_run).total_seconds() >= self.interval
+
+    def run(self, names=None, force=False):
+        """Run the given jobs (all by default) under the cross-worker lock.
+
+        Returns the per-job results, or None when another worker holds the lock
+        or, unless ``force`` is set, the jobs ran less than an interval ago.
+        Running only some jobs records their results but leaves the schedule of
+        the full run alone.
+        """
+        with self._exclusive() as acquired:
+            if not acquired:
+                logger.debug("Maintenance lock held by another worker - skipping run")
+                return None
+
+            status = self.status()
+            if not force and not self.is_due(status):
+                return None
+
+            results = {}
+            for name, func in self.jobs.items():
+                if names and name not in names:
+                    continue
+                started = time_module.perf_counter()
+                error = None
+                try:
+                    with self.app.app_context():
+                        func()
+                except Exception as e:
+                    error = str(e)
+                    logger.error(f"Maintenance job '{name}' failed: {error}", exc_info=True)
+                duration_ms = round((time_module.perf_counter() - started) * 1000, 2)
+                results[name] = {
+                    'last_run': datetime.now().isoformat(timespec='seconds'),
+                    'duration_ms': duration_ms,
+                    'ok': error is None,
+                    'error': error
+                }
+                logger.info(f"Maintenance job '{name}' finished in {duration_ms} ms")
+
+            status.setdefault('jobs', {}).update(results)
+            if not names:
+                status['last_run'] = datetime.now().isoformat(timespec='seconds')
+            try:
+                self._write_status(status)
+            except OSError as e:
+                logger.error(f"Could not write maintenance status: {str(e)}")
+            return results
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Maintenance scheduler error: {str(e)}", exc_info=True)
+            self._stop.wait(self.interval)
+
+    def ensure_started(self):
+        """Start the background thread once per process when running in thread mode."""
+        if self._thread is not None or self.mode != 'thread':
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='maintenance-scheduler', daemon=True)
+            self._thread.start()
+            logger.info(f"Maintenance scheduler started (interval: {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
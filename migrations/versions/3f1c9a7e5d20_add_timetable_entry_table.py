@@ -0,0 +1,88 @@
+"""Add timetable_entry table and backfill it from schedule_data
+
+Revision ID: 3f1c9a7e5d20
+Revises: b4bf2fc0b1cc
+Create Date: 2026-10-18 10:12:41.512307
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7e5d20'
+down_revision = 'b4bf2fc0b1cc'
+branch_labels = None
+depends_on = None
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _minutes(time_str):
+    parsed = datetime.strptime(time_str.strip(), '%I:%M %p')
+    return parsed.hour * 60 + parsed.minute
+
+
+def _entries(timetable_id, schedule_data):
+    """Rows for one timetable's schedule JSON; unparseable classes are skipped"""
+    try:
+        schedule = json.loads(schedule_data) if schedule_data else {}
+    except ValueError:
+        return []
+    if not isinstance(schedule, dict):
+        return []
+
+    rows = []
+    for section_name, section_schedule in schedule.items():
+        for cls_data in section_schedule or []:
+            try:
+                start, end = cls_data['time'].split(' - ')
+                rows.append({
+                    'timetable_id': timetable_id,
+                    'section': section_name,
+                    'weekday': DAYS.index(cls_data.get('day')),
+                    'start_minute': _minutes(start),
+                    'end_minute': _minutes(end),
+                    'subject': cls_data.get('subject'),
+                    'room': cls_data.get('room'),
+                    'faculty': cls_data.get('faculty')
+                })
+            except (KeyError, AttributeError, TypeError, ValueError):
+                continue
+    return rows
+
+
+def upgrade():
+    timetable_entry = op.create_table('timetable_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('timetable_id', sa.Integer(), nullable=False),
+    sa.Column('section', sa.String(length=100), nullable=False),
+    sa.Column('weekday', sa.SmallInteger(), nullable=False),
+    sa.Column('start_minute', sa.SmallInteger(), nullable=False),
+    sa.Column('end_minute', sa.SmallInteger(), nullable=False),
+    sa.Column('subject', sa.String(length=200), nullable=True),
+    sa.Column('room', sa.String(length=100), nullable=True),
+    sa.Column('faculty', sa.String(length=200), nullable=True),
+    sa.ForeignKeyConstraint(['timetable_id'], ['timetable.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('timetable_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_timetable_entry_lookup', ['timetable_id', 'section', 'weekday', 'start_minute'], unique=False)
+
+    # Backfill from the existing JSON blobs
+    connection = op.get_bind()
+    timetables = connection.execute(sa.text('SELECT id, schedule_data FROM timetable')).fetchall()
+    for timetable_id, schedule_data in timetables:
+        rows = _entries(timetable_id, schedule_data)
+        if rows:
+            op.bulk_insert(timetable_entry, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('timetable_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_timetable_entry_lookup')
+
+    op.drop_table('timetable_entry')
@@ -0,0 +1,26 @@
+"""Add sheet_fingerprints column to timetable table
+
+Revision ID: 7b2e4d91c6a8
+Revises: 3f1c9a7e5d20
+Create Date: 2026-10-18 14:05:12.930417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d91c6a8'
+down_revision = '3f1c9a7e5d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sheet_fingerprints', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.drop_column('sheet_fingerprints')
@@ -0,0 +1,62 @@
+"""Add upload_blob reference counts and notice.original_filename
+
+Revision ID: a6d4e2f9c3b7
+Revises: f3c6a9d2b8e1
+Create Date: 2026-10-18 18:05:52.117364
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d4e2f9c3b7'
+down_revision = 'f3c6a9d2b8e1'
+branch_labels = None
+depends_on = None
+
+
+def _upload_names(filename, photo_filename, photo_variants):
+    names = {filename, photo_filename}
+    try:
+        names.update(json.loads(photo_variants).values() if photo_variants else ())
+    except (ValueError, AttributeError):
+        pass
+    return names - {None, ''}
+
+
+def upgrade():
+    upload_blob = op.create_table(
+        'upload_blob',
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.create_index('ix_upload_blob_released_at', 'upload_blob', ['released_at'], unique=False)
+
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_filename', sa.String(length=200), nullable=True))
+        batch_op.create_index('ix_notice_filename', ['filename'], unique=False)
+
+    # Files stored before this revision keep their names; they are counted the same way
+    conn = op.get_bind()
+    conn.execute(sa.text('UPDATE notice SET original_filename = filename WHERE filename IS NOT NULL'))
+    counts = {}
+    for row in conn.execute(sa.text('SELECT filename, photo_filename, photo_variants FROM notice')):
+        for name in _upload_names(*row):
+            counts[name] = counts.get(name, 0) + 1
+    if counts:
+        op.bulk_insert(upload_blob, [{'name': name, 'ref_count': count, 'released_at': None}
+                                     for name, count in sorted(counts.items())])
+
+
+def downgrade():
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.drop_index('ix_notice_filename')
+        batch_op.drop_column('original_filename')
+
+    op.drop_index('ix_upload_blob_released_at', table_name='upload_blob')
+    op.drop_table('upload_blob')
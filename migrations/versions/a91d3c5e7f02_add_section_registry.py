@@ -0,0 +1,81 @@
+"""Add section registry and holiday_section table, backfilled from the JSON columns
+
+Revision ID: a91d3c5e7f02
+Revises: 7b2e4d91c6a8
+Create Date: 2026-10-18 15:21:47.208833
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91d3c5e7f02'
+down_revision = '7b2e4d91c6a8'
+branch_labels = None
+depends_on = None
+
+
+def _key(name):
+    return ' '.join(str(name).split()).casefold()
+
+
+def _names(json_text):
+    """Section names of a JSON list column; anything else has no names"""
+    try:
+        names = json.loads(json_text) if json_text else []
+    except ValueError:
+        return []
+    if not isinstance(names, list):
+        return []
+    return [str(name).strip() for name in names if name and str(name).strip()]
+
+
+def upgrade():
+    section = op.create_table(
+        'section',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key')
+    )
+    holiday_section = op.create_table(
+        'holiday_section',
+        sa.Column('holiday_id', sa.Integer(), nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['holiday_id'], ['holiday.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['section_id'], ['section.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('holiday_id', 'section_id')
+    )
+    op.create_index('ix_holiday_section_section', 'holiday_section', ['section_id', 'holiday_id'], unique=False)
+
+    conn = op.get_bind()
+    # Timetables oldest first, so the latest upload's spelling of a section wins
+    names_by_key = {}
+    for (sections,) in conn.execute(sa.text('SELECT sections FROM timetable ORDER BY upload_date, id')):
+        for name in _names(sections):
+            names_by_key[_key(name)] = name
+    holidays = conn.execute(sa.text('SELECT id, affected_sections FROM holiday')).fetchall()
+    for _, affected_sections in holidays:
+        for name in _names(affected_sections):
+            names_by_key.setdefault(_key(name), name)
+
+    # Ids are left to the database so PostgreSQL's section_id_seq stays ahead of them
+    if names_by_key:
+        op.bulk_insert(section, [{'key': key, 'name': name} for key, name in names_by_key.items()])
+    ids = dict(conn.execute(sa.text('SELECT key, id FROM section')).fetchall())
+    rows = []
+    for holiday_id, affected_sections in holidays:
+        section_ids = {ids[_key(name)] for name in _names(affected_sections)}
+        rows.extend({'holiday_id': holiday_id, 'section_id': section_id} for section_id in sorted(section_ids))
+    if rows:
+        op.bulk_insert(holiday_section, rows)
+
+
+def downgrade():
+    op.drop_index('ix_holiday_section_section', table_name='holiday_section')
+    op.drop_table('holiday_section')
+    op.drop_table('section')
@@ -0,0 +1,26 @@
+"""Add clash_report column to timetable table
+
+Revision ID: c4e8f1a2b6d9
+Revises: a91d3c5e7f02
+Create Date: 2026-10-18 16:02:33.517204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8f1a2b6d9'
+down_revision = 'a91d3c5e7f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('clash_report', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.drop_column('clash_report')
@@ -0,0 +1,42 @@
+"""Add composite indexes for the notice, timetable and holiday queries of public pages
+
+Revision ID: d2a7b9e4c1f3
+Revises: c4e8f1a2b6d9
+Create Date: 2026-10-18 16:48:09.661250
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7b9e4c1f3'
+down_revision = 'c4e8f1a2b6d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.create_index('ix_notice_active_upload', ['is_active', 'upload_date'], unique=False)
+        batch_op.create_index('ix_notice_category', ['category', 'is_active', 'upload_date'], unique=False)
+        batch_op.create_index('ix_notice_active_expiration', ['is_active', 'expiration_date'], unique=False)
+
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.create_index('ix_timetable_active_upload', ['is_active', 'upload_date'], unique=False)
+
+    with op.batch_alter_table('holiday', schema=None) as batch_op:
+        batch_op.create_index('ix_holiday_active_dates', ['is_active', 'start_date', 'end_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('holiday', schema=None) as batch_op:
+        batch_op.drop_index('ix_holiday_active_dates')
+
+    with op.batch_alter_table('timetable', schema=None) as batch_op:
+        batch_op.drop_index('ix_timetable_active_upload')
+
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.drop_index('ix_notice_active_expiration')
+        batch_op.drop_index('ix_notice_category')
+        batch_op.drop_index('ix_notice_active_upload')
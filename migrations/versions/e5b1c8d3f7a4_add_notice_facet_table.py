@@ -0,0 +1,42 @@
+"""Add notice_facet table with active notice counts per category
+
+Revision ID: e5b1c8d3f7a4
+Revises: d2a7b9e4c1f3
+Create Date: 2026-10-18 17:12:36.480192
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c8d3f7a4'
+down_revision = 'd2a7b9e4c1f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    notice_facet = op.create_table(
+        'notice_facet',
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('active_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('category')
+    )
+
+    # Notices without is_active count as active, as they do for the flush listeners
+    notice = sa.table('notice', sa.column('id'), sa.column('category'), sa.column('is_active', sa.Boolean))
+    category = sa.func.coalesce(notice.c.category, '')
+    conn = op.get_bind()
+    counts = conn.execute(
+        sa.select(category, sa.func.count(notice.c.id))
+        .where(sa.or_(notice.c.is_active == sa.true(), notice.c.is_active.is_(None)))
+        .group_by(category)
+    ).fetchall()
+    if counts:
+        op.bulk_insert(notice_facet, [{'category': category, 'active_count': count}
+                                      for category, count in counts])
+
+
+def downgrade():
+    op.drop_table('notice_facet')
@@ -0,0 +1,26 @@
+"""Add photo_variants column to notice
+
+Revision ID: f3c6a9d2b8e1
+Revises: e5b1c8d3f7a4
+Create Date: 2026-10-18 17:41:03.925716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c6a9d2b8e1'
+down_revision = 'e5b1c8d3f7a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('photo_variants', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notice', schema=None) as batch_op:
+        batch_op.drop_column('photo_variants')
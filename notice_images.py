@@ -0,0 +1,84 @@
+"""
+Resized variants of notice photos.
+
+Photos used to be stored as uploaded, so a 4-8 MB phone picture was sent to
+every kiosk to fill a 120px card. Uploads are now decoded once, rotated
+upright from their EXIF orientation and encoded as WebP at a few widths with
+no metadata, ready to be saved in the upload store. Templates offer the
+widths through ``srcset`` and the browser downloads the smallest one that
+fills the card.
+
+Pillow is optional. Without it, or for files it can't decode and for animated
+GIFs, photos are stored as uploaded and templates fall back to the single file.
+"""
+import logging
+from io import BytesIO
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Photos are kept as uploaded
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Widths written for each photo: thumbnail, card and full view
+PHOTO_WIDTHS = (320, 640, 1600)
+PHOTO_QUALITY = 80
+
+
+def images_supported():
+    return Image is not None
+
+
+def _prepared(image):
+    """Upright copy of a decoded photo in a mode WebP can store"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def photo_variants(source, filename):
+    """Resized WebP copies of the photo in ``source`` (a path or file object).
+
+    Returns ``{width: file object}``, largest last, or None when the photo can't be
+    processed and should be stored as uploaded instead. ``filename`` is for logging.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(source) as image:
+            if getattr(image, 'is_animated', False):
+                return None
+            image = _prepared(image)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning(f"Could not decode photo {filename}, storing it as uploaded: {str(e)}")
+        return None
+
+    variants = {}
+    for width in PHOTO_WIDTHS:
+        width = min(width, image.width)  # Never upscale
+        if width in variants:
+            continue
+        if width == image.width:
+            resized = image
+        else:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+        encoded = BytesIO()
+        # Saved without exif/icc arguments, so no camera or location metadata is kept
+        resized.save(encoded, 'WEBP', quality=PHOTO_QUALITY, method=4)
+        encoded.seek(0)
+        variants[width] = encoded
+    logger.info(f"Encoded photo {filename} as {len(variants)} variants up to {max(variants)}px wide")
+    return variants
+
+
+def srcset(variants, url_for_name):
+    """``srcset`` attribute value for ``{width: file name}`` variants"""
+    return ', '.join(
+        f"{url_for_name(name)} {width}w"
+        for width, name in sorted((int(width), name) for width, name in variants.items())
+    )
@@ -0,0 +1,175 @@
+"""
+Rendered-page cache for the public display routes.
+
+Every kiosk in the same minute gets identical HTML from ``index`` and
+``section_view``, so the rendered body is cached and reused. Keys include the
+content versions of the data a page shows, so any admin commit that touches
+notices, holidays or the timetable makes the old entries unreachable in every
+worker without an explicit purge; they simply age out.
+
+Backends are pluggable: anything with ``get(key)``, ``set(key, value, ttl)``
+and ``clear()`` works. ``memory`` is a per-worker LRU, ``sqlite`` is a small
+file database in the instance folder shared by all workers on one host.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time as time_module
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Thread-safe LRU with per-entry expiry, private to one worker."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time_module.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time_module.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """Cache table in a local SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS page_cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, content_type TEXT, expires REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._connect().execute(
+                'SELECT value, content_type FROM page_cache WHERE key = ? AND expires >= ?',
+                (key, time_module.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache read failed: {str(e)}")
+            return None
+        return (row[0], row[1]) if row else None
+
+    def set(self, key, value, ttl):
+        body, content_type = value
+        now = time_module.time()
+        try:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?, ?)',
+                         (key, body, content_type, now + ttl))
+            conn.execute('DELETE FROM page_cache WHERE expires < ?', (now,))
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache write failed: {str(e)}")
+
+    def clear(self):
+        try:
+            self._connect().execute('DELETE FROM page_cache')
+        except sqlite3.Error as e:
+            logger.warning(f"Page cache clear failed: {str(e)}")
+
+
+class PageCache:
+    """Front for the configured backend that keeps hit/miss counters."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAGE_CACHE_BACKEND', os.environ.get('PAGE_CACHE_BACKEND', 'memory'))
+        app.config.setdefault('PAGE_CACHE_TTL', 60)
+        app.config.setdefault('PAGE_CACHE_MAX_ENTRIES', 256)
+        app.config.setdefault('PAGE_CACHE_PATH', os.path.join(app.instance_path, 'page_cache.sqlite'))
+
+        backend = app.config['PAGE_CACHE_BACKEND']
+        if backend == 'sqlite':
+            os.makedirs(os.path.dirname(app.config['PAGE_CACHE_PATH']), exist_ok=True)
+            self.backend = SQLiteBackend(app.config['PAGE_CACHE_PATH'])
+        elif backend == 'memory':
+            self.backend = MemoryBackend(app.config['PAGE_CACHE_MAX_ENTRIES'])
+        elif backend in ('none', '', None):
+            self.backend = None
+        elif not isinstance(backend, str):
+            self.backend = backend  # A custom backend object
+        else:
+            raise ValueError(f"Unknown PAGE_CACHE_BACKEND: {backend}")
+        self.ttl = app.config['PAGE_CACHE_TTL']
+        app.extensions['page_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def peek(self, key):
+        """Cached value of ``key`` without counting a hit or miss"""
+        return self.backend.get(key)
+
+    def count(self, hit):
+        """Count one request as a hit or a miss"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        value = self.peek(key)
+        self.count(value is not None)
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value, self.ttl)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'backend': type(self.backend).__name__ if self.backend is not None else None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else None
+            }
@@ -0,0 +1,278 @@
+"""
+Compiled "now/next" lookup for the active timetable.
+
+Classes come either from normalized ``timetable_entry`` rows or, for timetables
+stored before those existed, from the ``schedule_data`` JSON blob of
+``{section: [class, ...]}``. Either way they are compiled once into per
+(section, weekday) arrays of start/end minutes sorted by start time. Current and
+upcoming classes are then found with a bisect instead of a full scan.
+
+Compiled indexes are cached per process, keyed by timetable id, upload date and
+content version, so any timetable change gets a fresh key and every worker
+rebuilds lazily. The room and faculty index is built from the same classes on
+first use and shares the schedule index's lifetime.
+"""
+import json
+import logging
+import threading
+from bisect import bisect_right
+from datetime import datetime, time
+
+logger = logging.getLogger(__name__)
+
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def time_to_minutes(time_str):
+    """Convert a '9:00 AM' style time to minutes since midnight."""
+    parsed = datetime.strptime(time_str.strip(), '%I:%M %p').time()
+    return parsed.hour * 60 + parsed.minute
+
+
+def minutes_to_time(minutes):
+    """Format minutes since midnight the way timetable labels are stored ('9:00 AM')."""
+    return time(minutes // 60, minutes % 60).strftime('%I:%M %p').lstrip('0')
+
+
+def parse_time_range(label):
+    """Split a '9:00 AM - 10:00 AM' label into (start, end) minutes; raises ValueError."""
+    time_range = label.split(' - ')
+    if len(time_range) != 2:
+        raise ValueError(f"Invalid time range format: {label}")
+    return time_to_minutes(time_range[0]), time_to_minutes(time_range[1])
+
+
+class ScheduleIndex:
+    """Schedule entries grouped by (section, weekday) and sorted by start minute."""
+
+    def __init__(self, sections, grouped):
+        self.sections = list(sections)
+        self._resources = None
+        self._slots = {}
+        for key, entries in grouped.items():
+            entries.sort(key=lambda entry: entry[0])
+            starts = [entry[0] for entry in entries]
+            self._slots[key] = (starts, entries)
+
+    @classmethod
+    def from_schedule(cls, schedule):
+        """Compile a ``{section: [class, ...]}`` mapping as stored in ``schedule_data``."""
+        if not isinstance(schedule, dict):
+            logger.error("Schedule data is not a section mapping - index is empty")
+            return cls([], {})
+
+        grouped = {}
+        for section_name, section_schedule in schedule.items():
+            for cls_data in section_schedule or []:
+                try:
+                    start_minutes, end_minutes = parse_time_range(cls_data['time'])
+                except (KeyError, AttributeError, ValueError) as e:
+                    logger.error(f"Error parsing time for class in section {section_name}: {str(e)}")
+                    continue
+
+                info = {
+                    'subject': cls_data.get('subject'),
+                    'day': cls_data.get('day'),
+                    'time': cls_data['time'],
+                    'room': cls_data.get('room'),
+                    'section': section_name,
+                    'faculty': cls_data.get('faculty', 'Not assigned')
+                }
+                grouped.setdefault((section_name, cls_data.get('day')), []).append((start_minutes, end_minutes, info))
+        return cls(schedule.keys(), grouped)
+
+    @classmethod
+    def from_json(cls, schedule_data):
+        return cls.from_schedule(json.loads(schedule_data) if schedule_data else {})
+
+    @classmethod
+    def from_entries(cls, entries, sections=()):
+        """Compile normalized rows with section, weekday, start/end minute, subject, room and faculty.
+
+        ``sections`` lists sections that exist even when they have no rows.
+        """
+        sections = dict.fromkeys(sections)
+        grouped = {}
+        for entry in entries:
+            sections.setdefault(entry.section, None)
+            day = DAYS[entry.weekday]
+            info = {
+                'subject': entry.subject,
+                'day': day,
+                'time': f"{minutes_to_time(entry.start_minute)} - {minutes_to_time(entry.end_minute)}",
+                'room': entry.room,
+                'section': entry.section,
+                'faculty': entry.faculty or 'Not assigned'
+            }
+            grouped.setdefault((entry.section, day), []).append((entry.start_minute, entry.end_minute, info))
+        return cls(sections.keys(), grouped)
+
+    def has_section(self, section):
+        return section in self.sections
+
+    def lookup(self, section, day, now_minutes):
+        """Return ``(current, upcoming)`` entries for a section at a minute of a day.
+
+        Each entry is a ``(start_minutes, end_minutes, info)`` tuple. Current
+        classes started at or before ``now_minutes`` and have not ended yet;
+        upcoming classes start later the same day.
+        """
+        starts, entries = self._slots.get((section, day), ((), ()))
+        split = bisect_right(starts, now_minutes)
+        current = [entry for entry in entries[:split] if now_minutes < entry[1]]
+        return current, list(entries[split:])
+
+    def entries(self):
+        """Every ``(start_minutes, end_minutes, info)`` entry of every section and day."""
+        for _, entries in self._slots.values():
+            yield from entries
+
+    @property
+    def resources(self):
+        """Room and faculty index over the same classes, built on first use."""
+        if self._resources is None:
+            self._resources = ResourceIndex(self.entries())
+        return self._resources
+
+    def boundaries(self, day):
+        """Sorted minutes of ``day`` at which any class in any section starts or ends."""
+        minutes = set()
+        for (_, slot_day), (_, entries) in self._slots.items():
+            if slot_day == day:
+                for start_minutes, end_minutes, _ in entries:
+                    minutes.add(start_minutes)
+                    minutes.add(end_minutes)
+        return sorted(minutes)
+
+
+def resource_key(name):
+    """Canonical form of a room or faculty name: case-folded with single spaces."""
+    return ' '.join(str(name).split()).casefold() if name else ''
+
+
+# Room and faculty placeholders that name no one
+UNASSIGNED_NAMES = {'', 'nan', 'none', 'n/a', 'not assigned', 'tba'}
+
+
+class _Intervals:
+    """Classes of one room or faculty on one day, sorted by start minute.
+
+    ``max_ends[i]`` is the latest end among the first ``i + 1`` classes, so the
+    classes running at a minute are found by bisecting the starts and walking
+    back only while some earlier class can still be running.
+    """
+
+    def __init__(self, entries):
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        self.entries = entries
+        self.starts = [entry[0] for entry in entries]
+        self.max_ends = []
+        latest = -1
+        for _, end_minutes, _ in entries:
+            latest = max(latest, end_minutes)
+            self.max_ends.append(latest)
+
+    def at(self, minute):
+        """``(running, upcoming)`` entries at ``minute``."""
+        split = bisect_right(self.starts, minute)
+        running = []
+        position = split - 1
+        while position >= 0 and self.max_ends[position] > minute:
+            if self.entries[position][1] > minute:
+                running.append(self.entries[position])
+            position -= 1
+        running.reverse()
+        return running, self.entries[split:]
+
+
+class ResourceIndex:
+    """Classes by room and by faculty, for "where is free" and "where is who" lookups."""
+
+    def __init__(self, entries):
+        rooms, faculty = {}, {}
+        self.room_names, self.faculty_names = {}, {}
+        for entry in entries:
+            info = entry[2]
+            for names, grouped, name in ((self.room_names, rooms, info.get('room')),
+                                         (self.faculty_names, faculty, info.get('faculty'))):
+                key = resource_key(name)
+                if key in UNASSIGNED_NAMES:
+                    continue
+                names.setdefault(key, str(name).strip())
+                grouped.setdefault((key, info['day']), []).append(entry)
+        self._rooms = {slot: _Intervals(entries) for slot, entries in rooms.items()}
+        self._faculty = {slot: _Intervals(entries) for slot, entries in faculty.items()}
+
+        # Busy rooms for each stretch of a day between two class boundaries, from one sweep
+        events_by_day = {}
+        for (key, day), intervals in self._rooms.items():
+            for start_minutes, end_minutes, _ in intervals.entries:
+                events_by_day.setdefault(day, []).extend(((start_minutes, 1, key), (end_minutes, -1, key)))
+        self._busy = {}
+        for day, events in events_by_day.items():
+            events.sort()
+            running = {}
+            boundaries, stretches = [], []
+            for position, (minute, change, key) in enumerate(events):
+                running[key] = running.get(key, 0) + change
+                if not running[key]:
+                    del running[key]
+                if position + 1 == len(events) or events[position + 1][0] != minute:
+                    boundaries.append(minute)
+                    stretches.append(frozenset(running))
+            self._busy[day] = (boundaries, stretches)
+
+    def room_day(self, room, day):
+        """Classes held in ``room`` on ``day``, by start time."""
+        intervals = self._rooms.get((resource_key(room), day))
+        return list(intervals.entries) if intervals else []
+
+    def faculty_at(self, faculty, day, minute):
+        """``(running, upcoming)`` classes of ``faculty`` at a minute of a day."""
+        intervals = self._faculty.get((resource_key(faculty), day))
+        return intervals.at(minute) if intervals else ([], [])
+
+    def busy_rooms(self, day, minute):
+        """Keys of rooms with a class running at a minute of a day."""
+        boundaries, stretches = self._busy.get(day, ((), ()))
+        position = bisect_right(boundaries, minute) - 1
+        return stretches[position] if position >= 0 else frozenset()
+
+    def free_rooms(self, day, minute):
+        """Names of known rooms without a class at a minute of a day, sorted."""
+        busy = self.busy_rooms(day, minute)
+        return sorted(name for key, name in self.room_names.items() if key not in busy)
+
+
+class ScheduleIndexCache:
+    """Per-process cache of compiled indexes keyed by (timetable id, upload date)."""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, timetable_id, upload_date, build_index, version=None):
+        """Return the compiled index, calling ``build_index()`` on a miss.
+
+        ``version`` lets callers invalidate on changes that keep the upload date,
+        such as a single class added to an existing timetable.
+        """
+        key = (timetable_id, upload_date.isoformat() if upload_date else None, version)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index is not None:
+            return index
+
+        index = build_index()
+        logger.info(f"Compiled schedule index for timetable {timetable_id} ({len(index.sections)} sections)")
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.pop(next(iter(self._indexes)))
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
@@ -0,0 +1,54 @@
+// Live updates for kiosk displays over Server-Sent Events.
+// Re-dispatches server events as 'display:change' and 'display:period' DOM
+// events and marks <body data-live-updates="on"> while the stream is connected,
+// so the periodic full-page reloads can stand down.
+(function() {
+    if (!window.EventSource) return;
+
+    // Wait before asking again after the server turned the stream away (503 when full)
+    const REFUSED_RETRY_MS = 60000;
+    let lastVersions = null;
+
+    function dispatch(name, detail) {
+        document.dispatchEvent(new CustomEvent('display:' + name, { detail: detail }));
+    }
+
+    function connect() {
+        const source = new EventSource('/stream/display');
+
+        source.addEventListener('hello', function(event) {
+            const data = JSON.parse(event.data);
+            document.body.dataset.liveUpdates = 'on';
+
+            // Catch up on anything committed while we were reconnecting
+            if (lastVersions) {
+                const changed = Object.keys(data.versions).filter(topic => lastVersions[topic] !== data.versions[topic]);
+                if (changed.length) {
+                    dispatch('change', { topics: changed, versions: data.versions });
+                }
+            }
+            lastVersions = data.versions;
+        });
+
+        source.addEventListener('change', function(event) {
+            const data = JSON.parse(event.data);
+            lastVersions = data.versions;
+            dispatch('change', data);
+        });
+
+        source.addEventListener('period', function(event) {
+            dispatch('period', JSON.parse(event.data));
+        });
+
+        // EventSource reconnects dropped streams by itself, but not refused ones;
+        // either way fall back to polling until it is back
+        source.addEventListener('error', function() {
+            document.body.dataset.liveUpdates = 'off';
+            if (source.readyState === EventSource.CLOSED) {
+                setTimeout(connect, REFUSED_RETRY_MS);
+            }
+        });
+    }
+
+    connect();
+})();
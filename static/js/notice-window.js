@@ -0,0 +1,30 @@
+// "Load More" for the notices on the home page. The page renders only the
+// newest notices; each click fetches the next window of rendered cards after
+// the cursor of the last one shown.
+(function() {
+    const button = document.getElementById('load-more-notices');
+    if (!button) return;
+
+    const grid = button.closest('.card-body').querySelector('.notices-scroll-container .row');
+
+    button.addEventListener('click', async function() {
+        button.disabled = true;
+        try {
+            const url = `${button.dataset.url}?before=${encodeURIComponent(button.dataset.cursor)}`;
+            const response = await fetch(url, { headers: { 'Accept': 'application/json' } });
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const data = await response.json();
+
+            grid.insertAdjacentHTML('beforeend', data.html);
+            if (data.next) {
+                button.dataset.cursor = data.next;
+                button.disabled = false;
+            } else {
+                button.remove();
+            }
+        } catch (error) {
+            console.error('Error loading more notices:', error);
+            button.disabled = false;
+        }
+    });
+})();
@@ -59,9 +59,16 @@ document.addEventListener('DOMContentLoaded', function() {
     // Update time remaining bars every second
     setInterval(updateTimeRemainingBars, 1000);
 
+    // Pages connected to the display stream are updated live and skip the periodic reloads
+    function liveUpdatesActive() {
+        return document.body.dataset.liveUpdates === 'on';
+    }
+
     // Auto-refresh the page every 5 minutes to get updated class information
     setTimeout(function() {
-        window.location.reload();
+        if (!liveUpdatesActive()) {
+            window.location.reload();
+        }
     }, 5 * 60 * 1000);
 
     // Initialize progress bars
@@ -90,6 +97,23 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Recompute class countdowns from their absolute start/end times, so a page
+    // revalidated from the browser cache (304) still shows the right minutes
+    function updateCountdowns() {
+        const nowSeconds = Date.now() / 1000;
+        document.querySelectorAll('[data-countdown][data-target]').forEach(elem => {
+            const text = elem.querySelector('.countdown-text');
+            const target = parseFloat(elem.dataset.target);
+            if (!text || isNaN(target)) return;
+            const minutes = Math.max(0, Math.floor((target - nowSeconds) / 60));
+            const duration = minutes < 60 ? `${minutes} minutes` : `${(minutes / 60).toFixed(1)} hours`;
+            text.textContent = elem.dataset.countdown === 'until' ? `Starts in ${duration}` : `${duration} remaining`;
+        });
+    }
+
+    updateCountdowns();
+    setInterval(updateCountdowns, 30000);
+
     // Initialize and update progress
     updateProgressBars();
     setInterval(() => {
@@ -138,7 +162,9 @@ document.addEventListener('DOMContentLoaded', function() {
     function scheduleRefresh() {
         if (refreshTimeout) clearTimeout(refreshTimeout);
         refreshTimeout = setTimeout(() => {
-            if (navigator.onLine) {
+            if (liveUpdatesActive()) {
+                scheduleRefresh(); // Check again later in case the stream drops
+            } else if (navigator.onLine) {
                 window.location.reload();
             } else {
                 scheduleRefresh(); // Try again in 30 seconds if offline
@@ -1,51 +1,178 @@
 function initializeSectionSwitcher() {
     const sectionsData = document.getElementById('sections-data');
     if (!sectionsData) return;
-    
+
     const sections = JSON.parse(sectionsData.textContent);
     let currentIndex = 0;
-    
-    function switchSection() {
-        // Update current index
-        currentIndex = (currentIndex + 1) % sections.length;
-        const nextSection = sections[currentIndex];
-        
-        // console.log(`Switching to section: ${nextSection}`);
-        
-        // Update UI
-        document.querySelectorAll('.section-name').forEach(el => {
-            el.textContent = nextSection;
-        });
-        document.getElementById('current-section-display').textContent = nextSection;
-        
-        // Load new section data
-        fetch(`/section/${encodeURIComponent(nextSection)}`)
-            .then(response => response.text())
-            .then(html => {
-                const parser = new DOMParser();
-                const doc = parser.parseFromString(html, 'text/html');
-                
-                // Check if there's a holiday message first
-                const holidayMessage = doc.querySelector('.holiday-message');
-                if (holidayMessage) {
-                    // console.log(`Holiday detected for section: ${nextSection}`);
-                    // If there's a holiday message, show it in both sections
-                    const currentHolidayHTML = holidayMessage.outerHTML;
-                    document.querySelector('.current-classes .section-content').innerHTML = currentHolidayHTML;
-                    document.querySelector('.upcoming-classes .section-content').innerHTML = currentHolidayHTML;
+
+    // Classes of every section in the rotation, fetched in one JSON request.
+    // While the display stream is connected they are only refetched after the
+    // server reports a change or a class period boundary.
+    let rotation = null;
+
+    function liveUpdatesActive() {
+        return document.body.dataset.liveUpdates === 'on';
+    }
+
+    function escapeHtml(value) {
+        const div = document.createElement('div');
+        div.textContent = value == null ? '' : String(value);
+        return div.innerHTML;
+    }
+
+    function formatDuration(seconds) {
+        const minutes = Math.max(0, Math.floor(seconds / 60));
+        return minutes < 60 ? `${minutes} minutes` : `${(minutes / 60).toFixed(1)} hours`;
+    }
+
+    function formatDate(isoDate, withWeekday) {
+        const [year, month, day] = isoDate.split('-').map(Number);
+        const options = { year: 'numeric', month: 'long', day: '2-digit' };
+        if (withWeekday) options.weekday = 'long';
+        return new Date(year, month - 1, day).toLocaleDateString('en-US', options);
+    }
+
+    function renderHoliday(holiday, upcoming) {
+        if (upcoming) {
+            return `
+                <div class="holiday-message">
+                    <div class="holiday-icon">
+                        <i class="fas fa-calendar-check fa-3x text-success"></i>
+                    </div>
+                    <h3 class="holiday-title">Classes Resume After Holiday</h3>
+                    <p class="holiday-description">
+                        Regular class schedules will resume after ${formatDate(holiday.end_date)}.
+                    </p>
+                    <div class="holiday-dates">
+                        <span class="badge bg-success">
+                            <i class="fas fa-calendar-plus me-1"></i>
+                            Classes resume: ${formatDate(holiday.end_date, true)}
+                        </span>
+                    </div>
+                </div>`;
+        }
+        return `
+            <div class="holiday-message">
+                <div class="holiday-icon">
+                    <i class="fas fa-umbrella-beach fa-3x text-warning"></i>
+                </div>
+                <h3 class="holiday-title">${escapeHtml(holiday.name)}</h3>
+                ${holiday.description ? `<p class="holiday-description">${escapeHtml(holiday.description)}</p>` : ''}
+                <div class="holiday-dates">
+                    <span class="badge bg-info">
+                        <i class="fas fa-calendar me-1"></i>
+                        ${formatDate(holiday.start_date)} - ${formatDate(holiday.end_date)}
+                    </span>
+                </div>
+                <p class="holiday-note">
+                    <i class="fas fa-info-circle me-1"></i>
+                    Classes are not running during this holiday period. Enjoy your time off!
+                </p>
+            </div>`;
+    }
+
+    function renderClassCard(cls, upcoming, elapsedSeconds) {
+        if (cls.status === 'no-classes') {
+            return `
+                <div class="class-card no-class">
+                    <div class="no-class-message">
+                        <i class="fas fa-info-circle"></i>
+                        ${upcoming ? 'No Upcoming Classes' : 'No Current Classes'}
+                    </div>
+                </div>`;
+        }
+
+        const faculty = cls.faculty && cls.faculty !== 'Not assigned' && cls.faculty !== 'nan' && cls.faculty.trim()
+            ? `<span class="detail-value">${escapeHtml(cls.faculty)}</span>`
+            : '<span class="detail-value text-muted">Not assigned</span>';
+        const countdown = upcoming
+            ? `<div class="time-indicator starts-in">
+                   <i class="fas fa-hourglass-start"></i>
+                   Starts in ${formatDuration(cls.time_until - elapsedSeconds)}
+               </div>`
+            : `<div class="time-indicator">
+                   <i class="fas fa-hourglass-half"></i>
+                   ${formatDuration(cls.time_remaining - elapsedSeconds)} remaining
+               </div>`;
+
+        return `
+            <div class="class-card">
+                <div class="class-header">
+                    <h3 class="class-title">${escapeHtml(cls.subject)}</h3>
+                    <span class="status-badge ${upcoming ? 'upcoming' : 'ongoing'}">${upcoming ? 'UPCOMING' : 'CURRENT'}</span>
+                </div>
+                <div class="class-details">
+                    <div class="detail-item">
+                        <i class="fas fa-calendar-day"></i>
+                        <span class="detail-label">Day:</span>
+                        <span class="detail-value">${escapeHtml(cls.day)}</span>
+                    </div>
+                    <div class="detail-item">
+                        <i class="fas fa-clock"></i>
+                        <span class="detail-label">Time:</span>
+                        <span class="detail-value">${escapeHtml(cls.time)}</span>
+                    </div>
+                    <div class="detail-item">
+                        <i class="fas fa-door-open"></i>
+                        <span class="detail-label">Room:</span>
+                        <span class="detail-value">${escapeHtml(cls.room)}</span>
+                    </div>
+                    <div class="detail-item">
+                        <i class="fas fa-user-tie"></i>
+                        <span class="detail-label">Faculty:</span>
+                        ${faculty}
+                    </div>
+                    ${countdown}
+                </div>
+            </div>`;
+    }
+
+    function renderClasses(classes, upcoming, elapsedSeconds) {
+        if (!classes.length) {
+            return `
+                <div class="no-items-message">
+                    <i class="fas fa-info-circle"></i>
+                    ${upcoming ? 'No upcoming classes to display' : 'No current classes to display'}
+                </div>`;
+        }
+        return classes.map(cls => renderClassCard(cls, upcoming, elapsedSeconds)).join('');
+    }
+
+    function loadRotation() {
+        if (rotation && liveUpdatesActive()) {
+            return Promise.resolve(rotation);
+        }
+
+        const names = sections.map(encodeURIComponent).join(',');
+        // no-cache revalidates with the ETag, so unchanged data comes back as a bodyless 304
+        return fetch(`/api/v1/sections/classes?names=${names}`, { cache: 'no-cache' })
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.json();
+            })
+            .then(data => {
+                rotation = { fetchedAt: Date.now(), sections: new Map() };
+                data.sections.forEach(section => rotation.sections.set(section.section, section));
+                return rotation;
+            });
+    }
+
+    function showSection(section) {
+        loadRotation()
+            .then(data => {
+                const payload = data.sections.get(section);
+                if (!payload) return;
+
+                const elapsedSeconds = (Date.now() - data.fetchedAt) / 1000;
+                const currentContainer = document.querySelector('.current-classes .section-content');
+                const upcomingContainer = document.querySelector('.upcoming-classes .section-content');
+
+                if (payload.holiday) {
+                    currentContainer.innerHTML = renderHoliday(payload.holiday, false);
+                    upcomingContainer.innerHTML = renderHoliday(payload.holiday, true);
                 } else {
-                    // console.log(`No holiday for section: ${nextSection}, showing normal classes`);
-                    // Update current classes
-                    const currentClassesContent = doc.querySelector('.current-classes .section-content');
-                    if (currentClassesContent) {
-                        document.querySelector('.current-classes .section-content').innerHTML = currentClassesContent.innerHTML;
-                    }
-                    
-                    // Update upcoming classes
-                    const upcomingClassesContent = doc.querySelector('.upcoming-classes .section-content');
-                    if (upcomingClassesContent) {
-                        document.querySelector('.upcoming-classes .section-content').innerHTML = upcomingClassesContent.innerHTML;
-                    }
+                    currentContainer.innerHTML = renderClasses(payload.current, false, elapsedSeconds);
+                    upcomingContainer.innerHTML = renderClasses(payload.upcoming, true, elapsedSeconds);
                 }
             })
             .catch(error => {
@@ -61,15 +188,50 @@ function initializeSectionSwitcher() {
                 document.querySelector('.upcoming-classes .section-content').innerHTML = errorMessage;
             });
     }
-    
+
+    function switchSection() {
+        if (!sections.length) return;
+
+        // Update current index
+        currentIndex = (currentIndex + 1) % sections.length;
+        const nextSection = sections[currentIndex];
+
+        // Update UI
+        document.querySelectorAll('.section-name').forEach(el => {
+            el.textContent = nextSection;
+        });
+        document.getElementById('current-section-display').textContent = nextSection;
+
+        showSection(nextSection);
+    }
+
+    // Notices and the section list are rendered into the page itself, so those
+    // changes need a reload; holidays only invalidate the cached section data
+    document.addEventListener('display:change', event => {
+        const topics = event.detail.topics;
+        if (topics.includes('notices') || topics.includes('timetable')) {
+            window.location.reload();
+            return;
+        }
+        rotation = null;
+        if (sections.length) showSection(sections[currentIndex]);
+    });
+
+    document.addEventListener('display:period', () => {
+        rotation = null;
+        if (sections.length) showSection(sections[currentIndex]);
+    });
+
     // Switch sections every 10 seconds (as per user request)
     setInterval(switchSection, 10000);
-    
-    // Auto-refresh the page every 5 minutes to keep class information updated
+
+    // Without a live stream, auto-refresh the page every 5 minutes to keep class information updated
     setInterval(function() {
-        window.location.reload();
+        if (!liveUpdatesActive()) {
+            window.location.reload();
+        }
     }, 5 * 60 * 1000);
 }
 
 // Initialize when DOM is loaded
-document.addEventListener('DOMContentLoaded', initializeSectionSwitcher); 
\ No newline at end of file
+document.addEventListener('DOMContentLoaded', initializeSectionSwitcher);
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the static asset bundles
+"""
+
+import gzip
+import os
+import tempfile
+
+from assets import build_bundles, load_manifest, minify_css, minify_js
+
+
+def test_minify_js_keeps_literals():
+    """Comments and indentation go; strings, templates and regexes are untouched"""
+    source = '''
+    // Greeting
+    function greet(name) {
+        /* build it */
+        const text = `Hello ${name} // not a comment`;
+        return text.replace(/\\/+/g, '/') + ' /* kept */';
+    }
+    let a = 1
+    let b = a - -1
+    '''
+    assert minify_js(source) == (
+        "function greet(name){const text=`Hello ${name} // not a comment`;"
+        "return text.replace(/\\/+/g,'/')+ ' /* kept */';}"
+        "\nlet a=1\nlet b=a - -1"
+    )
+    print("✅ Scripts minified")
+
+
+def test_minify_js_division_after_postfix():
+    """A "/" after i++ or i-- divides, so the comments and strings after it are still seen"""
+    source = 'var a = i++ / 2;\n// c /\nvar s = "x/y";\nvar b = j-- / k;\nvar r = x + /re/g.source;\n'
+    assert minify_js(source) == 'var a=i++ / 2;var s="x/y";var b=j-- / k;var r=x + /re/g.source;'
+    print("✅ Division after postfix operators kept apart from regexes")
+
+
+def test_minify_css():
+    """Comments, spaces around braces and trailing semicolons go; selectors keep their meaning"""
+    source = '''
+    /* Cards */
+    .card > .title ,  .card :hover {
+        color: red;
+        content: "a  ;  b";
+    }
+    '''
+    assert minify_css(source) == '.card>.title,.card :hover{color: red;content: "a  ;  b"}'
+    print("✅ Stylesheets minified")
+
+
+def test_build_bundles():
+    """Bundles are fingerprinted, precompressed, and the previous build is kept"""
+    with tempfile.TemporaryDirectory() as static_folder:
+        with open(os.path.join(static_folder, 'a.js'), 'w') as f:
+            f.write('var a = 1 // one\n')
+        output_dir = os.path.join(static_folder, 'dist')
+
+        first = build_bundles(static_folder, output_dir, {'app.js': ['a.js']})
+        path = os.path.join(output_dir, first['app.js'])
+        assert first['app.js'].startswith('app.') and first['app.js'].endswith('.js')
+        with gzip.open(path + '.gz') as f:
+            assert f.read() == b'var a=1'
+        assert load_manifest(output_dir) == first
+
+        with open(os.path.join(static_folder, 'a.js'), 'w') as f:
+            f.write('var a = 2\n')
+        second = build_bundles(static_folder, output_dir, {'app.js': ['a.js']})
+        assert second['app.js'] != first['app.js']
+        assert os.path.exists(path)
+    print("✅ Bundles built")
+
+
+if __name__ == "__main__":
+    test_minify_js_keeps_literals()
+    test_minify_js_division_after_postfix()
+    test_minify_css()
+    test_build_bundles()
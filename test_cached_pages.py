@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the rendered page cache of the public display pages
+"""
+
+import gzip
+
+from conftest import add_notice, rendered_templates, reset_database
+from app import app, page_cache
+
+
+def test_cache_hit():
+    """The second viewer gets the page the first one rendered"""
+    reset_database()
+    add_notice('Cached notice')
+    client = app.test_client()
+    with rendered_templates() as templates:
+        first = client.get('/')
+        assert 'index.html' in templates
+        templates.clear()
+        hits = page_cache.stats()['hits']
+        second = client.get('/')
+        assert templates == []
+    assert second.status_code == 200 and second.data == first.data
+    assert page_cache.stats()['hits'] == hits + 1
+
+    encoded = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert gzip.decompress(encoded.data) == first.data
+    print("✅ Cached page served without rendering")
+
+
+def test_miss_after_content_change():
+    """Committing a notice makes the cached page unreachable"""
+    reset_database()
+    add_notice('Old notice')
+    client = app.test_client()
+    client.get('/')
+
+    add_notice('New notice')
+    with rendered_templates() as templates:
+        response = client.get('/')
+    assert 'index.html' in templates
+    assert b'New notice' in response.data
+    print("✅ Page rendered again after a content change")
+
+
+def test_one_count_per_request():
+    """Compressed copies don't make a request count twice in the hit/miss stats"""
+    reset_database()
+    add_notice('Counted notice')
+    client = app.test_client()
+
+    def counted(**headers):
+        before = page_cache.stats()
+        client.get('/', headers=headers)
+        after = page_cache.stats()
+        return after['hits'] - before['hits'], after['misses'] - before['misses']
+
+    assert counted(**{'Accept-Encoding': 'gzip'}) == (0, 1)
+    assert counted(**{'Accept-Encoding': 'gzip'}) == (1, 0)
+    assert counted() == (1, 0)
+    assert counted(**{'Accept-Encoding': 'br'}) == (1, 0)
+    print("✅ Each request counted once")
+
+
+def test_admin_bypass():
+    """Admins always get a freshly rendered page"""
+    reset_database()
+    client = app.test_client()
+    client.get('/')
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    with rendered_templates() as templates:
+        client.get('/')
+        client.get('/')
+    assert templates.count('index.html') == 2
+    print("✅ Admin requests bypass the page cache")
+
+
+if __name__ == "__main__":
+    test_cache_hit()
+    test_miss_after_content_change()
+    test_one_count_per_request()
+    test_admin_bypass()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the timetable cell recognizers
+"""
+
+from cell_parsing import CellParser, recognize_time
+
+
+def test_recognize_time_formats():
+    """Common spellings resolve to minutes since midnight"""
+    assert recognize_time('9:00 AM') == (9 * 60, '%I:%M %p')
+    assert recognize_time('12:30 am') == (30, '%I:%M %p')
+    assert recognize_time('14:30') == (14 * 60 + 30, '%H:%M')
+    assert recognize_time('10.30') == (10 * 60 + 30, '%H.%M')
+    assert recognize_time('930') == (9 * 60 + 30, '%H%M')
+    assert recognize_time('2 PM') == (14 * 60, '%I %p')
+    assert recognize_time('0.375') == (9 * 60, 'day fraction')
+    assert recognize_time('soon') == (None, None)
+    print("✅ Time formats recognized")
+
+
+def test_parser_memo_and_stats():
+    """Repeated values are served from the memo and counted per format"""
+    parser = CellParser(max_entries=2)
+    for _ in range(3):
+        assert parser.time_minutes('9:00 AM') == 540
+    assert parser.time_range('9:00 AM - 10:00 AM') == (540, 600)
+    assert parser.day('Tues') == 'Tuesday'
+    assert parser.day('Tuesday (lab)') == 'Tuesday'
+    assert parser.time_minutes('nan') is None
+
+    stats = parser.stats()
+    assert stats['formats']['time:%I:%M %p'] == 5
+    assert stats['formats']['day:name'] == 1
+    assert stats['formats']['day:partial'] == 1
+    assert stats['distinct_values'] == 2  # Bounded by max_entries
+    print("✅ Cell parser memoizes and counts formats")
+
+
+def test_stats_since_snapshot():
+    """Counts since a snapshot cover one upload, not the life of the process"""
+    parser = CellParser()
+    parser.time_minutes('9:00 AM')
+    parser.day('Mon')
+
+    before = parser.snapshot()
+    parser.time_minutes('9:00 AM')
+    parser.time_minutes('14:30')
+    stats = parser.stats(since=before)
+    assert stats['formats'] == {'time:%I:%M %p': 1, 'time:%H:%M': 1}
+    assert stats['memo_hit_ratio'] == 0.5
+    assert parser.stats()['formats']['time:%I:%M %p'] == 2
+    print("✅ Cell parser stats scoped to a snapshot")
+
+
+if __name__ == "__main__":
+    test_recognize_time_formats()
+    test_parser_memo_and_stats()
+    test_stats_since_snapshot()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for response compression
+"""
+
+import gzip
+
+from flask import Flask, Response, jsonify, request
+
+from compression import Compression
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['COMPRESSION'] = True
+    app.config['COMPRESS_MIN_SIZE'] = 100
+    compression = Compression(app)
+
+    @app.route('/page')
+    def page():
+        return '<p>notice</p>' * 50
+
+    @app.route('/small')
+    def small():
+        return '<p>notice</p>'
+
+    @app.route('/data')
+    def data():
+        response = jsonify({'notices': ['notice'] * 50})
+        response.add_etag()
+        return response.make_conditional(request)
+
+    @app.route('/stream')
+    @compression.exempt
+    def stream():
+        return Response('data: x\n\n' * 50, mimetype='text/event-stream')
+
+    @app.route('/exempt')
+    @compression.exempt
+    def exempt():
+        return '<p>notice</p>' * 50
+
+    return app, compression
+
+
+def test_negotiation():
+    """Bodies are encoded with an encoding the client accepts, and always vary on it"""
+    app, compression = make_app()
+    client = app.test_client()
+
+    encoded = client.get('/page', headers={'Accept-Encoding': 'gzip'})
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(encoded.data) == b'<p>notice</p>' * 50
+    assert 'Accept-Encoding' in encoded.headers['Vary']
+
+    plain = client.get('/page', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    best = client.get('/page', headers={'Accept-Encoding': 'gzip, br'})
+    assert best.headers['Content-Encoding'] == compression.encodings[0]
+    print("✅ Encoding negotiated from Accept-Encoding")
+
+
+def test_skipped_responses():
+    """Small bodies, streams and exempt views are sent as they are"""
+    app, _ = make_app()
+    client = app.test_client()
+    for path in ('/small', '/stream', '/exempt'):
+        response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers, path
+    print("✅ Small, streamed and exempt responses left uncompressed")
+
+
+def test_etags():
+    """Encoded bodies get weak ETags that still answer If-None-Match"""
+    app, _ = make_app()
+    client = app.test_client()
+    response = client.get('/data', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+
+    revalidated = client.get('/data', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    print("✅ ETags weakened and revalidated")
+
+
+def test_cached_encoding():
+    """Encoded responses built from cached bodies are not compressed again"""
+    app, compression = make_app()
+    body = b'<p>notice</p>' * 50
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        encoding = compression.negotiate()
+        assert encoding == 'gzip'
+        assert compression.should_compress(len(body), 'text/html')
+        assert not compression.should_compress(len(body), 'application/pdf')
+        response = compression.encoded_response(compression.compress(body, encoding), 'text/html; charset=utf-8', encoding)
+        response = compression.after_request(response)
+        assert gzip.decompress(response.get_data()) == body
+    print("✅ Cached encodings reused as they are")
+
+
+if __name__ == "__main__":
+    test_negotiation()
+    test_skipped_responses()
+    test_etags()
+    test_cached_encoding()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for conditional GETs of the public pages
+"""
+
+from conftest import add_notice, rendered_templates, reset_database
+from app import app
+
+
+def test_not_modified_before_rendering():
+    """A matching If-None-Match gets a 304 without the page being rendered"""
+    reset_database()
+    add_notice('First')
+    client = app.test_client()
+    response = client.get('/notices')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.last_modified is not None
+
+    with rendered_templates() as templates:
+        revalidated = client.get('/notices', headers={'If-None-Match': etag})
+        by_date = client.get('/notices', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert revalidated.status_code == 304 and by_date.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert templates == []
+    print("✅ Unchanged page answered with 304 before rendering")
+
+
+def test_changed_content_changes_etag():
+    """Committing a notice gives the page a new ETag"""
+    reset_database()
+    add_notice('First')
+    client = app.test_client()
+    etag = client.get('/notices').headers['ETag']
+
+    add_notice('Second')
+    response = client.get('/notices', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert b'Second' in response.data
+    print("✅ New content changes the ETag")
+
+
+def test_admin_and_public_etags_differ():
+    """Admins see extra controls, so their copy of a page has its own ETag"""
+    reset_database()
+    client = app.test_client()
+    public = client.get('/notices').headers['ETag']
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    assert client.get('/notices', headers={'If-None-Match': public}).status_code == 200
+    print("✅ Admin pages revalidated separately")
+
+
+if __name__ == "__main__":
+    test_not_modified_before_rendering()
+    test_changed_content_changes_etag()
+    test_admin_and_public_etags_differ()
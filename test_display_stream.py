@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the kiosk display stream
+"""
+
+import json
+
+import conftest  # noqa: F401  (throwaway instance folder, before the app is imported)
+from app import app, db, content_versions
+
+
+def open_stream(client):
+    return client.get('/stream/display', buffered=False)
+
+
+def read_events(response, count):
+    """First ``count`` events of a stream as ``(event, data)``, skipping comments and retry hints"""
+    events = []
+    chunks = iter(response.response)
+    while len(events) < count:
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith('event: '):
+            name, data = chunk.strip().split('\n')
+            events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_stream_sends_changes():
+    """Kiosks get the current versions, then a change event after a commit"""
+    poll_interval = app.config['DISPLAY_STREAM_POLL_INTERVAL']
+    app.config['DISPLAY_STREAM_POLL_INTERVAL'] = 0.01
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    response = open_stream(client)
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert 'Content-Encoding' not in response.headers
+
+        [(event, hello)] = read_events(response, 1)
+        assert event == 'hello'
+        assert set(hello['versions']) == set(content_versions.topics)
+
+        content_versions.bump('notices')
+        [(event, change)] = read_events(response, 1)
+        assert event == 'change'
+        assert change['topics'] == ['notices']
+        assert change['versions']['notices'] != hello['versions']['notices']
+    finally:
+        response.close()
+        app.config['DISPLAY_STREAM_POLL_INTERVAL'] = poll_interval
+    print("✅ Display stream sends hello and change events")
+
+
+def test_stream_limit():
+    """Streams beyond DISPLAY_STREAM_LIMIT are refused until one closes"""
+    app.config['DISPLAY_STREAM_LIMIT'] = 1
+    try:
+        client = app.test_client()
+        first = open_stream(client)
+        assert first.status_code == 200
+
+        refused = open_stream(client)
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After'] == '60'
+
+        first.close()
+        again = open_stream(client)
+        assert again.status_code == 200
+        again.close()
+    finally:
+        app.config['DISPLAY_STREAM_LIMIT'] = 0
+    print("✅ Display streams limited per worker")
+
+
+if __name__ == "__main__":
+    test_stream_sends_changes()
+    test_stream_limit()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for serving notice attachments
+"""
+
+import io
+
+import conftest  # noqa: F401  (throwaway instance folder, before the app is imported)
+from app import app, db, upload_store
+
+
+def stored_pdf():
+    with app.app_context():
+        db.create_all()
+    return upload_store.save(io.BytesIO(b'%PDF-1.4 ' + b'0123456789' * 500), 'pdf')
+
+
+def test_range_requests():
+    """Attachments advertise and answer byte ranges"""
+    name = stored_pdf()
+    try:
+        client = app.test_client()
+        response = client.get(f'/preview_pdf/{name}')
+        assert response.status_code == 200
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        assert response.headers['Content-Type'] == 'application/pdf'
+
+        partial = client.get(f'/preview_pdf/{name}', headers={'Range': 'bytes=9-18'})
+        assert partial.status_code == 206
+        assert partial.headers['Content-Range'] == 'bytes 9-18/5009'
+        assert partial.data == b'0123456789'
+    finally:
+        upload_store.remove(name)
+    print("✅ Byte ranges served")
+
+
+def test_conditional_requests():
+    """The content hash is the ETag, so revalidation needs no body"""
+    name = stored_pdf()
+    try:
+        client = app.test_client()
+        response = client.get(f'/download_notice/{name}')
+        assert response.headers['ETag'] == f'"{name[:-4]}"'
+        assert client.get(f'/download_notice/{name}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+        modified = client.get(f'/download_notice/{name}', headers={'If-Modified-Since': response.headers['Last-Modified']})
+        assert modified.status_code == 304
+    finally:
+        upload_store.remove(name)
+    assert app.test_client().get(f'/download_notice/{name}').status_code == 404
+    print("✅ Conditional requests answered with 304")
+
+
+if __name__ == "__main__":
+    test_range_requests()
+    test_conditional_requests()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed holiday calendar
+"""
+
+from datetime import date
+
+from holiday_calendar import ALL_SECTIONS, HolidayCalendar
+
+
+def make_calendar():
+    return HolidayCalendar.from_rows([
+        (1, 'Diwali', date(2026, 11, 8), date(2026, 11, 10), None, None),
+        (2, 'Industrial Visit', date(2026, 11, 10), date(2026, 11, 11), 'Section A only', 'section a'),
+        (3, 'Exam Break', date(2026, 12, 1), date(2026, 12, 1), None, 'section b'),
+        (3, 'Exam Break', date(2026, 12, 1), date(2026, 12, 1), None, 'section c'),
+    ])
+
+
+def test_date_section_lookup():
+    """Dates map to the holiday affecting a section, matched case-insensitively"""
+    calendar = make_calendar()
+    assert calendar.sections_on(date(2026, 11, 9)) is ALL_SECTIONS
+    assert calendar.sections_on(date(2026, 12, 1)) == frozenset({'section b', 'section c'})
+    assert calendar.sections_on(date(2026, 11, 12)) is None
+
+    assert calendar.holiday_on(date(2026, 11, 10), 'section a').holiday_name == 'Diwali'
+    assert calendar.holiday_on(date(2026, 11, 11), 'SECTION A').holiday_name == 'Industrial Visit'
+    assert calendar.holiday_on(date(2026, 11, 11), 'Section B') is None
+    assert calendar.holiday_on(date(2026, 11, 11)).holiday_name == 'Industrial Visit'
+    print("✅ Holiday calendar lookups correct")
+
+
+def test_next_holiday():
+    """The next holiday is the first later date affecting the section"""
+    calendar = make_calendar()
+    assert calendar.next_holiday(date(2026, 11, 11), 'Section A').holiday_name == 'Industrial Visit'
+    assert calendar.next_holiday(date(2026, 11, 11), 'Section C').holiday_name == 'Exam Break'
+    assert calendar.next_holiday(date(2026, 11, 12), 'Section A') is None
+    print("✅ Next holiday found per section")
+
+
+def test_overlapping_holidays_by_id():
+    """Where holidays overlap, a section gets the first that applies to it by id"""
+    calendar = HolidayCalendar.from_rows([
+        (1, 'Sports Day', date(2026, 11, 20), date(2026, 11, 20), None, 'section a'),
+        (2, 'Founders Day', date(2026, 11, 20), date(2026, 11, 21), None, None),
+        (3, 'Lab Maintenance', date(2026, 11, 21), date(2026, 11, 21), None, 'section b'),
+    ])
+    assert calendar.holiday_on(date(2026, 11, 20), 'Section A').holiday_name == 'Sports Day'
+    assert calendar.holiday_on(date(2026, 11, 20), 'Section B').holiday_name == 'Founders Day'
+    assert calendar.holiday_on(date(2026, 11, 21), 'Section B').holiday_name == 'Founders Day'
+    print("✅ Overlapping holidays resolved by id")
+
+
+if __name__ == "__main__":
+    test_date_section_lookup()
+    test_next_holiday()
+    test_overlapping_holidays_by_id()
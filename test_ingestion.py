@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the background ingestion job queue
+"""
+
+import tempfile
+import time
+
+from flask import Flask
+
+from ingestion import JobQueue
+
+
+def make_queue(workers):
+    app = Flask(__name__, instance_path=tempfile.mkdtemp())
+    app.config['INGESTION_WORKERS'] = workers
+    return JobQueue(app)
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_progress_and_result():
+    """Progress, warnings and the return value are recorded"""
+    queue = make_queue(workers=1)
+
+    def work(job, sheets):
+        for parsed in range(1, sheets + 1):
+            job.update(sheets_parsed=parsed)
+        job.warn("Sheet 'Empty' has no usable classes")
+        return {'sheets': sheets}
+
+    job = wait_for(queue, queue.submit('timetable', work, 3))
+    assert job['status'] == 'succeeded'
+    assert job['progress']['sheets_parsed'] == 3
+    assert job['progress']['warnings'] == ["Sheet 'Empty' has no usable classes"]
+    assert job['result'] == {'sheets': 3}
+    print("✅ Job progress and result recorded")
+
+
+def test_failed_job():
+    """An exception marks the job failed with its message"""
+    queue = make_queue(workers=0)
+
+    def work(job):
+        raise ValueError("Missing required columns: subject")
+
+    job = queue.get(queue.submit('timetable', work))
+    assert job['status'] == 'failed'
+    assert job['error'] == "Missing required columns: subject"
+    print("✅ Failed job reports its error")
+
+
+def test_abandoned_job():
+    """A queued job whose worker process is gone is reported as failed"""
+    queue = make_queue(workers=0)
+    job_id = queue.store.create('timetable')
+    queue.store.update(job_id, pid=2 ** 22 + 1)
+    job = queue.get(job_id)
+    assert job['status'] == 'failed'
+    assert 'exited' in job['error']
+    assert 'pid' not in job
+    print("✅ Abandoned job reported as failed")
+
+
+if __name__ == "__main__":
+    test_job_progress_and_result()
+    test_failed_job()
+    test_abandoned_job()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the background maintenance scheduler
+"""
+
+import tempfile
+
+from flask import Flask
+
+from maintenance import MaintenanceScheduler
+
+
+def make_scheduler(mode='off', interval=300):
+    app = Flask(__name__, instance_path=tempfile.mkdtemp())
+    app.config['MAINTENANCE_MODE'] = mode
+    app.config['MAINTENANCE_INTERVAL'] = interval
+    scheduler = MaintenanceScheduler(app)
+    calls = []
+    scheduler.job('cleanup')(lambda: calls.append('cleanup'))
+    scheduler.job('purge')(lambda: calls.append('purge'))
+    return scheduler, calls
+
+
+def test_runs_once_per_interval():
+    """A full run records its time, and the next one waits for the interval"""
+    scheduler, calls = make_scheduler()
+    results = scheduler.run()
+    assert set(results) == {'cleanup', 'purge'}
+    assert all(result['ok'] for result in results.values())
+    assert scheduler.status()['last_run'] is not None
+
+    assert scheduler.run() is None
+    assert scheduler.run(force=True) is not None
+    assert calls == ['cleanup', 'purge', 'cleanup', 'purge']
+    print("✅ Jobs run once per interval unless forced")
+
+
+def test_single_job_run_keeps_schedule():
+    """Running one job records it without postponing the others"""
+    scheduler, calls = make_scheduler()
+    results = scheduler.run(names=['purge'], force=True)
+    assert list(results) == ['purge']
+    status = scheduler.status()
+    assert status['last_run'] is None
+    assert list(status['jobs']) == ['purge']
+
+    assert scheduler.is_due()
+    scheduler.run()
+    assert calls == ['purge', 'cleanup', 'purge']
+    print("✅ Partial runs leave the schedule alone")
+
+
+def test_failed_job_recorded():
+    """A failing job is reported and does not stop the rest"""
+    scheduler, calls = make_scheduler()
+
+    @scheduler.job('broken')
+    def broken():
+        raise RuntimeError("database is locked")
+
+    results = scheduler.run()
+    assert results['broken'] == {**results['broken'], 'ok': False, 'error': "database is locked"}
+    assert results['cleanup']['ok'] and results['purge']['ok']
+    print("✅ Failed job recorded with its error")
+
+
+def test_lock_held_elsewhere():
+    """Only one run at a time holds the lock"""
+    scheduler, calls = make_scheduler()
+    with scheduler._exclusive() as acquired:
+        assert acquired
+        assert scheduler.run(force=True) is None
+    assert calls == []
+    print("✅ Concurrent run skipped while the lock is held")
+
+
+def test_thread_only_in_thread_mode():
+    """The background thread starts in thread mode only"""
+    for mode in ('off', 'cron'):
+        scheduler, _ = make_scheduler(mode=mode)
+        scheduler.ensure_started()
+        assert scheduler._thread is None
+
+    scheduler, _ = make_scheduler(mode='thread', interval=3600)
+    try:
+        scheduler.ensure_started()
+        assert scheduler._thread is not None and scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+
+    try:
+        make_scheduler(mode='sometimes')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Unknown MAINTENANCE_MODE accepted")
+    print("✅ Thread started only in thread mode")
+
+
+if __name__ == "__main__":
+    test_runs_once_per_interval()
+    test_single_job_run_keeps_schedule()
+    test_failed_job_recorded()
+    test_lock_held_elsewhere()
+    test_thread_only_in_thread_mode()
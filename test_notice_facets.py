@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the maintained notice category counts
+"""
+
+from conftest import reset_database
+from app import app, db, Notice, NoticeFacet, _apply_facet_deltas, get_notice_facets, rebuild_notice_facets
+
+
+def active_counts():
+    """The facet summary computed the slow way, with a GROUP BY over the notices"""
+    category = db.func.coalesce(Notice.category, '')
+    rows = db.session.query(category, db.func.count(Notice.id))\
+        .filter(db.or_(Notice.is_active == True, Notice.is_active.is_(None)))\
+        .group_by(category)\
+        .all()
+    return {
+        'total': sum(count for _, count in rows),
+        'categories': dict(sorted((name, count) for name, count in rows if name))
+    }
+
+
+def test_facets_follow_notice_changes():
+    """Adding, recategorizing, deactivating and deleting notices keep the counts exact"""
+    reset_database()
+    with app.app_context():
+        try:
+            exam = Notice(title='Facet test exam', category='Facet Exam')
+            plain = Notice(title='Facet test plain')
+            db.session.add_all([exam, plain])
+            db.session.flush()
+            assert get_notice_facets()['categories']['Facet Exam'] == 1
+            assert get_notice_facets() == active_counts()
+
+            exam.category = 'Facet Sports'
+            db.session.flush()
+            assert 'Facet Exam' not in get_notice_facets()['categories']
+            assert get_notice_facets() == active_counts()
+
+            exam.is_active = False
+            db.session.flush()
+            assert get_notice_facets() == active_counts()
+
+            db.session.delete(plain)
+            db.session.flush()
+            assert get_notice_facets() == active_counts()
+        finally:
+            db.session.rollback()
+    print("✅ Notice facets follow notice changes")
+
+
+def test_facet_upsert():
+    """Deltas create a missing facet row and add to an existing one, in a single statement each"""
+    reset_database()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            _apply_facet_deltas(connection, {'Upsert': 1})
+        # The row exists now, so this adds to it instead of inserting
+        with db.engine.begin() as connection:
+            _apply_facet_deltas(connection, {'Upsert': 2, 'Other': -1})
+        with db.engine.begin() as connection:
+            _apply_facet_deltas(connection, {'Upsert': -1})
+        counts = dict(db.session.query(NoticeFacet.category, NoticeFacet.active_count))
+    assert counts == {'Upsert': 2, 'Other': 0}
+    print("✅ Facet deltas upserted")
+
+
+def test_rebuild_agrees_with_listeners():
+    """A recount counts notices without is_active as the listeners did, so nothing needs repairing"""
+    reset_database()
+    with app.app_context():
+        db.session.add_all([Notice(title='Unset', category='Facet Exam'),
+                            Notice(title='Inactive', category='Facet Exam', is_active=False)])
+        db.session.commit()
+        # Rows written outside the app, e.g. before the column had a default
+        db.session.execute(db.update(Notice).where(Notice.title == 'Unset').values(is_active=None))
+        db.session.commit()
+        assert get_notice_facets()['categories'] == {'Facet Exam': 1}
+        assert rebuild_notice_facets() == 0
+    print("✅ Recount agrees with the maintained counts")
+
+
+def test_facets_endpoint():
+    """The kiosk endpoint serves the same summary"""
+    with app.app_context():
+        expected = get_notice_facets()
+    response = app.test_client().get('/api/v1/notices/facets')
+    assert response.status_code == 200
+    assert response.get_json() == expected
+    print("✅ Facets endpoint matches the summary")
+
+
+if __name__ == "__main__":
+    test_facets_follow_notice_changes()
+    test_facet_upsert()
+    test_rebuild_agrees_with_listeners()
+    test_facets_endpoint()
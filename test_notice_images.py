@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the notice photo variants
+"""
+
+import io
+import json
+
+from conftest import reset_database
+from app import app, db, Notice, upload_store
+from notice_images import images_supported, photo_variants, srcset
+
+
+def test_photo_variants():
+    """Photos are stored upright at each width, without metadata or upscaling"""
+    if not images_supported():
+        print("⚠️ Pillow not installed, photos are stored as uploaded")
+        return
+    from PIL import Image
+
+    photo = Image.new('RGB', (2000, 1000), (200, 30, 30))
+    exif = photo.getexif()
+    exif[0x0112] = 6  # Rotated 90 degrees by the camera
+    exif[0x010F] = 'Phone'
+    upload = io.BytesIO()
+    photo.save(upload, 'JPEG', exif=exif)
+    upload.seek(0)
+
+    variants = photo_variants(upload, 'notice.jpg')
+    assert list(variants) == [320, 640, 1000]
+    with Image.open(variants[320]) as thumbnail:
+        assert thumbnail.format == 'WEBP'
+        assert thumbnail.size == (320, 640)
+        assert not thumbnail.getexif()
+
+    names = {320: 'a.webp', 1000: 'b.webp'}
+    assert srcset(names, lambda name: f"/photos/{name}") == '/photos/a.webp 320w, /photos/b.webp 1000w'
+    print("✅ Photo variants encoded")
+
+
+def test_undecodable_photo():
+    """Files that aren't images are left to be stored as uploaded"""
+    assert photo_variants(io.BytesIO(b'GIF89a not an image'), 'broken.gif') is None
+    print("✅ Undecodable photo kept as uploaded")
+
+
+def test_backfill_photo_variants():
+    """`flask photos backfill` resizes photos stored as uploaded and skips missing ones"""
+    if not images_supported():
+        print("⚠️ Pillow not installed, nothing to backfill")
+        return
+    from PIL import Image
+
+    upload = io.BytesIO()
+    Image.new('RGB', (800, 400), (30, 30, 200)).save(upload, 'JPEG')
+    upload.seek(0)
+    original = upload_store.save(upload, 'jpg')
+    stored = {original}
+    reset_database()
+    try:
+        with app.app_context():
+            db.session.add_all([Notice(title='Old photo', photo_filename=original),
+                                Notice(title='Lost photo', photo_filename='missing.jpg')])
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['photos', 'backfill'])
+        assert 'Converted 1 photo(s), skipped 1' in result.output, result.output
+
+        with app.app_context():
+            notice = Notice.query.filter_by(title='Old photo').one()
+            variants = json.loads(notice.photo_variants)
+            stored.update(variants.values())
+            assert list(variants) == ['320', '640', '800']
+            assert notice.photo_filename == variants['800']
+            assert Notice.query.filter_by(title='Lost photo').one().photo_variants is None
+    finally:
+        for name in stored:
+            upload_store.remove(name)
+    print("✅ Older photos backfilled as variants")
+
+
+if __name__ == "__main__":
+    test_photo_variants()
+    test_undecodable_photo()
+    test_backfill_photo_variants()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for paging notices with the keyset cursor
+"""
+
+from datetime import datetime
+
+from conftest import reset_database
+from app import app, db, Notice, get_notice_window, summarize_description
+
+DESCRIPTIONS = [
+    '',
+    'Short description',
+    'x' * 105,
+    'x' * 106,
+    'word ' * 21,
+    'word ' * 20 + 'words',
+    'A' * 97 + ' tail of the description that runs past the limit',
+    'Exam schedule for the semester ' * 5,
+]
+
+
+def add_notices(count, upload_date):
+    with app.app_context():
+        for number in range(count):
+            db.session.add(Notice(title=f'Notice {number}', description=DESCRIPTIONS[number % len(DESCRIPTIONS)],
+                                  category='General', upload_date=upload_date))
+        db.session.commit()
+
+
+def test_window_pages_through_equal_dates():
+    """Notices sharing an upload date are paged without duplicates or gaps"""
+    reset_database()
+    add_notices(7, datetime(2026, 10, 1, 9, 0))
+    add_notices(2, datetime(2026, 9, 1, 9, 0))
+    with app.app_context():
+        expected = [notice_id for notice_id, in db.session.query(Notice.id)
+                    .order_by(db.desc(Notice.upload_date), db.desc(Notice.id))]
+
+        seen, cursor = [], None
+        while True:
+            notices, cursor = get_notice_window(cursor, limit=2)
+            seen.extend(notice['id'] for notice in notices)
+            if not cursor:
+                break
+    assert seen == expected and len(seen) == 9
+    print("✅ Window pages through equal upload dates")
+
+
+def test_api_pages_through_equal_dates():
+    """The API hands out the same pages as the window, cursor by cursor"""
+    reset_database()
+    add_notices(5, datetime(2026, 10, 1, 9, 0))
+    client = app.test_client()
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/v1/notices', query_string={'limit': 2, **({'before': cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(notice['id'] for notice in body['notices'])
+        assert all(notice['title'] in body['html'] for notice in body['notices'])
+        cursor = body['next']
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 5
+    print("✅ API pages through equal upload dates")
+
+
+def test_bad_cursor():
+    """A cursor that can't be decoded is a client error"""
+    client = app.test_client()
+    for cursor in ('garbage', '2026-10-01T09:00:00_x', 'notadate_3'):
+        assert client.get('/api/v1/notices', query_string={'before': cursor}).status_code == 400
+    print("✅ Bad cursor rejected")
+
+
+def test_summary_matches_jinja_truncate():
+    """Cards summarize descriptions exactly like the template's truncate(100) did"""
+    truncate = app.jinja_env.filters['truncate']
+    for text in DESCRIPTIONS:
+        assert summarize_description(text) == truncate(app.jinja_env, text, 100), text
+
+    # The window only reads the head of a description, which must not change the summary
+    reset_database()
+    add_notices(len(DESCRIPTIONS), datetime(2026, 10, 1, 9, 0))
+    with app.app_context():
+        notices, _ = get_notice_window(limit=len(DESCRIPTIONS))
+        for notice in notices:
+            description = db.session.get(Notice, notice['id']).description
+            assert notice['summary'] == truncate(app.jinja_env, description, 100), description
+    print("✅ Summaries match Jinja's truncate")
+
+
+if __name__ == "__main__":
+    test_window_pages_through_equal_dates()
+    test_api_pages_through_equal_dates()
+    test_bad_cursor()
+    test_summary_matches_jinja_truncate()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script checking that the queries behind the public pages use indexes
+
+Each page or job runs against an emptied throwaway database while its SQL is
+recorded. The recorded SELECTs are then explained against an empty SQLite schema
+created from the models, and any plan step that scans a whole table fails the test.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+
+from conftest import reset_database
+from app import (app, db, cleanup_expired_notices, get_current_holiday, get_notice_facets, get_notice_window,
+                 holiday_calendar_cache, schedule_index_cache)
+
+# Tables with a row per category or similar, read whole on purpose
+SMALL_TABLES = ('notice_facet',)
+
+
+@contextmanager
+def recorded_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def full_scans(statements):
+    """``(statement, plan step)`` pairs of the steps that read a whole table"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                step = row[3]
+                if step.startswith('SCAN ') and step != 'SCAN CONSTANT ROW' \
+                        and step.split()[1] not in SMALL_TABLES:
+                    scans.append((' '.join(statement.split())[:120], step))
+    return scans
+
+
+def check_queries(name, run):
+    reset_database()
+    with app.app_context():
+        # Start cold so cached indexes and calendars issue their queries again
+        schedule_index_cache.clear()
+        holiday_calendar_cache.clear()
+        with recorded_queries() as statements:
+            run()
+    assert statements, f"{name} issued no queries"
+    scans = full_scans(statements)
+    assert not scans, f"{name} scans whole tables: {scans}"
+    print(f"✅ {name}: {len(statements)} queries use indexes")
+
+
+def get_page(path):
+    def run():
+        # A logged-in session bypasses the page cache, so the view really runs
+        with app.test_client() as client:
+            with client.session_transaction() as session:
+                session['admin_logged_in'] = True
+            client.get(path)
+    return run
+
+
+def test_index_queries():
+    check_queries('index', get_page('/'))
+    check_queries('notices window', lambda: get_notice_window(before='2026-01-01T00:00:00_10'))
+
+
+def test_section_view_queries():
+    check_queries('section_view', get_page('/section/Section A'))
+
+
+def test_notices_queries():
+    check_queries('notices', get_page('/notices'))
+    check_queries('notices by category', get_page('/notices?category=Exam&page=2'))
+    check_queries('notice facets', get_notice_facets)
+
+
+def test_holiday_queries():
+    check_queries('get_current_holiday', lambda: get_current_holiday('Section A'))
+
+
+def test_cleanup_queries():
+    check_queries('cleanup_expired_notices', cleanup_expired_notices)
+
+
+if __name__ == "__main__":
+    test_index_queries()
+    test_section_view_queries()
+    test_notices_queries()
+    test_holiday_queries()
+    test_cleanup_queries()
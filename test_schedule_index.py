@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled now/next schedule index
+"""
+
+import json
+from datetime import datetime
+
+from schedule_index import ScheduleIndex, ScheduleIndexCache
+
+SCHEDULE = {
+    "Section A": [
+        {"day": "Monday", "time": "9:00 AM - 10:00 AM", "subject": "Mathematics", "room": "Room 101", "faculty": "Dr. Smith", "section": "Section A"},
+        {"day": "Monday", "time": "11:00 AM - 12:00 PM", "subject": "Physics", "room": "Room 102", "faculty": "Prof. Johnson", "section": "Section A"},
+        {"day": "Monday", "time": "10:00 AM - 11:00 AM", "subject": "Chemistry", "room": "Room 103", "faculty": "Dr. Williams", "section": "Section A"},
+        {"day": "Tuesday", "time": "9:00 AM - 10:00 AM", "subject": "Biology", "room": "Room 104", "faculty": "Prof. Brown", "section": "Section A"},
+        {"day": "Monday", "time": "not a time", "subject": "Broken", "room": "Room 105", "section": "Section A"}
+    ],
+    "Section B": [
+        {"day": "Monday", "time": "9:30 AM - 10:30 AM", "subject": "English", "room": "Room 201", "faculty": "Prof. Wilson", "section": "Section B"}
+    ]
+}
+
+
+def test_lookup_current_and_upcoming():
+    """Classes are split around the current minute and sorted by start time"""
+    index = ScheduleIndex.from_json(json.dumps(SCHEDULE))
+
+    current, upcoming = index.lookup("Section A", "Monday", 9 * 60 + 30)
+    assert [entry[2]["subject"] for entry in current] == ["Mathematics"]
+    assert [entry[2]["subject"] for entry in upcoming] == ["Chemistry", "Physics"]
+
+    # A class ending exactly now is no longer current
+    current, upcoming = index.lookup("Section A", "Monday", 10 * 60)
+    assert [entry[2]["subject"] for entry in current] == ["Chemistry"]
+    assert [entry[2]["subject"] for entry in upcoming] == ["Physics"]
+
+    current, upcoming = index.lookup("Section B", "Tuesday", 9 * 60)
+    assert current == [] and upcoming == []
+    print("✅ Schedule index lookups are correct")
+
+
+def test_cache_is_keyed_by_upload_date():
+    """A new upload date for the same timetable id forces a recompile"""
+    cache = ScheduleIndexCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return ScheduleIndex.from_schedule(SCHEDULE)
+
+    first = cache.get(1, datetime(2025, 1, 1), load)
+    assert cache.get(1, datetime(2025, 1, 1), load) is first
+    assert cache.get(1, datetime(2025, 2, 1), load) is not first
+    assert len(loads) == 2
+    print("✅ Schedule index cache invalidates on new upload date")
+
+
+def test_room_and_faculty_lookups():
+    """Rooms and faculty are indexed across sections, matched case-insensitively"""
+    resources = ScheduleIndex.from_schedule(SCHEDULE).resources
+
+    assert resources.free_rooms("Monday", 9 * 60 + 45) == ["Room 102", "Room 103", "Room 104"]
+    assert resources.free_rooms("Monday", 10 * 60 + 30) == ["Room 101", "Room 102", "Room 104", "Room 201"]
+    assert len(resources.free_rooms("Sunday", 10 * 60)) == 5
+
+    running, upcoming = resources.faculty_at("prof. johnson", "Monday", 10 * 60)
+    assert running == [] and [entry[2]["subject"] for entry in upcoming] == ["Physics"]
+    running, _ = resources.faculty_at("Dr.  Smith", "Monday", 9 * 60)
+    assert [entry[2]["subject"] for entry in running] == ["Mathematics"]
+
+    assert [entry[2]["section"] for entry in resources.room_day("room 201", "Monday")] == ["Section B"]
+    print("✅ Room and faculty lookups are correct")
+
+
+if __name__ == "__main__":
+    test_lookup_current_and_upcoming()
+    test_cache_is_keyed_by_upload_date()
+    test_room_and_faculty_lookups()
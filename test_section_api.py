@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the section classes API used by the kiosk rotation
+"""
+
+import json
+from datetime import datetime
+
+from conftest import reset_database
+from app import (app, db, Holiday, Timetable, TIMEZONE, MAX_API_SECTIONS, register_sections,
+                 replace_timetable_entries)
+
+
+def store_timetable():
+    """Active timetable with an all-day class today in Section A and Section B"""
+    reset_database()
+    today = datetime.now(TIMEZONE).strftime('%A')
+    schedule = {
+        section: [{'day': today, 'time': '12:00 AM - 11:59 PM', 'subject': subject, 'room': room,
+                   'faculty': 'Not assigned', 'section': section}]
+        for section, subject, room in (('Section A', 'Maths', '101'), ('Section B', 'Physics', '102'))
+    }
+    with app.app_context():
+        timetable = Timetable(name='Test', schedule_data=json.dumps(schedule), sections=json.dumps(list(schedule)))
+        db.session.add(timetable)
+        register_sections(list(schedule), rename=True)
+        replace_timetable_entries(timetable)
+        db.session.commit()
+
+
+def test_section_classes():
+    """One section's classes, looked up by any spelling of its name"""
+    store_timetable()
+    response = app.test_client().get('/api/v1/sections/section a/classes')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['section'] == 'Section A'
+    assert data['holiday'] is None
+    assert [cls['subject'] for cls in data['current']] == ['Maths']
+    print("✅ Section classes served")
+
+
+def test_section_classes_conditional():
+    """The ETag answers revalidation with 304 until the content changes"""
+    store_timetable()
+    client = app.test_client()
+    response = client.get('/api/v1/sections/Section A/classes')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert client.get('/api/v1/sections/Section A/classes', headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        today = datetime.now(TIMEZONE).date()
+        holiday = Holiday(holiday_name='Founders Day', start_date=today, end_date=today)
+        holiday.set_sections(['Section A'])
+        db.session.add(holiday)
+        db.session.commit()
+
+    changed = client.get('/api/v1/sections/Section A/classes', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    data = changed.get_json()
+    assert data['holiday']['name'] == 'Founders Day'
+    assert data['current'] == []
+    print("✅ Section classes revalidated and refreshed after a holiday")
+
+
+def test_batched_sections():
+    """Several sections in one response, in the order asked for"""
+    store_timetable()
+    client = app.test_client()
+    data = client.get('/api/v1/sections/classes?names=section b, Section A').get_json()
+    assert [section['section'] for section in data['sections']] == ['Section B', 'Section A']
+    assert [section['current'][0]['subject'] for section in data['sections']] == ['Physics', 'Maths']
+
+    everything = client.get('/api/v1/sections/classes')
+    assert [section['section'] for section in everything.get_json()['sections']] == ['Section A', 'Section B']
+    assert client.get('/api/v1/sections/classes',
+                      headers={'If-None-Match': everything.headers['ETag']}).status_code == 304
+
+    too_many = ','.join(f"S{number}" for number in range(MAX_API_SECTIONS + 1))
+    assert client.get(f'/api/v1/sections/classes?names={too_many}').status_code == 400
+    print("✅ Batched section classes served")
+
+
+if __name__ == "__main__":
+    test_section_classes()
+    test_section_classes_conditional()
+    test_batched_sections()
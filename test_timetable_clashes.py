@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for room and faculty clash detection
+"""
+
+from timetable_clashes import find_clashes
+
+
+def make_class(section, subject, time, room, faculty, day='Monday'):
+    return {'day': day, 'time': time, 'subject': subject, 'room': room, 'faculty': faculty, 'section': section}
+
+
+def test_room_and_faculty_clashes():
+    """Overlapping bookings clash; back-to-back classes and joint lectures don't"""
+    schedule = {
+        'Section A': [
+            make_class('Section A', 'Maths', '9:00 AM - 10:00 AM', 'R1', 'Dr. X'),
+            make_class('Section A', 'Physics', '10:00 AM - 11:00 AM', 'R1', 'Dr. Y'),
+        ],
+        'Section B': [
+            make_class('Section B', 'Maths', '9:00 AM - 10:00 AM', 'r1', 'dr. x'),  # Joint lecture with A
+            make_class('Section B', 'Chemistry', '10:30 AM - 11:30 AM', 'R2', 'Dr. Y'),
+            make_class('Section B', 'Lab', '10:30 AM - 11:30 AM', 'R1', 'Not assigned', day='Tuesday'),
+        ],
+    }
+
+    report = find_clashes(schedule)
+    assert report['total'] == 1
+    clash = report['clashes'][0]
+    assert (clash['kind'], clash['name'], clash['day'], clash['time']) == ('faculty', 'Dr. Y', 'Monday', '10:30 AM - 11:00 AM')
+    assert [cls['subject'] for cls in clash['classes']] == ['Physics', 'Chemistry']
+    print("✅ Clashes detected")
+
+
+def test_report_is_capped():
+    """Every clash is counted but only ``limit`` are listed"""
+    schedule = {
+        f'Section {number}': [make_class(f'Section {number}', f'Subject {number}', '9:00 AM - 10:00 AM', 'Hall', 'None')]
+        for number in range(10)
+    }
+    report = find_clashes(schedule, limit=5)
+    assert report['total'] == 45 and len(report['clashes']) == 5
+    print("✅ Clash report capped")
+
+
+if __name__ == "__main__":
+    test_room_and_faculty_clashes()
+    test_report_is_capped()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script keeping timetable entry rows and the schedule blob in step
+"""
+
+import io
+import json
+import os
+
+from conftest import reset_database
+from app import (app, db, Timetable, TimetableEntry, TIMETABLES_UPLOAD_PATH, get_schedule_index,
+                 replace_timetable_entries)
+
+SCHEDULE = {
+    'Section A': [
+        {'day': 'Monday', 'time': '9:00 AM - 10:00 AM', 'subject': 'Maths', 'room': '101',
+         'faculty': 'Dr. Rao', 'section': 'Section A'},
+    ],
+    'Section B': [
+        {'day': 'Monday', 'time': '9:00 AM - 10:00 AM', 'subject': 'Physics', 'room': '102',
+         'faculty': 'Dr. Sen', 'section': 'Section B'},
+    ],
+}
+
+
+def store_timetable(with_entries=True):
+    """Active timetable with ``SCHEDULE``; without entries it looks like one stored before they existed"""
+    reset_database()
+    with app.app_context():
+        timetable = Timetable(name='Test', schedule_data=json.dumps(SCHEDULE), sections=json.dumps(list(SCHEDULE)))
+        db.session.add(timetable)
+        if with_entries:
+            replace_timetable_entries(timetable)
+        db.session.commit()
+        return timetable.id
+
+
+def admin_post(path, data):
+    app.config['WTF_CSRF_ENABLED'] = False
+    try:
+        with app.test_client() as client:
+            with client.session_transaction() as session:
+                session['admin_logged_in'] = True
+            return client.post(path, data=data)
+    finally:
+        app.config['WTF_CSRF_ENABLED'] = True
+
+
+def add_class(section='Section A'):
+    # 2026-10-19 is a Monday
+    return admin_post('/add_class', {'subject': 'Chemistry', 'room': '103', 'section': section,
+                                     'time': '2026-10-19T11:00', 'duration': '50'})
+
+
+def entry_subjects(timetable_id):
+    return sorted(subject for subject, in db.session.query(TimetableEntry.subject)
+                  .filter(TimetableEntry.timetable_id == timetable_id))
+
+
+def blob_subjects(timetable):
+    return sorted(cls['subject'] for classes in json.loads(timetable.schedule_data).values() for cls in classes)
+
+
+def test_add_class_updates_blob_and_entries():
+    """An added class lands in the schedule blob and the entry rows alike"""
+    timetable_id = store_timetable()
+    assert add_class().status_code == 302
+    with app.app_context():
+        timetable = db.session.get(Timetable, timetable_id)
+        added = json.loads(timetable.schedule_data)['Section A'][-1]
+        assert added['time'] == '11:00 AM - 11:50 AM'
+        assert entry_subjects(timetable_id) == blob_subjects(timetable) == ['Chemistry', 'Maths', 'Physics']
+
+        # A rewrite from the blob, as edits and re-uploads do, keeps the class
+        replace_timetable_entries(timetable)
+        db.session.commit()
+        assert 'Chemistry' in entry_subjects(timetable_id)
+    print("✅ Added class stored in the blob and the entries")
+
+
+def test_add_class_to_new_section():
+    """A class for a section the timetable didn't have registers that section"""
+    timetable_id = store_timetable()
+    add_class(section='Section C')
+    with app.app_context():
+        timetable = db.session.get(Timetable, timetable_id)
+        assert json.loads(timetable.sections) == ['Section A', 'Section B', 'Section C']
+        assert get_schedule_index(timetable).has_section('Section C')
+    print("✅ Added class registers its section")
+
+
+def test_add_class_to_timetable_without_entries():
+    """The first class added to an older timetable doesn't hide the classes of its blob"""
+    timetable_id = store_timetable(with_entries=False)
+    add_class()
+    with app.app_context():
+        timetable = db.session.get(Timetable, timetable_id)
+        assert entry_subjects(timetable_id) == ['Chemistry', 'Maths', 'Physics']
+        index = get_schedule_index(timetable)
+        assert index.has_section('Section A') and index.has_section('Section B')
+    print("✅ Older timetable gets all its entries on the first added class")
+
+
+def test_edit_reconciles_entries():
+    """Re-uploading on edit diffs against the entry rows, so rows missing from the blob are removed"""
+    reset_database()
+    schedule = {'Default': [{'day': 'Monday', 'time': '9:00 AM - 10:00 AM', 'subject': 'Maths', 'room': '101',
+                             'faculty': 'Not assigned', 'section': 'Default'}]}
+    with app.app_context():
+        timetable = Timetable(name='Test', schedule_data=json.dumps(schedule), sections='["Default"]')
+        db.session.add(timetable)
+        replace_timetable_entries(timetable)
+        # A row only the entry table knows about, e.g. written by an older add_class
+        db.session.add(TimetableEntry(timetable_id=timetable.id, section='Default', weekday=0,
+                                      start_minute=660, end_minute=720, subject='Stray', room='104'))
+        db.session.commit()
+        timetable_id = timetable.id
+
+    csv = b"Day,Start Time,End Time,Subject,Room\nMonday,9:00 AM,10:00 AM,Maths,101\n"
+    try:
+        response = admin_post(f'/edit_timetable/{timetable_id}',
+                              {'name': 'Test', 'file': (io.BytesIO(csv), 'entries_test.csv')})
+        assert response.status_code == 302
+    finally:
+        os.remove(os.path.join(TIMETABLES_UPLOAD_PATH, 'entries_test.csv'))
+
+    with app.app_context():
+        timetable = db.session.get(Timetable, timetable_id)
+        assert entry_subjects(timetable_id) == blob_subjects(timetable) == ['Maths']
+    print("✅ Edit reconciles the entry rows with the new blob")
+
+
+if __name__ == "__main__":
+    test_add_class_updates_blob_and_entries()
+    test_add_class_to_new_section()
+    test_add_class_to_timetable_without_entries()
+    test_edit_reconciles_entries()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for parsing timetable sheets into schedule entries
+"""
+
+import os
+import tempfile
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+from timetable_parser import diff_schedules, iter_parsed_sheets, process_single_sheet
+
+
+def test_process_single_sheet():
+    """Rows are normalized, filtered and sorted by day and start time"""
+    df = pd.DataFrame({
+        ' Day ': ['tue', 'Mon', 'mon', 'holiday', 'Fri', 'wed'],
+        'Start Time': ['2:00 PM', time(11, 0), '09:00', '9:00 AM', 'soon', '10:00 AM'],
+        'End Time': ['3:00 PM', time(12, 0), '10:00', '10:00 AM', 'later', '11:00 AM'],
+        'Subject': ['Physics', ' Chemistry ', 'Mathematics', 'Trip', 'Lab', ''],
+        'Room': ['R2', 'R3', 'R1', 'R9', 101, 'R4'],
+        'Professor/Faculty Name': ['Prof. Y', np.nan, ' Dr. X ', 'Z', 'N/A', 'W']
+    })
+
+    schedule = process_single_sheet(df, 'Section A')
+
+    assert schedule == [
+        {'day': 'Monday', 'time': '9:00 AM - 10:00 AM', 'subject': 'Mathematics', 'room': 'R1', 'faculty': 'Dr. X', 'section': 'Section A'},
+        {'day': 'Monday', 'time': '11:00 AM - 12:00 PM', 'subject': 'Chemistry', 'room': 'R3', 'faculty': 'Not assigned', 'section': 'Section A'},
+        {'day': 'Tuesday', 'time': '2:00 PM - 3:00 PM', 'subject': 'Physics', 'room': 'R2', 'faculty': 'Prof. Y', 'section': 'Section A'},
+        {'day': 'Friday', 'time': 'soon - later', 'subject': 'Lab', 'room': '101', 'faculty': 'Not assigned', 'section': 'Section A'},
+    ]
+    print("✅ Timetable sheet parsed correctly")
+
+
+def test_free_text_time_cells():
+    """Time cells dateutil chokes on are kept as written instead of failing the sheet"""
+    df = pd.DataFrame({
+        'Day': ['Mon', 'Tue', 'Wed'],
+        'Start': ['Mon 9am', '2026-10-20 14:00', '9:00 AM'],
+        'End': ['10:00 AM', '2026-10-20 15:00', 'after lunch'],
+        'Subject': ['Maths', 'Physics', 'Lab'],
+        'Room': ['R1', 'R2', 'R3'],
+    })
+
+    schedule = process_single_sheet(df, 'Section A')
+
+    assert [cls['time'] for cls in schedule] == [
+        'Mon 9am - 10:00 AM', '2:00 PM - 3:00 PM', '9:00 AM - after lunch'
+    ]
+    print("✅ Free-text time cells kept per cell")
+
+
+def test_parallel_parsing_keeps_sheet_order():
+    """Sheets parsed in worker processes come back in workbook order, same as in-process"""
+    path = os.path.join(tempfile.mkdtemp(), 'timetable.xlsx')
+    with pd.ExcelWriter(path) as writer:
+        for number in range(5):
+            pd.DataFrame({
+                'Day': ['Monday', 'Tuesday'],
+                'Start Time': ['9:00 AM', '10:00 AM'],
+                'End Time': ['10:00 AM', '11:00 AM'],
+                'Subject': [f'Subject {number}', 'Lab'],
+                'Room': ['R1', 'R2']
+            }).to_excel(writer, sheet_name=f'Section {number}', index=False)
+        pd.DataFrame({'Notes': ['none']}).to_excel(writer, sheet_name='Notes', index=False)
+
+    serial = list(iter_parsed_sheets(path))
+    parallel = list(iter_parsed_sheets(path, processes=2))
+
+    assert parallel == serial
+    assert [result[0] for result in parallel] == [f'Section {number}' for number in range(5)] + ['Notes']
+    assert parallel[-1][2] == [] and parallel[-1][3] is None
+    print("✅ Parallel parsing keeps sheet order")
+
+
+def test_unchanged_sheets_are_reused():
+    """A re-upload reuses the schedule of sheets whose fingerprint didn't change"""
+    def sheet(subject):
+        return pd.DataFrame({
+            'Day': ['Monday'], 'Start Time': ['9:00 AM'], 'End Time': ['10:00 AM'],
+            'Subject': [subject], 'Room': ['R1']
+        })
+
+    first = list(iter_parsed_sheets('timetable.xlsx', {'Section A': sheet('Maths'), 'Section B': sheet('Physics')}))
+    previous = {parsed.name: (parsed.fingerprint, parsed.schedule) for parsed in first}
+
+    second = list(iter_parsed_sheets('timetable.xlsx', {'Section A': sheet('Maths'), 'Section B': sheet('Chemistry')},
+                                     previous=previous))
+    assert [parsed.reused for parsed in second] == [True, False]
+    assert second[0].schedule is previous['Section A'][1]
+    assert second[1].fingerprint != previous['Section B'][0]
+
+    diff = diff_schedules({parsed.name: parsed.schedule for parsed in first},
+                          {parsed.name: parsed.schedule for parsed in second})
+    assert list(diff) == ['Section B']
+    assert diff['Section B']['changed'][0]['after']['subject'] == 'Chemistry'
+    assert diff['Section B']['added'] == diff['Section B']['removed'] == []
+    print("✅ Unchanged sheets reused and changes reported")
+
+
+if __name__ == "__main__":
+    test_process_single_sheet()
+    test_free_text_time_cells()
+    test_parallel_parsing_keeps_sheet_order()
+    test_unchanged_sheets_are_reused()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test script for listing timetable sections from the database
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from conftest import reset_database
+from app import app, db, Timetable, TIMEZONE, get_timetable_sections
+
+
+def add_timetable(sections, uploaded, is_active=True):
+    db.session.add(Timetable(name='Test', sections=json.dumps(sections), schedule_data='{}',
+                             upload_date=uploaded, is_active=is_active))
+    db.session.commit()
+
+
+def test_sections_of_latest_active_timetable():
+    """Sections come from the newest active timetable, cleaned of blanks"""
+    reset_database()
+    with app.app_context():
+        assert get_timetable_sections() == []
+
+        now = datetime.now(TIMEZONE)
+        add_timetable(['Old A'], now - timedelta(days=2))
+        add_timetable([' Section A ', '', 'Section B'], now - timedelta(days=1))
+        add_timetable(['Draft'], now, is_active=False)
+        assert get_timetable_sections() == ['Section A', 'Section B']
+    print("✅ Sections listed from the active timetable")
+
+
+if __name__ == "__main__":
+    test_sections_of_latest_active_timetable()
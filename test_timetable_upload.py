@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for timetable uploads through the ingestion queue
+"""
+
+import io
+import time
+
+import pandas as pd
+
+from conftest import reset_database
+from app import app, db, Timetable, ingestion_queue
+
+
+def workbook(broken_sheet=False):
+    """Timetable workbook with two sections; ``broken_sheet`` adds one whose header can't be read"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for section, subject in (('Section A', 'Maths'), ('Section B', 'Physics')):
+            pd.DataFrame({
+                'Day': ['Monday'], 'Start Time': ['9:00 AM'], 'End Time': ['10:00 AM'],
+                'Subject': [subject], 'Room': ['R1']
+            }).to_excel(writer, sheet_name=section, index=False)
+        if broken_sheet:
+            pd.DataFrame({2026: ['Monday'], 'Start Time': ['9:00 AM'], 'End Time': ['10:00 AM'],
+                          'Subject': ['Lab'], 'Room': ['R2']}).to_excel(writer, sheet_name='Section C', index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def upload(file):
+    app.config['WTF_CSRF_ENABLED'] = False
+    try:
+        with app.test_client() as client:
+            with client.session_transaction() as session:
+                session['admin_logged_in'] = True
+            response = client.post('/upload_timetable', data={'name': 'Term', 'file': (file, 'timetable.xlsx')},
+                                   headers={'Accept': 'application/json'})
+    finally:
+        app.config['WTF_CSRF_ENABLED'] = True
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = ingestion_queue.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_upload_succeeds():
+    """A readable workbook becomes the active timetable"""
+    reset_database()
+    job = upload(workbook())
+    assert job['status'] == 'succeeded', job['error']
+    assert job['result']['sections'] == ['Section A', 'Section B']
+    with app.app_context():
+        assert Timetable.query.filter_by(is_active=True).count() == 1
+    print("✅ Timetable upload stored")
+
+
+def test_upload_with_broken_sheet_fails():
+    """A sheet that can't be parsed refuses the upload instead of dropping its section"""
+    reset_database()
+    job = upload(workbook(broken_sheet=True))
+    assert job['status'] == 'failed'
+    assert "'Section C'" in job['error']
+    with app.app_context():
+        assert db.session.query(Timetable.id).count() == 0
+    print("✅ Upload with an unreadable sheet refused")
+
+
+if __name__ == "__main__":
+    test_upload_succeeds()
+    test_upload_with_broken_sheet_fails()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the reference counts of stored uploads and purging unused ones
+"""
+
+import io
+import os
+from datetime import datetime, timedelta
+
+from conftest import reset_database
+from app import (app, db, Notice, UploadBlob, TIMEZONE, UPLOAD_PURGE_DELAY, cleanup_expired_notices,
+                 purge_unused_uploads, upload_store)
+
+
+def ref_counts():
+    return {name: ref_count for name, ref_count in db.session.query(UploadBlob.name, UploadBlob.ref_count)}
+
+
+def store(content):
+    return upload_store.save(io.BytesIO(content), 'pdf')
+
+
+def test_ref_counts_follow_notices():
+    """Inserting, editing, deleting and expiring notices keep the counts exact"""
+    reset_database()
+    circular, timetable = store(b'ref count circular'), store(b'ref count timetable')
+    try:
+        with app.app_context():
+            first = Notice(title='First', filename=circular)
+            second = Notice(title='Second', filename=circular, expiration_date=datetime(2020, 1, 1))
+            db.session.add_all([first, second])
+            db.session.commit()
+            assert ref_counts() == {circular: 2}
+
+            first.filename = timetable
+            db.session.commit()
+            assert ref_counts() == {circular: 1, timetable: 1}
+
+            db.session.delete(first)
+            db.session.commit()
+            assert ref_counts() == {circular: 1, timetable: 0}
+            assert db.session.get(UploadBlob, timetable).released_at is not None
+
+            cleanup_expired_notices()
+            assert ref_counts() == {circular: 0, timetable: 0}
+    finally:
+        upload_store.remove(circular)
+        upload_store.remove(timetable)
+    print("✅ Upload reference counts follow notices")
+
+
+def release(name, ago):
+    """Mark a stored upload as unused since ``ago``, with its file last saved just as long ago"""
+    released_at = datetime.now(TIMEZONE) - ago
+    db.session.add(UploadBlob(name=name, ref_count=0, released_at=released_at))
+    db.session.commit()
+    os.utime(upload_store.path(name), (released_at.timestamp(), released_at.timestamp()))
+
+
+def test_purge_unused_uploads():
+    """Files unused for UPLOAD_PURGE_DELAY are deleted, recent and reused ones are kept"""
+    reset_database()
+    old, recent, reused = store(b'purge old'), store(b'purge recent'), store(b'purge reused')
+    try:
+        with app.app_context():
+            release(old, UPLOAD_PURGE_DELAY * 2)
+            release(recent, timedelta(minutes=1))
+            release(reused, UPLOAD_PURGE_DELAY * 2)
+            # Uploaded again by a notice that hasn't been committed yet
+            assert store(b'purge reused') == reused
+
+            assert purge_unused_uploads() == 1
+            assert upload_store.modified_at(old) is None
+            assert upload_store.modified_at(recent) and upload_store.modified_at(reused)
+            assert set(ref_counts()) == {recent, reused}
+
+            db.session.add(Notice(title='Reused', filename=reused))
+            db.session.commit()
+            assert ref_counts()[reused] == 1
+    finally:
+        for name in (old, recent, reused):
+            upload_store.remove(name)
+    print("✅ Unused uploads purged")
+
+
+def test_purge_abandoned_reupload():
+    """A file saved again by a notice that was never committed is still purged once it ages"""
+    reset_database()
+    abandoned = store(b'purge abandoned')
+    try:
+        with app.app_context():
+            release(abandoned, UPLOAD_PURGE_DELAY * 2)
+            store(b'purge abandoned')
+            assert purge_unused_uploads() == 0
+            assert abandoned in ref_counts()
+
+            stale = (datetime.now(TIMEZONE) - UPLOAD_PURGE_DELAY * 2).timestamp()
+            os.utime(upload_store.path(abandoned), (stale, stale))
+            assert purge_unused_uploads() == 1
+            assert upload_store.modified_at(abandoned) is None
+    finally:
+        upload_store.remove(abandoned)
+    print("✅ Abandoned re-upload purged later")
+
+
+if __name__ == "__main__":
+    test_ref_counts_follow_notices()
+    test_purge_unused_uploads()
+    test_purge_abandoned_reupload()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed upload store
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+from upload_store import UploadStore, file_extension, is_blob_name
+
+
+def test_identical_uploads_stored_once():
+    """Files are named by their SHA-256 and the same content is kept once"""
+    content = b'%PDF-1.4 circular' * 10000
+    with tempfile.TemporaryDirectory() as directory:
+        store = UploadStore(directory)
+        name = store.save(io.BytesIO(content), file_extension('circular.PDF'))
+        assert name == hashlib.sha256(content).hexdigest() + '.pdf'
+        assert is_blob_name(name)
+        assert store.save(io.BytesIO(content), 'pdf') == name
+
+        other = store.save(io.BytesIO(b'another circular'), 'pdf')
+        assert other != name
+        assert sorted(os.listdir(directory)) == sorted([name, other])
+
+        assert store.remove(name)
+        assert not store.remove(name)
+    print("✅ Identical uploads stored once")
+
+
+def test_saving_again_touches_file():
+    """A duplicate upload refreshes the stored file's time, so it isn't purged as unused"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = UploadStore(directory)
+        name = store.save(io.BytesIO(b'notice photo'), 'jpg')
+        os.utime(store.path(name), (0, 0))
+        assert store.modified_at(name) == 0
+        store.save(io.BytesIO(b'notice photo'), 'jpg')
+        assert store.modified_at(name) > 0
+
+        store.remove(name)
+        assert store.modified_at(name) is None
+    print("✅ Saving a stored file again touches it")
+
+
+def test_legacy_names():
+    """Files saved under their upload name are not treated as immutable"""
+    assert not is_blob_name('circular.pdf')
+    assert not is_blob_name(None)
+    assert file_extension('notes') == ''
+    print("✅ Legacy file names recognized")
+
+
+if __name__ == "__main__":
+    test_identical_uploads_stored_once()
+    test_saving_again_touches_file()
+    test_legacy_names()
@@ -0,0 +1,84 @@
+"""
+Room and faculty clash detection for uploaded timetables.
+
+Classes are grouped by room and by faculty per weekday and each group is swept
+once in start order, keeping the classes still running in a heap ordered by
+end minute. A class clashes with every class left in the heap when it starts,
+so the cost is O(n log n) plus the number of clashes found, instead of
+comparing every pair.
+
+The same lecture given to several sections at once (same time, subject, room
+and faculty) is one class, not a clash.
+"""
+import heapq
+import logging
+
+from schedule_index import UNASSIGNED_NAMES, minutes_to_time, parse_time_range, resource_key
+
+logger = logging.getLogger(__name__)
+
+CLASH_FIELDS = ('section', 'subject', 'time', 'room', 'faculty')
+
+
+def _is_joint_class(first, second):
+    """Same lecture listed under two sections"""
+    return first[:2] == second[:2] and all(
+        resource_key(first[3].get(field)) == resource_key(second[3].get(field))
+        for field in ('subject', 'room', 'faculty')
+    )
+
+
+def find_clashes(schedule, limit=200):
+    """Room and faculty double bookings in a ``{section: [class, ...]}`` schedule.
+
+    Returns ``{'total': count, 'clashes': [...]}`` with at most ``limit`` clashes listed.
+    Each clash names the room or faculty, the day, the overlapping time and both classes.
+    """
+    groups = {}
+    for section, classes in schedule.items():
+        for cls_data in classes or []:
+            try:
+                start_minutes, end_minutes = parse_time_range(cls_data['time'])
+            except (KeyError, AttributeError, ValueError):
+                continue  # Not stored as an entry either
+            if end_minutes <= start_minutes:
+                continue
+            for kind in ('room', 'faculty'):
+                name = cls_data.get(kind)
+                key = resource_key(name)
+                if key in UNASSIGNED_NAMES:
+                    continue
+                groups.setdefault((kind, key, cls_data.get('day')), []).append(
+                    (start_minutes, end_minutes, section, cls_data)
+                )
+
+    total = 0
+    clashes = []
+    for (kind, _, day), intervals in groups.items():
+        intervals.sort(key=lambda interval: (interval[0], interval[1]))
+        running = []  # (end minute, position) of classes that haven't ended yet
+        for position, interval in enumerate(intervals):
+            start_minutes, end_minutes, _, cls_data = interval
+            while running and running[0][0] <= start_minutes:
+                heapq.heappop(running)
+            for other_end, other_position in running:
+                other = intervals[other_position]
+                if _is_joint_class(other, interval):
+                    continue
+                total += 1
+                if len(clashes) < limit:
+                    clashes.append({
+                        'kind': kind,
+                        'name': str(cls_data.get(kind)).strip(),
+                        'day': day,
+                        'time': f"{minutes_to_time(start_minutes)} - {minutes_to_time(min(end_minutes, other_end))}",
+                        'classes': [
+                            {field: (other[2] if field == 'section' else other[3].get(field)) for field in CLASH_FIELDS},
+                            {field: (interval[2] if field == 'section' else cls_data.get(field)) for field in CLASH_FIELDS}
+                        ]
+                    })
+            heapq.heappush(running, (end_minutes, position))
+
+    if total:
+        logger.warning(f"Found {total} room/faculty clashes in timetable")
+    return {'total': total, 'clashes': clashes}
@@ -0,0 +1,358 @@
+"""
+Parsing of uploaded timetable workbooks into per-section schedules.
+
+These functions only depend on pandas, not on the Flask app, so the parallel
+ingestion mode can run them in worker processes started with ``spawn``.
+Forking a threaded gunicorn worker is not safe, and spawned children import
+this module instead of the whole application.
+
+With ``processes > 1`` the sheets of a workbook are split into contiguous
+chunks; each worker process opens the workbook once and parses its chunk, and
+results are merged back in the original sheet order. A sheet that fails to
+parse is returned with its error instead of raising, so every failed sheet can
+be named when the upload is refused.
+
+Every sheet is fingerprinted with a hash of its cell values. When a re-upload
+passes the fingerprints and schedules of the previous upload, unchanged sheets
+reuse their earlier schedule instead of being parsed again.
+"""
+import hashlib
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time
+from multiprocessing import get_context
+
+import pandas as pd
+
+from cell_parsing import cell_parser
+from schedule_index import minutes_to_time
+
+logger = logging.getLogger(__name__)
+
+# Part of every sheet fingerprint; bump it when parsing rules change so earlier results aren't reused
+PARSER_VERSION = 2
+
+# One parsed sheet; ``reused`` is set when the schedule came from the previous upload
+ParsedSheet = namedtuple('ParsedSheet', 'name row_count schedule error fingerprint reused', defaults=(None, False))
+
+
+def parse_time(time_str):
+    """Parse a time or a time range cell into a ``time`` or a ``(start, end)`` tuple"""
+    if time_str is None or pd.isna(time_str):
+        return None
+    
+    time_range = cell_parser.time_range(time_str)
+    if time_range:
+        return _minutes_to_clock(time_range[0]), _minutes_to_clock(time_range[1])
+    
+    minutes = cell_parser.time_minutes(time_str)
+    return _minutes_to_clock(minutes) if minutes is not None else None
+
+
+def _minutes_to_clock(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def normalize_day(day_str):
+    """Normalize day names ('mon', 'Tues', '3') to full weekday names"""
+    if day_str is None or pd.isna(day_str):
+        return None
+    return cell_parser.day(day_str)
+
+
+def load_timetable_workbook(file_path, first_sheet_only=False):
+    """Read every sheet of a timetable file once, as an ordered {sheet name: DataFrame} dict"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        # For CSV, treat as a single sheet with default section
+        return {"Default": pd.read_csv(file_path)}
+    elif file_ext in ['.xlsx', '.xls']:
+        with pd.ExcelFile(file_path) as workbook:
+            sheet_names = workbook.sheet_names[:1] if first_sheet_only else workbook.sheet_names
+            sheets = {sheet_name: workbook.parse(sheet_name) for sheet_name in sheet_names}
+        logger.info(f"Loaded {len(sheets)} sheets from {os.path.basename(file_path)}")
+        return sheets
+    else:
+        logger.error(f"Unsupported file type: {file_ext}")
+        raise ValueError("Unsupported file type")
+
+
+def _format_time_column(values: pd.Series) -> pd.Series:
+    """Format a start/end column as '9:00 AM' strings, keeping unparseable cells as str()"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        formatted = values.dt.strftime('%I:%M %p').str.lstrip('0')
+    else:
+        # time/datetime cells format themselves; the other cells are recognized once per distinct value
+        has_strftime = values.map(lambda value: hasattr(value, 'strftime')).astype(bool)
+        raw = values.map(str)
+        labels = {}
+        for text in raw[~has_strftime].unique():
+            minutes = cell_parser.time_minutes(text)
+            labels[text] = minutes_to_time(minutes) if minutes is not None else None
+        formatted = raw.map(labels).astype(object)
+        formatted[has_strftime] = values[has_strftime].map(lambda value: value.strftime('%I:%M %p').lstrip('0'))
+        
+        # Anything the recognizers don't know (dates, datetimes as text) goes through one to_datetime call
+        unrecognized = formatted.isna() & ~has_strftime
+        if unrecognized.any():
+            try:
+                parsed = pd.to_datetime(values[unrecognized], errors='coerce', format='mixed')
+                formatted[unrecognized] = parsed.dt.strftime('%I:%M %p').str.lstrip('0')
+            except (ValueError, TypeError, AttributeError, OverflowError):
+                # dateutil raises on some free text ('Mon 9am') despite errors='coerce'
+                formatted[unrecognized] = values[unrecognized].map(_format_time_cell)
+    return formatted.where(formatted.notna(), values.map(str))
+
+
+def _format_time_cell(value):
+    """One cell through pd.to_datetime as '9:00 AM', or None when it can't be read as a time"""
+    try:
+        return pd.to_datetime(value).strftime('%I:%M %p').lstrip('0')
+    except Exception:
+        return None
+
+
+def _clean_faculty_column(values: pd.Series) -> pd.Series:
+    """Stripped faculty names, with blanks and placeholder values replaced by 'Not assigned'"""
+    invalid_values = ['nan', 'none', 'null', 'n/a', 'not assigned', '', '-', 'na']
+    names = values.astype(str).str.strip()
+    invalid = values.isna() | names.str.lower().isin(invalid_values)
+    return names.where(~invalid, 'Not assigned')
+
+
+def process_single_sheet(df: pd.DataFrame, section_name: str) -> list:
+    """Process a single sheet of the timetable and return the schedule for that section"""
+    days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+    
+    # Standardize column names and log them
+    df.columns = [col.strip().lower() for col in df.columns]
+    logger.info(f"Available columns in sheet for section {section_name}: {df.columns.tolist()}")
+    
+    # Map expected columns with more flexible matching
+    column_mapping = {}
+    # Prioritize exact match for PROFESSOR/FACULTY NAME
+    faculty_patterns = ['PROFESSOR/FACULTY NAME']  # First try exact match
+    faculty_fallback_patterns = ['professor/faculty name', 'professor', 'faculty name', 'faculty', 'teacher', 'instructor', 'professor/faculty']
+    
+    column_patterns = [
+        ('day', ['day', 'weekday', 'day of week']),
+        ('start', ['start', 'begin', 'from', 'start time', 'begin time']),
+        ('end', ['end', 'finish', 'to', 'end time', 'finish time']),
+        ('subject', ['subject', 'course', 'class', 'paper', 'lecture']),
+        ('room', ['room', 'venue', 'location', 'hall', 'classroom']),
+        ('faculty', faculty_patterns)
+    ]
+    
+    # First try exact match for faculty column
+    faculty_col = None
+    for col in df.columns:
+        if col == 'PROFESSOR/FACULTY NAME':
+            faculty_col = col
+            logger.info(f"Found exact match for PROFESSOR/FACULTY NAME column: '{col}'")
+            break
+    
+    # If no exact match found, try case-insensitive match
+    if not faculty_col:
+        for col in df.columns:
+            if 'professor/faculty name' in col.lower():
+                faculty_col = col
+                logger.info(f"Found case-insensitive match for faculty column: '{col}'")
+                break
+    
+    # If still no match, try other patterns
+    if not faculty_col:
+        faculty_patterns = ['professor', 'faculty', 'teacher', 'instructor']
+        for col in df.columns:
+            if any(pattern in col.lower() for pattern in faculty_patterns):
+                faculty_col = col
+                logger.info(f"Found faculty column using pattern match: '{col}'")
+                break
+    
+    if faculty_col:
+        column_mapping['faculty'] = faculty_col
+        logger.info(f"Set faculty column mapping to: '{faculty_col}'")
+    else:
+        logger.warning("No faculty column found in the Excel file")
+    
+    # Process other columns
+    for col_type, patterns in column_patterns:
+        if col_type != 'faculty':  # Skip faculty as we handled it separately
+            matches = []
+            for col in df.columns:
+                if any(pattern in col.lower() for pattern in patterns):
+                    matches.append(col)
+                    logger.info(f"Matched {col_type} column: '{col}' using patterns: {patterns}")
+            
+            if matches:
+                column_mapping[col_type] = matches[0]
+            else:
+                logger.warning(f"No column found matching {col_type} patterns")
+                if col_type not in ['faculty']:
+                    return []
+    
+    logger.info(f"Final column mapping: {column_mapping}")
+    
+    # Normalize each distinct day value once and map it onto the column
+    day_values = df[column_mapping['day']].astype(str)
+    days = day_values.map({value: normalize_day(value) for value in day_values.unique()})
+    
+    frame = pd.DataFrame({
+        'day': days,
+        'start_time': _format_time_column(df[column_mapping['start']]),
+        'end_time': _format_time_column(df[column_mapping['end']]),
+        'subject': df[column_mapping['subject']].astype(str).str.strip(),
+        'room': df[column_mapping['room']].astype(str).str.strip(),
+        'faculty': _clean_faculty_column(df[column_mapping['faculty']]) if 'faculty' in column_mapping else 'Not assigned'
+    }, index=df.index)
+    
+    # Skip rows without a recognizable day or a subject
+    frame = frame[frame['day'].notna() & (frame['subject'] != '')]
+    if frame.empty:
+        logger.info(f"No classes found for section {section_name}")
+        return []
+    
+    frame['time'] = frame['start_time'] + ' - ' + frame['end_time']
+    frame['section'] = section_name
+    
+    # Sort by day and start time; unknown days go last and unparseable times count as midnight
+    start_times = pd.to_datetime(frame['start_time'], format='%I:%M %p', errors='coerce')
+    frame['day_key'] = frame['day'].map({day: idx for idx, day in enumerate(days_order)}).fillna(999)
+    frame['minute_key'] = (start_times.dt.hour * 60 + start_times.dt.minute).fillna(0)
+    frame = frame.sort_values(['day_key', 'minute_key'], kind='stable')
+    
+    schedule = frame[['day', 'time', 'subject', 'room', 'faculty', 'section']].to_dict('records')
+    logger.info(f"Processed {len(schedule)} classes for section {section_name}")
+    return schedule
+
+
+def timetable_sheet_names(file_path):
+    """Sheet names of a timetable file without parsing any cells"""
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        return ["Default"]
+    with pd.ExcelFile(file_path) as workbook:
+        return workbook.sheet_names
+
+
+def sheet_fingerprint(df):
+    """Hash of a sheet's header and cell values, stable across processes"""
+    digest = hashlib.sha256(f"v{PARSER_VERSION}\x1e".encode())
+    digest.update('\x1f'.join(str(column).strip().lower() for column in df.columns).encode())
+    values = df.astype(str).apply(lambda column: column.str.strip())
+    digest.update(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def parse_sheet(df, sheet_name, previous=None):
+    """Parse one sheet into a ``ParsedSheet``.
+
+    ``previous`` maps section names to the ``(fingerprint, schedule)`` of an earlier upload;
+    a sheet with the same fingerprint gets that schedule back without being parsed.
+    """
+    try:
+        fingerprint = sheet_fingerprint(df)
+        known = (previous or {}).get(sheet_name.strip())
+        if known and known[0] == fingerprint:
+            return ParsedSheet(sheet_name, len(df), known[1], None, fingerprint, True)
+        return ParsedSheet(sheet_name, len(df), process_single_sheet(df, sheet_name.strip()), None, fingerprint)
+    except Exception as e:
+        logger.error(f"Error processing sheet {sheet_name}: {str(e)}", exc_info=True)
+        return ParsedSheet(sheet_name, len(df), [], str(e))
+
+
+def parse_sheet_chunk(file_path, sheet_names, previous=None):
+    """Worker process entry point: open the workbook once and parse a run of sheets"""
+    results = []
+    with pd.ExcelFile(file_path) as workbook:
+        for sheet_name in sheet_names:
+            try:
+                df = workbook.parse(sheet_name)
+            except Exception as e:
+                logger.error(f"Error reading sheet {sheet_name}: {str(e)}")
+                results.append(ParsedSheet(sheet_name, 0, [], str(e)))
+                continue
+            results.append(parse_sheet(df, sheet_name, previous))
+    return results
+
+
+def iter_parsed_sheets(file_path, sheets=None, processes=0, previous=None):
+    """Yield a ``ParsedSheet`` for every sheet, in workbook order.
+
+    ``sheets`` is the output of ``load_timetable_workbook`` when the caller already read the file;
+    otherwise Excel workbooks are parsed across ``processes`` worker processes when it is above 1.
+    ``previous`` is passed on to ``parse_sheet``.
+    """
+    if sheets is None and processes > 1 and os.path.splitext(file_path)[1].lower() in ['.xlsx', '.xls']:
+        sheet_names = timetable_sheet_names(file_path)
+        if len(sheet_names) > 1:
+            yield from _parse_in_processes(file_path, sheet_names, processes, previous)
+            return
+
+    if sheets is None:
+        sheets = load_timetable_workbook(file_path)
+    for sheet_name, df in sheets.items():
+        yield parse_sheet(df, sheet_name, previous)
+
+
+def _parse_in_processes(file_path, sheet_names, processes, previous=None):
+    # A few chunks per process so one slow sheet doesn't leave the others idle
+    chunk_count = min(len(sheet_names), processes * 2)
+    chunk_size = -(-len(sheet_names) // chunk_count)
+    chunks = [sheet_names[i:i + chunk_size] for i in range(0, len(sheet_names), chunk_size)]
+    logger.info(f"Parsing {len(sheet_names)} sheets in {len(chunks)} chunks on {processes} processes")
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(chunks)), mp_context=get_context('spawn')) as executor:
+        futures = [
+            executor.submit(parse_sheet_chunk, file_path, chunk, _previous_for(chunk, previous))
+            for chunk in chunks
+        ]
+        # Collect in submission order so results keep the workbook's sheet order
+        for chunk, future in zip(chunks, futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                logger.error(f"Worker failed parsing sheets {chunk}: {str(e)}", exc_info=True)
+                for sheet_name in chunk:
+                    yield ParsedSheet(sheet_name, 0, [], str(e))
+
+
+def _previous_for(sheet_names, previous):
+    # Only ship the earlier schedules a chunk can reuse to its worker process
+    if not previous:
+        return None
+    return {name.strip(): previous[name.strip()] for name in sheet_names if name.strip() in previous}
+
+
+def _class_slot(cls_data):
+    return cls_data.get('day'), cls_data.get('time')
+
+
+def diff_schedules(old, new):
+    """Per-section differences between two ``{section: [class, ...]}`` schedules.
+
+    Classes are matched by day and time: a slot only in ``new`` is added, one only in
+    ``old`` is removed and a slot whose subject, room or faculty differs is changed.
+    Sections without differences are left out.
+    """
+    diff = {}
+    for section in list(old) + [section for section in new if section not in old]:
+        old_slots = {}
+        for cls_data in old.get(section) or []:
+            old_slots.setdefault(_class_slot(cls_data), []).append(cls_data)
+        new_slots = {}
+        for cls_data in new.get(section) or []:
+            new_slots.setdefault(_class_slot(cls_data), []).append(cls_data)
+
+        added, removed, changed = [], [], []
+        for slot in list(old_slots) + [slot for slot in new_slots if slot not in old_slots]:
+            before, after = old_slots.get(slot, []), new_slots.get(slot, [])
+            for old_class, new_class in zip(before, after):
+                if old_class != new_class:
+                    changed.append({'before': old_class, 'after': new_class})
+            removed.extend(before[len(after):])
+            added.extend(after[len(before):])
+
+        if added or removed or changed:
+            diff[section] = {'added': added, 'removed': removed, 'changed': changed}
+    return diff
@@ -0,0 +1,87 @@
+"""
+Content-addressed store for notice uploads.
+
+Uploads used to be saved under their own (sanitized) name, so two notices
+attaching "circular.pdf" overwrote each other and the same file uploaded twice
+was stored twice. Files are now hashed while they are streamed to disk and
+named ``<sha256>.<extension>``. An upload that is already stored is dropped
+instead of written again, and since a name always refers to the same bytes,
+responses for it can be cached as immutable.
+
+The store only handles files. Which notices use a file is counted in the
+database, and files nobody uses any more are removed by a maintenance job.
+Saving a file that is already stored touches it, so the job can tell a file
+that is about to be used again from one that has been unused for a while.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}(\.[a-z0-9]+)?$')
+
+
+def is_blob_name(name):
+    """Whether ``name`` is a content-addressed name, as opposed to a file stored before the store existed"""
+    return bool(name) and BLOB_NAME.match(name) is not None
+
+
+def file_extension(filename):
+    return filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+
+
+class UploadStore:
+    """Files in one directory, named by the SHA-256 of their content."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def save(self, stream, extension=''):
+        """Copy ``stream`` into the store and return its name; the bytes are read once"""
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    temp.write(chunk)
+            name = digest.hexdigest() + (f".{extension.lower()}" if extension else '')
+            try:
+                # Touched so the purge of unused uploads leaves it to the notice about to claim it
+                os.utime(self.path(name))
+                os.remove(temp_path)
+                logger.info(f"Upload {name} is already stored")
+            except FileNotFoundError:
+                os.chmod(temp_path, 0o644)  # mkstemp creates files only the owner can read
+                os.replace(temp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def modified_at(self, name):
+        """When a stored file was last saved, as a timestamp, or None when it is gone"""
+        try:
+            return os.path.getmtime(self.path(name))
+        except FileNotFoundError:
+            return None
+
+    def remove(self, name):
+        """Delete a stored file; returns False when it was already gone"""
+        try:
+            os.remove(self.path(name))
+            return True
+        except FileNotFoundError:
+            return False